@@ -0,0 +1,35 @@
+# Window icon
+# icon.png is a 1024x1024 image of about 1 MB, and decoding it through tk.PhotoImage on every
+# launch delays the window. The first launch scales it down once to a few small PNGs in the
+# user's cache directory; later launches only load those.
+
+import os
+
+ICON_SIZES = (64, 32, 16)  # Largest first, as iconphoto prefers
+ICON_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.auto_typer', 'icons')
+
+def cached_icon_paths(source, sizes=ICON_SIZES, cache_dir=ICON_CACHE_DIR):
+    """Paths of the scaled copies; they change whenever the source image does"""
+    info = os.stat(source)
+    stamp = f"{int(info.st_mtime)}-{info.st_size}"
+    return [os.path.join(cache_dir, f"icon-{size}-{stamp}.png") for size in sizes]
+
+def load_icon(root, source, sizes=ICON_SIZES, cache_dir=ICON_CACHE_DIR):
+    """Get PhotoImages of the icon at each size, scaling and caching them on first use"""
+    import tkinter as tk
+    paths = cached_icon_paths(source, sizes, cache_dir)
+    if all(os.path.exists(path) for path in paths):
+        return [tk.PhotoImage(master=root, file=path) for path in paths]
+
+    full = tk.PhotoImage(master=root, file=source)
+    images = [full.subsample(max(1, full.width() // size)) for size in sizes]
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        for name in os.listdir(cache_dir):
+            if name.startswith('icon-'):
+                os.remove(os.path.join(cache_dir, name))  # Copies of an older icon
+        for image, path in zip(images, paths):
+            image.write(path, format='png')
+    except (OSError, tk.TclError) as e:
+        print(f"Could not cache the scaled icon: {e}")
+    return images
@@ -0,0 +1,80 @@
+# asyncio front end for the typing engine
+# A run still plays on its own thread, where the deadline scheduler can sleep and spin
+# precisely and blocking backend calls don't stall the event loop; the coroutine only waits
+# for it. Many sessions can therefore run from one event loop alongside other coroutines:
+#
+#     async def main():
+#         engine = AsyncTypingEngine()
+#         result = await engine.type("你好, world", config, on_progress=print)
+#
+# Cancelling the awaiting task stops the run within milliseconds; the coroutine waits for the
+# run to finish cleaning up (clipboard, output backend) before re-raising CancelledError.
+
+import asyncio
+import threading
+
+from typing_engine import TypingEngine
+
+class AsyncTypingEngine:
+    """Runs TypingEngine runs on worker threads and awaits them"""
+
+    def __init__(self, config=None, clipboard=None, engine=None):
+        self.engine = engine if engine is not None else TypingEngine(config, clipboard)
+
+    async def type(self, text=None, config=None, chunks=None, plan=None, start_delay=0,
+                   on_progress=None, on_status=None):
+        """Type text, streamed text `chunks` or a saved plan; returns the run's result
+
+        `on_progress(typed)` and `on_status(message)` are called on the event loop's thread.
+        Returns None if the run was stopped before typing.
+        """
+        loop = asyncio.get_running_loop()
+        engine = self.engine
+        engine.prepare(config)
+        previous = engine.on_progress
+        if on_progress is not None:
+            engine.on_progress = lambda typed: loop.call_soon_threadsafe(on_progress, typed)
+        status = None
+        if on_status is not None:
+            status = lambda message: loop.call_soon_threadsafe(on_status, message)
+
+        done = loop.create_future()
+
+        def settle(result=None, error=None):
+            if done.cancelled():
+                return
+            if error is not None:
+                done.set_exception(error)
+            else:
+                done.set_result(result)
+
+        def worker():
+            try:
+                result = engine.run(text, plan, chunks, start_delay, status)
+            except BaseException as e:
+                loop.call_soon_threadsafe(settle, None, e)
+            else:
+                loop.call_soon_threadsafe(settle, result)
+
+        threading.Thread(target=worker, daemon=True).start()
+        try:
+            return await asyncio.shield(done)
+        except asyncio.CancelledError:
+            engine.stop()
+            # The worker is still running; let it stop and clean up before giving up the engine
+            await asyncio.wait([done])
+            raise
+        finally:
+            engine.on_progress = previous
+
+    def stop(self):
+        """Stop the current run, cutting short any wait in progress"""
+        self.engine.stop()
+
+    def pause(self):
+        """Freeze the current run where it is"""
+        self.engine.pause()
+
+    def resume(self):
+        """Continue a paused run"""
+        self.engine.resume()
@@ -1,20 +1,47 @@
-import tkinter as tk
-from tkinter import ttk, scrolledtext, messagebox
-import pyautogui
-import pyperclip
+import sys
 import time
-import random
+
+LAUNCH_TIME = time.perf_counter()
+
+if __name__ == "__main__" and sys.argv[1:] and sys.argv[1] != "--startup-profile":
+    # Command-line use (python -m auto_typer type FILE ...) runs headless, before Tk is imported
+    from cli import main
+    sys.exit(main())
+
+from startup_profile import StartupProfile
+
+# Started before the remaining imports so --startup-profile can time them
+PROFILE = StartupProfile(__name__ == "__main__" and "--startup-profile" in sys.argv, LAUNCH_TIME)
+
+# Keystroke backends (pyautogui, pynput) are imported when a run or the hotkeys first need them
+import tkinter as tk
+from tkinter import ttk, scrolledtext, messagebox, filedialog
 import threading
-import re
-from pynput import keyboard
-from zhuyin_mapping import ZHUYIN_TO_CHINESE, COMMON_CHINESE_WORDS, is_chinese_character
-import base64
-from io import BytesIO
+import os
+import queue
+from app_icon import load_icon
+from clipboard import TkClipboard
+from command_bus import POLL_INTERVAL, CommandBus
+from ime_timing import CALIBRATION_TEXT, calibrate, get_ime_profile, save_calibration
+from pipeline import file_chunks
+from sampling import DISTRIBUTIONS
+from typing_config import build_config
+from typing_engine import TypingEngine
+from typing_plan import TypingPlan
+from zhuyin_mapping import (KEYBOARD_LAYOUTS, USER_DICTIONARY_LOCK, add_user_entry, compile_zhuyin_keys,
+                            find_candidate, import_user_entries, is_chinese_character,
+                            save_user_dictionary)
+
+PROFILE.mark("imports")
+
+ICON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'icon.png')
 
 class AutoTyper:
-    def __init__(self):
+    def __init__(self, profile=None):
+        self.profile = profile or StartupProfile()
         self.root = tk.Tk()
         self.root.title("Auto Typer Pro")
+        self.profile.mark("Tk root")
         
         # --- THEME & STYLING ---
         self.bg_color = '#2e3440'         # Nord dark
@@ -34,37 +61,39 @@ class AutoTyper:
         # Configure custom styles
         self.configure_styles(style)
 
+        self.profile.mark("styles")
+
         # Set App Icon
         self.set_app_icon()
+        self.profile.mark("icon")
+        
+        # Messages from the hotkey listener, the buttons and the typing thread, handled on this thread
+        self.bus = CommandBus()
+        
+        # Clipboard owned by this process, used for every paste
+        self.clipboard = TkClipboard(self.root, self.bus)
+        
+        # The typing engine; its settings are frozen from the widgets when a run starts
+        self.engine = TypingEngine(clipboard=self.clipboard)
+        self.engine.on_progress = lambda typed: self.bus.post('progress', typed)
+        self.status_interval = 0.5  # Seconds between live rate updates in the status line
+        self.last_status_time = 0.0
         
         # Variables
         self.is_typing = False
         self.typing_thread = None
-        self.stop_typing = False
         
         # Hotkey settings
         self.start_hotkey = 'ctrl+shift+s'
         self.stop_hotkey = 'ctrl+shift+x'
-        
-        # Typing settings
-        self.min_delay = 0.05
-        self.max_delay = 0.15
-        self.word_delay = 0.3
-        self.sentence_delay = 0.8
-        
-        # Human-like typing features
-        self.enable_errors = True
-        self.error_rate = 0.15
-        self.correction_rate = 0.8
-        self.thinking_pause_rate = 0.1
-        self.speed_variation = True
-        
-        # Error dictionaries for simulation
-        self.setup_error_data()
+        self.pause_hotkey = 'ctrl+shift+p'
         
         # Setup UI and other components
         self.setup_ui()
-        self.setup_hotkeys()
+        self.setup_bus()
+        self.profile.mark("widgets")
+        # pynput's listener isn't needed to draw the window, so start it once the window is up
+        self.root.after_idle(self.setup_hotkeys)
         
         # Set a default and minimum size for the window
         self.root.geometry("820x720")
@@ -112,112 +141,14 @@ class AutoTyper:
     def set_app_icon(self):
         """Sets the application icon by loading icon.png from the local directory."""
         try:
-            # Keep a reference to the image to prevent it from being garbage collected
-            self.icon_image = tk.PhotoImage(file='icon.png')
-            self.root.iconphoto(True, self.icon_image)
+            # Keep references to the images to prevent them from being garbage collected
+            self.icon_images = load_icon(self.root, ICON_PATH)
+            self.root.iconphoto(True, *self.icon_images)
         except tk.TclError:
             print("Could not load icon. Please ensure 'icon.png' is in the script's directory.")
         except Exception as e:
             print(f"An unexpected error occurred while loading icon: {e}")
 
-    def setup_error_data(self):
-        """Setup error simulation data"""
-        # Characters that need copy-pasting for reliability
-        self.paste_chars = "，。！？；：（）「」『』、"
-        
-        # Common homophone errors (同音字錯誤)
-        self.homophone_errors = {
-            "你": ["妳"],
-            "的": ["得", "地"],
-            "在": ["再"],
-            "做": ["作"],
-            "他": ["她"],
-            "那": ["哪"],
-            "這": ["者"],
-            "時": ["是", "事"],
-            "事": ["是", "時"],
-            "已": ["以"],
-            "以": ["已"],
-            "會": ["回"],
-            "回": ["會"],
-            "年": ["念"],
-            "念": ["年"],
-            "聽": ["廳"],
-            "廳": ["聽"],
-            "話": ["畫"],
-            "畫": ["話"],
-            "帶": ["代"],
-            "代": ["帶"],
-            "錢": ["前"],
-            "前": ["錢"],
-            "先": ["仙"],
-            "仙": ["先"],
-            "現": ["線"],
-            "線": ["現"],
-            "經": ["精"],
-            "精": ["經"]
-        }
-        
-        # Similar looking characters (形似字錯誤)
-        self.similar_char_errors = {
-            "己": ["已"],
-            "已": ["己"],
-            "未": ["末"],
-            "末": ["未"],
-            "干": ["千"],
-            "千": ["干"],
-            "土": ["士"],
-            "士": ["土"],
-            "戶": ["尸"],
-            "尸": ["戶"],
-            "貝": ["見"],
-            "見": ["貝"],
-            "刀": ["力"],
-            "力": ["刀"],
-            "入": ["人"],
-            "人": ["入"],
-            "木": ["本"],
-            "本": ["木"],
-            "大": ["太"],
-            "太": ["大"]
-        }
-        
-        # English punctuation to Chinese punctuation errors
-        self.punctuation_errors = {
-            ",": "，",
-            ".": "。",
-            "!": "！",
-            "?": "？",
-            ";": "；",
-            ":": "：",
-            "(": "（",
-            ")": "）"
-        }
-        
-        # Common English typing errors
-        self.english_errors = {
-            "the": ["teh", "hte"],
-            "and": ["adn", "nad"],
-            "you": ["yuo", "oyu"],
-            "that": ["taht", "htat"],
-            "have": ["ahve", "hvae"],
-            "with": ["wtih", "whit"],
-            "this": ["tihs", "htis"],
-            "they": ["tehy", "htey"],
-            "from": ["form", "fomr"],
-            "been": ["bene", "been"],
-            "said": ["siad", "said"],
-            "each": ["eahc", "caeh"],
-            "which": ["whihc", "hwich"],
-            "their": ["thier", "theyr"],
-            "time": ["tiem", "tmie"],
-            "will": ["wil", "wlil"],
-            "about": ["aobut", "baout"],
-            "would": ["woudl", "owuld"],
-            "there": ["tehre", "theer"],
-            "could": ["coudl", "ocudl"]
-        }
-        
     def setup_ui(self):
         # --- Main Layout Configuration ---
         # Use a grid on the root to center the main content column.
@@ -246,7 +177,7 @@ class AutoTyper:
         
         # Instructions
         instructions = ttk.Label(content_frame, 
-                              text="Type or paste your text below. Mix English and Traditional Chinese freely.\nHotkeys: Ctrl+Shift+S (Start), Ctrl+Shift+X (Stop)", 
+                              text="Type or paste your text below. Mix English and Traditional Chinese freely.\nHotkeys: Ctrl+Shift+S (Start), Ctrl+Shift+X (Stop), Ctrl+Shift+P (Pause/Resume)", 
                               font=("Segoe UI", 10), anchor='center', justify=tk.CENTER)
         instructions.grid(row=1, column=0, pady=5, sticky="ew")
         
@@ -279,10 +210,9 @@ class AutoTyper:
         
         self.speed_var = tk.StringVar(value="Medium")
         speed_combo = ttk.Combobox(speed_frame, textvariable=self.speed_var, 
-                                  values=["Very Slow", "Slow", "Medium", "Fast", "Very Fast"], 
+                                  values=["Very Slow", "Slow", "Medium", "Fast", "Very Fast", "Instant"], 
                                   state="readonly", width=15)
         speed_combo.pack(side=tk.LEFT, padx=5)
-        speed_combo.bind("<<ComboboxSelected>>", self.update_speed)
         
         # Word by word option
         self.word_by_word = tk.BooleanVar(value=True)
@@ -290,6 +220,54 @@ class AutoTyper:
                                    variable=self.word_by_word, style='TCheckbutton')
         word_check.pack(side=tk.LEFT, padx=(20, 5))
         
+        ttk.Label(speed_frame, text="Keystrokes:").pack(side=tk.LEFT, padx=(20, 5))
+        self.output_backend_var = tk.StringVar(value="pyautogui")
+        backend_combo = ttk.Combobox(speed_frame, textvariable=self.output_backend_var,
+                                   values=["pyautogui", "pynput"],
+                                   state="readonly", width=10)
+        backend_combo.pack(side=tk.LEFT, padx=5)
+        
+        # --- Target rate ---
+        target_frame = ttk.Frame(self.settings_frame)
+        target_frame.pack(fill=tk.X, pady=(0, 10), padx=10)
+        
+        self.target_enabled_var = tk.BooleanVar(value=False)
+        target_check = ttk.Checkbutton(target_frame, text="Hold a target rate",
+                                     variable=self.target_enabled_var)
+        target_check.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.target_rate_var = tk.StringVar(value="85")
+        target_rate_spin = ttk.Spinbox(target_frame, from_=1, to=5000, width=6,
+                                     textvariable=self.target_rate_var)
+        target_rate_spin.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.target_unit_var = tk.StringVar(value="WPM")
+        target_unit_combo = ttk.Combobox(target_frame, textvariable=self.target_unit_var,
+                                       values=["WPM", "CPM"], state="readonly", width=6)
+        target_unit_combo.pack(side=tk.LEFT)
+        ttk.Label(target_frame, text="(CPM = characters per minute, e.g. for Chinese)").pack(side=tk.LEFT, padx=10)
+        
+        # --- Burst paste ---
+        burst_frame = ttk.Frame(self.settings_frame)
+        burst_frame.pack(fill=tk.X, pady=(0, 10), padx=10)
+        
+        self.burst_paste_var = tk.BooleanVar(value=False)
+        burst_check = ttk.Checkbutton(burst_frame, text="Burst paste Chinese runs",
+                                    variable=self.burst_paste_var)
+        burst_check.pack(side=tk.LEFT, padx=(0, 10))
+        
+        ttk.Label(burst_frame, text="Chunk:").pack(side=tk.LEFT)
+        self.burst_chunk_var = tk.StringVar(value="50")
+        burst_chunk_spin = ttk.Spinbox(burst_frame, from_=1, to=1000, width=5,
+                                     textvariable=self.burst_chunk_var)
+        burst_chunk_spin.pack(side=tk.LEFT, padx=(5, 2))
+        ttk.Label(burst_frame, text="chars").pack(side=tk.LEFT, padx=(0, 15))
+        
+        self.burst_pacing_var = tk.BooleanVar(value=True)
+        pacing_check = ttk.Checkbutton(burst_frame, text="Pace between chunks",
+                                     variable=self.burst_pacing_var)
+        pacing_check.pack(side=tk.LEFT)
+        
         # --- Chinese Input Method ---
         input_frame = ttk.Frame(self.settings_frame)
         input_frame.pack(fill=tk.X, pady=10, padx=10)
@@ -302,11 +280,25 @@ class AutoTyper:
                                  state="readonly", width=15)
         input_combo.pack(side=tk.LEFT, padx=5)
         
+        ttk.Label(input_frame, text="Layout:").pack(side=tk.LEFT, padx=(10, 5))
+        
+        self.zhuyin_layout_var = tk.StringVar(value="Standard")
+        layout_combo = ttk.Combobox(input_frame, textvariable=self.zhuyin_layout_var, 
+                                  values=list(KEYBOARD_LAYOUTS), 
+                                  state="readonly", width=10)
+        layout_combo.pack(side=tk.LEFT, padx=5)
+        
         help_btn = ttk.Button(input_frame, text="❓ Setup", command=self.show_input_help, width=10)
         help_btn.pack(side=tk.LEFT, padx=5)
         
         test_btn = ttk.Button(input_frame, text="🔬 Test", command=self.test_mappings, width=10)
         test_btn.pack(side=tk.LEFT, padx=5)
+        
+        calibrate_btn = ttk.Button(input_frame, text="⏱ Calibrate", command=self.calibrate_zhuyin, width=12)
+        calibrate_btn.pack(side=tk.LEFT, padx=5)
+        
+        dict_btn = ttk.Button(input_frame, text="📖 Dictionary", command=self.show_user_dictionary, width=12)
+        dict_btn.pack(side=tk.LEFT, padx=5)
 
         # --- Human-like Features ---
         human_frame = ttk.Frame(self.settings_frame)
@@ -337,7 +329,19 @@ class AutoTyper:
         self.speed_variation_var = tk.BooleanVar(value=True)
         speed_var_check = ttk.Checkbutton(speed_var_frame, text="Variable typing speed", 
                                        variable=self.speed_variation_var)
-        speed_var_check.pack(side=tk.LEFT)
+        speed_var_check.pack(side=tk.LEFT, padx=(0, 15))
+        
+        ttk.Label(speed_var_frame, text="Delays:").pack(side=tk.LEFT, padx=(0, 5))
+        self.delay_distribution_var = tk.StringVar(value="Uniform")
+        distribution_combo = ttk.Combobox(speed_var_frame, textvariable=self.delay_distribution_var,
+                                        values=list(DISTRIBUTIONS), state="readonly", width=10)
+        distribution_combo.pack(side=tk.LEFT, padx=(0, 15))
+        
+        ttk.Label(speed_var_frame, text="Seed:").pack(side=tk.LEFT, padx=(0, 5))
+        self.seed_var = tk.StringVar(value="")
+        seed_entry = ttk.Entry(speed_var_frame, textvariable=self.seed_var, width=12)
+        seed_entry.pack(side=tk.LEFT)
+        ttk.Label(speed_var_frame, text="(blank = random)").pack(side=tk.LEFT, padx=5)
         
         # Thinking pauses settings
         pause_frame = ttk.Frame(human_frame)
@@ -388,48 +392,108 @@ class AutoTyper:
         button_frame.grid(row=4, column=0, pady=20)
         
         self.start_btn = ttk.Button(button_frame, text="▶ Start Typing", 
-                                  command=self.start_typing, style='Success.TButton')
+                                  command=lambda: self.bus.post('start'), style='Success.TButton')
         self.start_btn.pack(side=tk.LEFT, padx=10, ipady=10, ipadx=10)
         
         self.stop_btn = ttk.Button(button_frame, text="⏹ Stop Typing", 
-                                 command=self.stop_typing_action, style='Error.TButton', state='disabled')
+                                 command=lambda: self.bus.post('stop'), style='Error.TButton', state='disabled')
         self.stop_btn.pack(side=tk.LEFT, padx=10, ipady=10, ipadx=10)
         
+        self.pause_btn = ttk.Button(button_frame, text="⏸ Pause", width=10,
+                                  command=lambda: self.bus.post('pause'), state='disabled')
+        self.pause_btn.pack(side=tk.LEFT, padx=10, ipady=10, ipadx=10)
+        
+        # Plan tools: inspect, save and replay a run without typing it live
+        plan_frame = ttk.Frame(button_frame)
+        plan_frame.pack(side=tk.LEFT, padx=10)
+        ttk.Button(plan_frame, text="🧪 Dry Run", command=self.dry_run, width=14).pack(pady=2)
+        ttk.Button(plan_frame, text="💾 Export Plan", command=self.export_plan, width=14).pack(pady=2)
+        ttk.Button(plan_frame, text="📂 Replay Plan", command=self.replay_plan, width=14).pack(pady=2)
+        ttk.Button(plan_frame, text="📄 Type File", command=self.type_file, width=14).pack(pady=2)
+        
         # Status label
         self.status_label = ttk.Label(content_frame, text="Ready to type", 
                                     font=("Segoe UI", 10, "italic"), anchor='center')
         self.status_label.grid(row=5, column=0, pady=10, sticky="ew")
 
+    def setup_bus(self):
+        """Register the handlers for bus messages and start draining the bus on the Tk thread"""
+        # Commands, posted by the buttons and (through 'hotkey') the global hotkeys
+        self.commands = {
+            'start': self.start_typing,
+            'stop': self.stop_typing_action,
+            'pause': self.toggle_pause_action,
+        }
+        for name, handler in self.commands.items():
+            self.bus.subscribe(name, handler)
+        self.bus.subscribe('hotkey', self.on_hotkey)
+        
+        # Events from the typing thread
+        self.bus.subscribe('status', self.set_status)
+        self.bus.subscribe('progress', self.show_progress)
+        self.bus.subscribe('error', lambda *args: self.show_dialog(messagebox.showerror, *args))
+        self.bus.subscribe('run_finished', self.end_run)
+        self.poll_bus()
+        
+    def poll_bus(self):
+        """Handle every queued bus message, then check again after POLL_INTERVAL ms"""
+        try:
+            self.bus.drain()
+        finally:
+            self.root.after(POLL_INTERVAL, self.poll_bus)
+            
+    def show_dialog(self, dialog, *args):
+        """Open a messagebox after the current bus drain, so the bus keeps draining behind it"""
+        # A modal dialog opened inside drain() would hold up every later message until it closed
+        self.root.after(0, dialog, *args)
+        
+    def on_hotkey(self, command):
+        """Run a hotkey's command and show how long the hotkey took to reach it"""
+        self.commands[command]()
+        if command != 'start' and self.is_typing:
+            latency = self.bus.last_latency('hotkey') * 1000
+            self.set_status(f"{self.status_label.cget('text')} (hotkey {latency:.1f} ms)")
+            
     def setup_hotkeys(self):
         """Setup global hotkeys"""
-        def on_start_hotkey():
-            if not self.is_typing:
-                self.start_typing()
-                
-        def on_stop_hotkey():
-            if self.is_typing:
-                self.stop_typing_action()
+        from pynput import keyboard
         
-        # Setup keyboard listener for hotkeys
+        # The listener thread only posts to the bus; the commands run on the Tk thread
         self.hotkey_listener = keyboard.GlobalHotKeys({
-            '<ctrl>+<shift>+s': on_start_hotkey,
-            '<ctrl>+<shift>+x': on_stop_hotkey
+            '<ctrl>+<shift>+s': lambda: self.bus.post('hotkey', 'start'),
+            '<ctrl>+<shift>+x': lambda: self.bus.post('hotkey', 'stop'),
+            '<ctrl>+<shift>+p': lambda: self.bus.post('hotkey', 'pause')
         })
         self.hotkey_listener.start()
-        
-    def update_speed(self, event=None):
-        """Update typing speed based on selection"""
-        speed = self.speed_var.get()
-        speed_settings = {
-            "Very Slow": (0.1, 0.3, 0.5, 1.2),
-            "Slow": (0.08, 0.2, 0.4, 1.0),
-            "Medium": (0.05, 0.15, 0.3, 0.8),
-            "Fast": (0.03, 0.1, 0.2, 0.5),
-            "Very Fast": (0.01, 0.05, 0.1, 0.3)
-        }
-        
-        if speed in speed_settings:
-            self.min_delay, self.max_delay, self.word_delay, self.sentence_delay = speed_settings[speed]
+        self.profile.mark("hotkeys")
+        
+    def read_config(self):
+        """Validate the settings widgets and freeze them for a run; raises ValueError on bad input"""
+        return build_config({
+            'speed': self.speed_var.get(),
+            'word_by_word': self.word_by_word.get(),
+            'output_backend': self.output_backend_var.get(),
+            'input_method': self.input_method_var.get(),
+            'layout': self.zhuyin_layout_var.get(),
+            'burst_paste': self.burst_paste_var.get(),
+            'burst_chunk': self.burst_chunk_var.get(),
+            'burst_pacing': self.burst_pacing_var.get(),
+            'enable_errors': self.enable_errors_var.get(),
+            'error_rate': self.error_rate_var.get(),
+            'auto_correct': self.auto_correct_var.get(),
+            'correction_rate': self.correction_rate_var.get(),
+            'speed_variation': self.speed_variation_var.get(),
+            'thinking_pauses': self.thinking_pauses_var.get(),
+            'pause_freq': self.pause_freq_var.get(),
+            'min_pause': self.min_pause_var.get(),
+            'max_pause': self.max_pause_var.get(),
+            'target_enabled': self.target_enabled_var.get(),
+            'target_rate': self.target_rate_var.get(),
+            'target_unit': self.target_unit_var.get(),
+            'seed': self.seed_var.get(),
+            'delay_distribution': self.delay_distribution_var.get(),
+            'learn': True,
+        })
             
     def load_sample_text(self):
         """Load sample text mixing English and Traditional Chinese with error-prone content"""
@@ -470,7 +534,8 @@ This is a good practice for typing both English and Traditional Chinese characte
 ---
 **ZHUYIN SETUP GUIDE**
 1. Enable **Microsoft Bopomofo** IME in Windows settings.
-2. Switch to Chinese input mode (**Win + Space**).
+2. Switch to Chinese input mode (**Win + Space**) and pick the
+   matching keyboard **Layout** (Standard, ETen or Hsu).
 3. Ensure the cursor is in the target application before starting.
 4. Use the "**🔬 Test**" button to verify mappings.
 ---
@@ -502,488 +567,355 @@ This is a good practice for typing both English and Traditional Chinese characte
         top.grab_set()
         self.root.wait_window(top)
         
-    def get_typing_delay(self, char_type='normal'):
-        """Get random delay to simulate human typing with variation"""
-        base_delay = random.uniform(self.min_delay, self.max_delay)
-        
-        if self.speed_variation_var.get():
-            # Different speeds for different character types
-            if char_type == 'chinese':
-                # Chinese characters typically take longer
-                base_delay *= random.uniform(1.5, 2.5)
-            elif char_type == 'english':
-                # English characters are faster
-                base_delay *= random.uniform(0.8, 1.2)
-            elif char_type == 'punctuation':
-                # Punctuation has moderate speed
-                base_delay *= random.uniform(1.0, 1.5)
+    def show_user_dictionary(self):
+        """Show a dialog for adding words to the user dictionary"""
+        top = tk.Toplevel(self.root)
+        top.title("User Dictionary")
+        top.geometry("420x220")
+        top.configure(bg=self.bg_color)
+        
+        form = ttk.Frame(top, padding=20)
+        form.pack(expand=True, fill=tk.BOTH)
+        form.grid_columnconfigure(1, weight=1)
+        
+        ttk.Label(form, text="Zhuyin:").grid(row=0, column=0, sticky="w", pady=5)
+        zhuyin_entry = ttk.Entry(form)
+        zhuyin_entry.grid(row=0, column=1, sticky="ew", pady=5)
+        ttk.Label(form, text="Phrase:").grid(row=1, column=0, sticky="w", pady=5)
+        phrase_entry = ttk.Entry(form)
+        phrase_entry.grid(row=1, column=1, sticky="ew", pady=5)
+        
+        result_label = ttk.Label(form, text="Entries are saved for future sessions.")
+        result_label.grid(row=3, column=0, columnspan=2, pady=10)
+        
+        def add_entry():
+            zhuyin = zhuyin_entry.get().strip()
+            phrase = phrase_entry.get().strip()
+            if not zhuyin or not phrase:
+                result_label.config(text="Enter both a Zhuyin reading and a phrase.")
+                return
+            try:
+                # A typing run may be learning from its text and saving at the same time
+                with USER_DICTIONARY_LOCK:
+                    add_user_entry(zhuyin, phrase)
+                    save_user_dictionary()
+            except ValueError as e:
+                result_label.config(text=str(e))
+                return
+            result_label.config(text=f"Added '{phrase}' → {zhuyin}")
+            zhuyin_entry.delete(0, tk.END)
+            phrase_entry.delete(0, tk.END)
             
-            # Add random variation to simulate human inconsistency
-            variation = random.uniform(0.5, 2.0)
-            base_delay *= variation
+        def import_file():
+            path = filedialog.askopenfilename(parent=top, title="Import reading<TAB>phrase list",
+                                              filetypes=[("Text files", "*.txt *.tsv"), ("All files", "*.*")])
+            if not path:
+                return
+            try:
+                with open(path, encoding='utf-8') as f, USER_DICTIONARY_LOCK:
+                    count = import_user_entries(f)
+                    save_user_dictionary()
+            except (OSError, ValueError) as e:
+                result_label.config(text=f"Import failed: {e}")
+                return
+            result_label.config(text=f"Imported {count} entries from {path}")
+        
+        button_row = ttk.Frame(form)
+        button_row.grid(row=2, column=0, columnspan=2, pady=5)
+        ttk.Button(button_row, text="Add", command=add_entry, style="Success.TButton").pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_row, text="Import File...", command=import_file).pack(side=tk.LEFT, padx=5)
+        
+        top.transient(self.root)
+        
+    def show_status(self, message):
+        """Show a message in the status line; safe to call from the typing thread"""
+        self.bus.post('status', message)
+        
+    def set_status(self, message):
+        """Show a message in the status line (Tk thread)"""
+        self.status_label.config(text=message)
+        
+    def show_progress(self, typed):
+        """Show the achieved rate of a target-rate run in the status line, at most every status_interval"""
+        if self.engine.rate_controller is None:
+            return
+        now = time.perf_counter()
+        if now - self.last_status_time >= self.status_interval:
+            self.last_status_time = now
+            self.set_status(f"Typing in progress... {self.engine.rate_controller.status()}")
             
-            # Occasionally add longer pauses (fatigue, distraction)
-            if random.random() < 0.05:  # 5% chance
-                base_delay += random.uniform(0.3, 1.0)
-        
-        return max(0.01, base_delay)  # Ensure minimum delay
-    
-    def should_make_error(self):
-        """Determine if an error should be made"""
-        if not self.enable_errors_var.get():
-            return False
-        error_rate = float(self.error_rate_var.get()) / 100.0
-        return random.random() < error_rate
-    
-    def should_correct_error(self):
-        """Determine if an error should be corrected"""
-        if not self.auto_correct_var.get():
-            return False
-        correction_rate = float(self.correction_rate_var.get()) / 100.0
-        return random.random() < correction_rate
-    
-    def should_pause_for_thinking(self):
-        """Determine if should pause for thinking based on UI settings"""
-        if not self.thinking_pauses_var.get():
-            return False
-        try:
-            pause_rate = float(self.pause_freq_var.get()) / 100.0
-            return random.random() < pause_rate
-        except ValueError:
-            return False  # Default to no pause if value is invalid
-    
-    def get_thinking_pause(self):
-        """Get thinking pause duration from UI settings"""
+    def typing_worker(self, text=None, plan=None, chunks=None):
+        """Worker thread for typing text, streamed text `chunks` (e.g. from a file), or a saved plan"""
+        message = None
         try:
-            min_d = float(self.min_pause_var.get())
-            max_d = float(self.max_pause_var.get())
-            # Ensure min is not greater than max
-            if min_d > max_d:
-                min_d = max_d
-            return random.uniform(min_d, max_d)
-        except ValueError:
-            return random.uniform(0.5, 2.0)  # Return default on invalid value
-    
-    def simulate_error(self, char):
-        """Simulate a typing error for the given character"""
-        if is_chinese_character(char):
-            # Try homophone error first
-            if char in self.homophone_errors:
-                return random.choice(self.homophone_errors[char])
-            # Try similar character error
-            elif char in self.similar_char_errors:
-                return random.choice(self.similar_char_errors[char])
-            # Random character replacement (rare)
-            elif random.random() < 0.3:
-                similar_chars = list(self.homophone_errors.keys()) + list(self.similar_char_errors.keys())
-                return random.choice(similar_chars)
-        else:
-            # English character errors
-            if char.lower() in 'aeiou':  # Vowel confusion
-                vowels = 'aeiou'
-                return random.choice([v for v in vowels if v != char.lower()])
-            elif char.lower() in 'qwertyuiop':  # Adjacent key errors
-                adjacent = {'q': 'wa', 'w': 'qes', 'e': 'wrd', 'r': 'etf', 't': 'ryg',
-                           'y': 'tuh', 'u': 'yij', 'i': 'uok', 'o': 'ipl', 'p': 'ol'}
-                if char.lower() in adjacent:
-                    return random.choice(adjacent[char.lower()])
-            # Random adjacent character
-            keyboard_layout = 'qwertyuiopasdfghjklzxcvbnm'
-            idx = keyboard_layout.find(char.lower())
-            if idx >= 0:
-                # Pick adjacent character
-                choices = []
-                if idx > 0: choices.append(keyboard_layout[idx-1])
-                if idx < len(keyboard_layout)-1: choices.append(keyboard_layout[idx+1])
-                if choices:
-                    return random.choice(choices)
-        
-        return char  # Return original if no error pattern found
-    
-    def type_with_corrections(self, text_to_type):
-        """Type text with error correction simulation"""
-        errors_made = []  # Track errors for correction
-        
-        for char in text_to_type:
-            if self.stop_typing:
-                break
-                
-            # Thinking pause before difficult characters
-            if self.should_pause_for_thinking() and (is_chinese_character(char) or char in self.paste_chars):
-                time.sleep(self.get_thinking_pause())
-                
-            # Determine if error should be made
-            if self.should_make_error():
-                error_char = self.simulate_error(char)
-                if error_char != char:
-                    # Type the wrong character first
-                    if is_chinese_character(error_char) or error_char in self.paste_chars:
-                        pyperclip.copy(error_char)
-                        pyautogui.hotkey('ctrl', 'v')
-                    else:
-                        pyautogui.write(error_char)
-                    
-                    char_type = 'chinese' if is_chinese_character(error_char) or error_char in self.paste_chars else 'english'
-                    time.sleep(self.get_typing_delay(char_type))
-                    
-                    # Store error for potential correction
-                    errors_made.append((error_char, char))
-                    
-                    # Decide whether to correct immediately or later
-                    if self.should_correct_error():
-                        correction_delay = random.uniform(0.2, 1.5)
-                        time.sleep(correction_delay)
-                        
-                        # Backspace to remove error
-                        pyautogui.press('backspace')
-                        time.sleep(0.1)
-                        
-                        # Type correct character
-                        if is_chinese_character(char) or char in self.paste_chars:
-                            pyperclip.copy(char)
-                            pyautogui.hotkey('ctrl', 'v')
-                        else:
-                            pyautogui.write(char)
-                        
-                        char_type = 'chinese' if is_chinese_character(char) or char in self.paste_chars else 'english'
-                        time.sleep(self.get_typing_delay(char_type))
-                        
-                        # Remove from errors list
-                        errors_made = [e for e in errors_made if e[1] != char]
-                    continue
-            
-            # --- Type correct character (no error made) ---
-            
-            # Handle CJK characters and punctuation that need pasting
-            if is_chinese_character(char) or char in self.paste_chars:
-                pyperclip.copy(char)
-                pyautogui.hotkey('ctrl', 'v')
-                char_type = 'chinese'
-            
-            # Handle English characters and punctuation
-            else:
-                # Simulate English punctuation being corrected to Chinese punctuation
-                if char in self.punctuation_errors and random.random() < 0.3:
-                    chinese_punc = self.punctuation_errors[char]
-                    # Simulate typing English punc, backspace, then Chinese punc
-                    if random.random() < 0.5:
-                        pyautogui.write(char)  # Type English punc like '.'
-                        time.sleep(0.2)
-                        pyautogui.press('backspace')
-                        time.sleep(0.1)
-                        pyperclip.copy(chinese_punc)  # Paste Chinese punc like '。'
-                        pyautogui.hotkey('ctrl', 'v')
-                    else: # Or just "correctly" type the Chinese punc
-                        pyperclip.copy(chinese_punc)
-                        pyautogui.hotkey('ctrl', 'v')
-                    
-                    char_type = 'punctuation'
+            result = self.engine.run(text, plan, chunks, start_delay=3, on_status=self.show_status)
+            if result is not None:
+                summary = self.engine.run_summary(result)
+                if result['completed']:
+                    message = f"Typing completed! {summary}"
                 else:
-                    # Type normal English characters and punctuation
-                    pyautogui.write(char)
-                    char_type = 'punctuation' if char in '.,!?;:()' else 'english'
-            
-            time.sleep(self.get_typing_delay(char_type))
-    
-    def find_zhuyin_for_character(self, char):
-        """Find Zhuyin pronunciation for a given character"""
-        for zhuyin, chinese_char in ZHUYIN_TO_CHINESE.items():
-            if char == chinese_char:
-                return zhuyin
-        return None
-        
-    def simulate_zhuyin_input(self, chinese_char):
-        """Simulate Chinese character input based on selected method"""
-        input_method = self.input_method_var.get()
-        
-        if input_method == "Direct":
-            # Try direct character input
-            try:
-                pyautogui.write(chinese_char)
-                time.sleep(self.get_typing_delay('chinese'))
-                return True
-            except:
-                # Fallback to copy-paste
-                pyperclip.copy(chinese_char)
-                pyautogui.hotkey('ctrl', 'v')
-                time.sleep(self.get_typing_delay('chinese'))
-                return True
-                
-        elif input_method == "Copy-Paste":
-            # Use copy-paste method with human-like features
-            try:
-                pyperclip.copy(chinese_char)
-                pyautogui.hotkey('ctrl', 'v')
-                time.sleep(self.get_typing_delay('chinese'))
-                return True
-            except:
-                return False
+                    message = f"Typing stopped by user. {summary}"
                 
-        elif input_method == "Zhuyin":
-            # Improved Zhuyin input method
-            zhuyin = self.find_zhuyin_for_character(chinese_char)
+        except Exception as e:
+            self.bus.post('error', "Error", f"An error occurred: {str(e)}")
+        finally:
+            self.bus.post('run_finished', message)
             
-            if zhuyin:
-                try:
-                    # Debug output
-                    print(f"Typing '{chinese_char}' using Zhuyin: {zhuyin}")
-                    
-                    # Convert Zhuyin to keyboard keys
-                    keys = self.convert_zhuyin_to_keys(zhuyin)
-                    print(f"Keyboard keys: {keys}")
-                    
-                    if not keys:
-                        # Fallback to copy-paste if no key mapping
-                        pyperclip.copy(chinese_char)
-                        pyautogui.hotkey('ctrl', 'v')
-                        time.sleep(self.get_typing_delay())
-                        return True
-                    
-                    # Type each key with proper timing
-                    for key in keys:
-                        if self.stop_typing:
-                            return False
-                        pyautogui.press(key)
-                        time.sleep(0.05)  # Small delay between keys
-                    
-                    # Wait for candidate window to appear
-                    time.sleep(0.3)
-                    
-                    # Press space to select first candidate
-                    pyautogui.press('space')
-                    time.sleep(self.get_typing_delay('chinese'))
-                    
-                    return True
-                    
-                except Exception as e:
-                    print(f"Zhuyin error for '{chinese_char}': {e}")
-                    # Fallback to copy-paste
-                    try:
-                        pyperclip.copy(chinese_char)
-                        pyautogui.hotkey('ctrl', 'v')
-                        time.sleep(self.get_typing_delay('chinese'))
-                        return True
-                    except:
-                        return False
-            else:
-                # No Zhuyin mapping found, use copy-paste
-                print(f"No Zhuyin mapping found for '{chinese_char}', using copy-paste")
-                try:
-                    pyperclip.copy(chinese_char)
-                    pyautogui.hotkey('ctrl', 'v')
-                    time.sleep(self.get_typing_delay('chinese'))
-                    return True
-                except:
-                    return False
-        
-        return True
-    
-    def convert_zhuyin_to_keys(self, zhuyin):
-        """Convert Zhuyin symbols to keyboard keys for Microsoft Bopomofo (IMPROVED)"""
-        # Updated and more comprehensive Microsoft Bopomofo keyboard mapping
-        zhuyin_to_key = {
-            # Initials - Row 1 (numbers)
-            'ㄅ': '1', 'ㄉ': '2', 'ㄓ': '3', 'ㄏ': '4', 'ㄐ': '5',
-            'ㄔ': '6', 'ㄗ': '7', 'ㄘ': '8', 'ㄙ': '9', 'ㄖ': '0',
+    def end_run(self, message=None):
+        """Show a finished run's outcome and re-enable the controls (Tk thread)"""
+        if message is not None:
+            hotkeys = self.bus.latency_summary('hotkey')
+            self.set_status(f"{message}; hotkey to action {hotkeys}" if hotkeys else message)
+        self.is_typing = False
+        self.engine.stop_typing = False
+        self.start_btn.config(state='normal')
+        self.stop_btn.config(state='disabled')
+        self.pause_btn.config(state='disabled', text="⏸ Pause")
+        
+    def open_output(self):
+        """Create the selected keystroke output backend; returns False if it is unavailable"""
+        try:
+            self.engine.open_output()
+            return True
+        except Exception as e:
+            self.show_dialog(messagebox.showerror, "Error",
+                             f"Could not start the {self.engine.config.output_backend} backend: {e}")
+            return False
             
-            # Initials - Row 2 (QWERTY)
-            'ㄆ': 'q', 'ㄊ': 'w', 'ㄍ': 'e', 'ㄎ': 'r', 'ㄑ': 't',
-            'ㄕ': 'y', 'ㄞ': 'u', 'ㄟ': 'i', 'ㄠ': 'o', 'ㄡ': 'p',
+    def start_typing(self):
+        """Start the typing process"""
+        if self.is_typing:
+            return
+        text = self.get_text()
+        if text:
+            self.begin_run(text=text)
             
-            # Initials - Row 3 (ASDF)
-            'ㄇ': 'a', 'ㄋ': 's', 'ㄌ': 'd', 'ㄒ': 'f', 'ㄢ': 'g',
-            'ㄣ': 'h', 'ㄤ': 'j', 'ㄥ': 'k', 'ㄦ': 'l', 'ㄧ': ';',
+    def get_text(self):
+        """Get the text to type, warning the user and returning None if it is empty"""
+        # Get text from text area, correctly handling the final newline
+        text = self.text_area.get('1.0', tk.END).rstrip('\n').strip()
+        if not text:
+            self.show_dialog(messagebox.showwarning, "Warning", "Please enter some text to type.")
+            return None
+        return text
+        
+    def begin_run(self, text=None, plan=None, chunks=None):
+        """Start the typing thread for text, streamed text chunks, or a saved plan"""
+        if not self.load_config() or not self.open_output():
+            return
             
-            # Finals - Row 4 (ZXCV)
-            'ㄈ': 'z', 'ㄨ': 'x', 'ㄩ': 'c', 'ㄚ': 'v', 'ㄛ': 'b',
-            'ㄜ': 'n', 'ㄝ': 'm', 'ㄤ': 'j', 'ㄥ': 'k',
+        self.is_typing = True
+        self.engine.stop_typing = False
+        self.engine.update_zhuyin_timing()
+        self.start_btn.config(state='disabled')
+        self.stop_btn.config(state='normal')
+        self.pause_btn.config(state='normal')
+        
+        # Start typing in a separate thread
+        self.typing_thread = threading.Thread(target=self.typing_worker, args=(text, plan, chunks), daemon=True)
+        self.typing_thread.start()
+        
+    def prepare_plan(self):
+        """Compile the current text and settings into a plan without typing; None if that isn't possible"""
+        if self.is_typing:
+            return None
+        text = self.get_text()
+        if not text or not self.load_config():
+            return None
+        self.engine.update_zhuyin_timing()
+        return self.engine.compile_plan(text)
+        
+    def dry_run(self):
+        """Show what a run of the current text would do and how long it would take"""
+        plan = self.prepare_plan()
+        if plan is not None:
+            messagebox.showinfo("Dry Run", plan.summary())
             
-            # Tone marks - typically on number row with different combinations
-            # 'ˊ': '/', '˙': ',', 'ˇ': '-', 'ˋ': '.', # Removed direct tone key mappings
-            # '': ''  # No tone (first tone) -> This entry is not needed if tones are handled by IME
-        }
+    def export_plan(self):
+        """Save the plan for the current text as JSONL"""
+        plan = self.prepare_plan()
+        if plan is None:
+            return
+        path = filedialog.asksaveasfilename(title="Export typing plan", defaultextension=".jsonl",
+                                            filetypes=[("Typing plans", "*.jsonl"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            plan.save(path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Could not export plan: {e}")
+            return
+        self.status_label.config(text=f"Exported plan to {path}: {plan.summary()}")
         
-        keys = []
-        tone_symbols = ['ˊ', 'ˇ', 'ˋ', '˙'] # Define tone symbols to ignore for direct key press
-        for char_zhuyin in zhuyin: # Renamed char to char_zhuyin for clarity
-            if char_zhuyin in tone_symbols:
-                continue # Skip direct key press for tone symbols
-            if char_zhuyin in zhuyin_to_key:
-                key = zhuyin_to_key[char_zhuyin]
-                if key:  # Only add non-empty keys
-                    keys.append(key)
-            else:
-                # Allow empty string for cases like first tone where no symbol is present
-                if char_zhuyin != '':
-                    print(f"Warning: No key mapping for Zhuyin character '{char_zhuyin}'")
+    def replay_plan(self):
+        """Type a saved plan with its exact events and timing"""
+        if self.is_typing:
+            return
+        path = filedialog.askopenfilename(title="Replay typing plan",
+                                          filetypes=[("Typing plans", "*.jsonl"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            plan = TypingPlan.load(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not load plan: {e}")
+            return
+        self.begin_run(plan=plan)
         
-        return keys
+    def type_file(self):
+        """Type a text file straight from disk, streaming it instead of loading it into the editor"""
+        if self.is_typing:
+            return
+        path = filedialog.askopenfilename(title="Type text file",
+                                          filetypes=[("Text files", "*.txt"), ("All files", "*.*")])
+        if not path:
+            return
+        if not os.access(path, os.R_OK):
+            messagebox.showerror("Error", f"Cannot read {path}")
+            return
+        self.begin_run(chunks=file_chunks(path))
         
-    def type_text_word_by_word(self, text):
-        """Type text word by word with human-like features"""
-        # Split text into words, preserving spaces and punctuation
-        words = re.findall(r'\S+|\s+', text)
+    def load_config(self):
+        """Freeze the current settings into the engine's config; returns False if any value is invalid"""
+        try:
+            self.engine.config = self.read_config()
+            return True
+        except ValueError as e:
+            self.show_dialog(messagebox.showerror, "Invalid Settings", str(e))
+            return False
+            
+    def calibrate_zhuyin(self):
+        """Find the smallest Zhuyin key/commit waits the local IME still handles reliably"""
+        if self.is_typing or not self.load_config() or not self.open_output():
+            return
         
-        for word in words:
-            if self.stop_typing:
-                break
-                
-            word = word.strip()
-            if not word:
-                pyautogui.write(' ')
-                time.sleep(self.word_delay)
-                continue
+        top = tk.Toplevel(self.root)
+        top.title("Zhuyin Calibration")
+        top.geometry("420x220")
+        top.configure(bg=self.bg_color)
+        ttk.Label(top, text="Switch this window to your Bopomofo IME.\n"
+                            "Calibration types into the box below; don't touch the keyboard.",
+                  justify=tk.CENTER).pack(pady=10)
+        target = tk.Text(top, height=3, font=("Segoe UI", 12),
+                         bg=self.frame_color, fg=self.fg_color, insertbackground=self.fg_color)
+        target.pack(fill=tk.X, padx=10)
+        target.focus_set()
+        
+        # The worker clears and reads the target box through the bus
+        def finish():
+            top.destroy()
+            self.end_run()
             
-            # Check for whole word errors (English words)
-            if not any(is_chinese_character(c) for c in word):
-                # This is an English word, check for common word errors
-                word_lower = word.lower()
-                if word_lower in self.english_errors and self.should_make_error():
-                    error_word = random.choice(self.english_errors[word_lower])
-                    
-                    # Type the wrong word
-                    pyautogui.write(error_word)
-                    time.sleep(self.get_typing_delay('english') * len(error_word))
-                    
-                    # Correct if should correct
-                    if self.should_correct_error():
-                        correction_delay = random.uniform(0.5, 2.0)
-                        time.sleep(correction_delay)
-                        
-                        # Select and delete wrong word
-                        for _ in range(len(error_word)):
-                            pyautogui.press('backspace')
-                            time.sleep(0.05)
-                        
-                        # Type correct word
-                        self.type_with_corrections(word)
-                    
-                    # Add space after word (except for punctuation)
-                    if word and not word[-1] in '.,!?;:，。！？；：':
-                        pyautogui.write(' ')
-                    
-                    # Pause between words
-                    time.sleep(self.word_delay)
-                    continue
+        self.bus.subscribe('calibration_clear', lambda: target.delete('1.0', tk.END))
+        self.bus.subscribe('calibration_text', lambda: target.get('1.0', tk.END).strip())
+        self.bus.subscribe('calibration_finished', finish)
+        
+        profile = get_ime_profile(self.engine.config.layout)
+        self.is_typing = True
+        self.engine.stop_typing = False
+        self.start_btn.config(state='disabled')
+        self.stop_btn.config(state='normal')
+        threading.Thread(target=self.calibration_worker, args=(profile,), daemon=True).start()
+        
+    def calibration_worker(self, profile):
+        """Worker thread that types the calibration text at decreasing waits"""
+        engine = self.engine
+        # Waits end at once on Stop and hold while paused, like a typing run's
+        wait = engine.control.wait
+        
+        def run_trial(key_delay, commit_delay):
+            if engine.stop_typing:
+                return False
+            self.bus.post('calibration_clear')
+            self.show_status(f"Calibrating: {key_delay * 1000:.0f} ms keys, {commit_delay * 1000:.0f} ms commit")
+            if not wait(0.3):
+                return False
             
-            # Type word character by character with human-like features
-            self.type_with_corrections(word)
-                    
-            # Add space after word (except for punctuation)
-            if word and not word[-1] in '.,!?;:，。！？；：':
-                pyautogui.write(' ')
-                
-            # Pause between words with variation
-            word_pause = self.word_delay
-            if self.speed_variation_var.get():
-                word_pause *= random.uniform(0.5, 1.5)
-            time.sleep(word_pause)
+            engine.zhuyin_key_delay, engine.zhuyin_commit_delay = key_delay, commit_delay
+            engine.plan = TypingPlan()
+            for char in CALIBRATION_TEXT:
+                zhuyin, rank = find_candidate(char)
+                engine.type_zhuyin_keys(engine.convert_zhuyin_to_keys(zhuyin), rank)
+            engine.scheduler.start()
+            if not engine.play_plan(engine.plan.events):
+                return False
             
-            # Longer pause after sentences
-            if word and word[-1] in '.!?。！？':
-                sentence_pause = self.sentence_delay
-                if self.speed_variation_var.get():
-                    sentence_pause *= random.uniform(0.8, 2.0)
-                time.sleep(sentence_pause)
-                
-    def type_text_character_by_character(self, text):
-        """Type text character by character with human-like features"""
-        for char in text:
-            if self.stop_typing:
-                break
-                
-            if char == '\n':
-                pyautogui.press('enter')
-                pause = self.sentence_delay
-                if self.speed_variation_var.get():
-                    pause *= random.uniform(0.5, 1.5)
-                time.sleep(pause)
-            elif char == ' ':
-                pyautogui.write(' ')
-                pause = self.word_delay
-                if self.speed_variation_var.get():
-                    pause *= random.uniform(0.3, 1.2)
-                time.sleep(pause)
-            else:
-                # Use human-like typing for each character
-                self.type_with_corrections(char)
-                
-            # Longer pause after sentences
-            if char in '.!?。！？':
-                sentence_pause = self.sentence_delay
-                if self.speed_variation_var.get():
-                    sentence_pause *= random.uniform(0.8, 2.0)
-                time.sleep(sentence_pause)
-                
-    def typing_worker(self):
-        """Worker thread for typing"""
+            # Let the IME flush its last commit before checking the result
+            if not wait(0.5):
+                return False
+            try:
+                return self.bus.request('calibration_text') == CALIBRATION_TEXT
+            except queue.Empty:
+                raise TimeoutError("the GUI did not respond") from None
+        
         try:
-            # Get text from text area, correctly handling the final newline
-            text = self.text_area.get('1.0', tk.END).rstrip('\n').strip()
-            if not text:
-                self.root.after(0, lambda: messagebox.showwarning("Warning", "Please enter some text to type."))
-                return
-                
-            # Give user time to switch to target application
+            # Give the user time to switch the IME on
             for i in range(3, 0, -1):
-                if self.stop_typing:
+                if engine.stop_typing:
+                    return
+                self.show_status(f"Calibration starts in {i}...")
+                if not wait(1):
+                    self.show_status("Calibration stopped.")
                     return
-                self.root.after(0, lambda i=i: self.status_label.config(text=f"Starting in {i}..."))
-                time.sleep(1)
-                
-            self.root.after(0, lambda: self.status_label.config(text="Typing in progress..."))
             
-            # Type the text
-            if self.word_by_word.get():
-                self.type_text_word_by_word(text)
-            else:
-                self.type_text_character_by_character(text)
-                
-            if not self.stop_typing:
-                self.root.after(0, lambda: self.status_label.config(text="Typing completed!"))
+            timing = calibrate(run_trial)
+            if engine.stop_typing:
+                message = "Calibration stopped."
+            elif timing is None:
+                message = "Calibration failed: the IME did not produce the expected text."
             else:
-                self.root.after(0, lambda: self.status_label.config(text="Typing stopped by user."))
-                
+                save_calibration(profile, timing)
+                message = (f"Calibrated {profile}: {timing[0] * 1000:.0f} ms between keys, "
+                           f"{timing[1] * 1000:.0f} ms before commit")
+            self.show_status(message)
         except Exception as e:
-            self.root.after(0, lambda: messagebox.showerror("Error", f"An error occurred: {str(e)}"))
+            self.bus.post('error', "Error", f"Calibration failed: {str(e)}")
         finally:
-            self.is_typing = False
-            self.stop_typing = False
-            self.root.after(0, lambda: self.start_btn.config(state='normal'))
-            self.root.after(0, lambda: self.stop_btn.config(state='disabled'))
+            self.bus.post('calibration_finished')
             
-    def start_typing(self):
-        """Start the typing process"""
-        if self.is_typing:
-            return
-            
-        self.is_typing = True
-        self.stop_typing = False
-        self.start_btn.config(state='disabled')
-        self.stop_btn.config(state='normal')
-        
-        # Start typing in a separate thread
-        self.typing_thread = threading.Thread(target=self.typing_worker, daemon=True)
-        self.typing_thread.start()
-        
     def stop_typing_action(self):
         """Stop the typing process"""
         if self.is_typing:
-            self.stop_typing = True
+            self.engine.stop()
             self.status_label.config(text="Stopping...")
             self.stop_btn.config(state='disabled')
+            self.pause_btn.config(state='disabled')
+            
+    def toggle_pause_action(self):
+        """Pause the typing process where it is, or resume it"""
+        if not self.is_typing or self.engine.stop_typing:
+            return
+        if self.engine.toggle_pause():
+            self.status_label.config(text="Paused - press Ctrl+Shift+P or Resume to continue")
+            self.pause_btn.config(text="▶ Resume")
+        else:
+            self.status_label.config(text="Typing in progress...")
+            self.pause_btn.config(text="⏸ Pause")
             
     def on_closing(self):
         """Handle application closing"""
-        self.stop_typing = True
+        self.engine.stop()
         if hasattr(self, 'hotkey_listener'):
             self.hotkey_listener.stop()
+        # Keep a clipboard restored after a run once the Tk selection goes away
+        self.clipboard.hand_off()
         self.root.destroy()
         
     def run(self):
         """Run the application"""
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        if self.profile.enabled:
+            self.root.bind('<Map>', self.on_first_map, add='+')
         self.root.mainloop()
+        
+    def on_first_map(self, event):
+        """Finish the startup profile once the window is on screen"""
+        if event.widget is not self.root:
+            return
+        self.root.unbind('<Map>')
+        self.profile.mark("window shown")
+        # The hotkey listener starts once the window is idle; report after it too
+        self.root.after(200, self.profile.report)
 
     def test_mappings(self):
         """Test what Zhuyin mappings are available for current text"""
@@ -992,6 +924,7 @@ This is a good practice for typing both English and Traditional Chinese characte
             messagebox.showinfo("Test Results", "Please enter some text first.")
             return
             
+        layout = self.zhuyin_layout_var.get()
         results = []
         total_chinese = 0
         mapped_chinese = 0
@@ -999,13 +932,14 @@ This is a good practice for typing both English and Traditional Chinese characte
         for char in text:
             if is_chinese_character(char):
                 total_chinese += 1
-                zhuyin = self.find_zhuyin_for_character(char)
-                if zhuyin:
+                candidate = find_candidate(char)
+                if candidate:
                     mapped_chinese += 1
-                    keys = self.convert_zhuyin_to_keys(zhuyin)
-                    results.append(f"'{char}' → {zhuyin} → keys: {keys}")
+                    zhuyin, rank = candidate
+                    keys = list(compile_zhuyin_keys(zhuyin, layout))
+                    results.append(f"'{char}' → {zhuyin} (candidate {rank + 1}) → keys: {keys}")
                 else:
-                    results.append(f"'{char}' → NO MAPPING (will use copy-paste)")
+                    results.append(f"'{char}' → NO MAPPING (will use copy-paste; add it under 📖 Dictionary)")
                     
         if results:
             coverage = f"Coverage: {mapped_chinese}/{total_chinese} characters have Zhuyin mappings\n\n"
@@ -1024,9 +958,5 @@ This is a good practice for typing both English and Traditional Chinese characte
         text_widget.config(state='disabled', bg=self.frame_color, fg=self.fg_color, font=("Consolas", 10))
 
 if __name__ == "__main__":
-    # Disable pyautogui failsafe for better UX (optional)
-    pyautogui.FAILSAFE = True
-    pyautogui.PAUSE = 0.01
-    
-    app = AutoTyper()
+    app = AutoTyper(PROFILE)
     app.run() 
\ No newline at end of file
@@ -0,0 +1,655 @@
+# Microbenchmarks for the Auto Typer engine
+# Run with: python benchmark.py [name ...]   (no name runs everything)
+
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+
+from zhuyin_dict import ZhuyinDictionary, compile_dictionary
+from zhuyin_mapping import ZHUYIN_TO_CHINESE, build_reverse_indexes
+
+def generate_mapping(size, seed=0):
+    """Generate a synthetic Zhuyin mapping with roughly `size` entries"""
+    rng = random.Random(seed)
+    symbols = [chr(c) for c in range(0x3105, 0x312a)]
+    tones = ['', 'ˊ', 'ˇ', 'ˋ', '˙']
+    mapping = {zhuyin: list(candidates) for zhuyin, candidates in ZHUYIN_TO_CHINESE.items()}
+    while len(mapping) < size:
+        length = rng.choice((1, 1, 2, 2, 3))
+        zhuyin = ''.join(''.join(rng.sample(symbols, 2)) + rng.choice(tones) for _ in range(length))
+        chinese = ''.join(chr(rng.randint(0x4e00, 0x9fff)) for _ in range(length))
+        mapping.setdefault(zhuyin, []).append(chinese)
+    return mapping
+
+def time_per_call(func, args, repeat=3):
+    """Return the best average seconds per call of func over args"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for arg in args:
+            func(arg)
+        best = min(best, (time.perf_counter() - start) / len(args))
+    return best
+
+def bench_lookup():
+    """Compare linear dictionary scans with the precomputed reverse indexes"""
+    print("Character -> Zhuyin lookup (microseconds per lookup)")
+    print(f"{'entries':>10} {'linear scan':>14} {'index':>10} {'index build (ms)':>18}")
+    for size in (200, 2000, 20000, 100000):
+        mapping = generate_mapping(size)
+        words = [chinese for candidates in mapping.values() for chinese in candidates]
+        queries = random.Random(1).sample(words, 200)
+
+        def linear(char):
+            for zhuyin, candidates in mapping.items():
+                if char in candidates:
+                    return zhuyin
+            return None
+
+        start = time.perf_counter()
+        _, word_index = build_reverse_indexes(mapping)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def indexed(char):
+            entries = word_index.get(char)
+            return entries[0][0] if entries else None
+
+        linear_us = time_per_call(linear, queries[:50] if size > 20000 else queries) * 1e6
+        index_us = time_per_call(indexed, queries) * 1e6
+        print(f"{len(mapping):>10} {linear_us:>14.2f} {index_us:>10.3f} {build_ms:>18.2f}")
+
+def bench_dictionary():
+    """Measure compiled dictionary load time and lookup latency at several sizes"""
+    print("Compiled mmap dictionary")
+    print(f"{'entries':>10} {'size (KB)':>10} {'compile (ms)':>13} {'open (ms)':>10} "
+          f"{'word (us)':>10} {'reading (us)':>13} {'miss (us)':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (1000, 10000, 100000):
+            mapping = generate_mapping(size)
+            entries = [(zhuyin, chinese, rank) for zhuyin, candidates in mapping.items()
+                       for rank, chinese in enumerate(candidates)][:size]
+            path = os.path.join(tmp, f"{size}.dict")
+
+            start = time.perf_counter()
+            compile_dictionary(entries, path)
+            compile_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            dictionary = ZhuyinDictionary(path)
+            open_ms = (time.perf_counter() - start) * 1000
+
+            rng = random.Random(1)
+            words = rng.sample([entry[1] for entry in entries], 200)
+            readings = rng.sample(sorted({entry[0] for entry in entries}), 200)
+            misses = [chr(0x4e00 + i) * 5 for i in range(200)]
+            word_us = time_per_call(dictionary.find_candidate, words) * 1e6
+            reading_us = time_per_call(dictionary.get_candidates, readings) * 1e6
+            miss_us = time_per_call(dictionary.find_candidate, misses) * 1e6
+            dictionary.close()
+            print(f"{len(entries):>10} {os.path.getsize(path) / 1024:>10.0f} {compile_ms:>13.1f} {open_ms:>10.3f} "
+                  f"{word_us:>10.2f} {reading_us:>13.2f} {miss_us:>10.2f}")
+
+def start_bus(root):
+    """Command bus drained on the Tk thread, as the app runs it; posting 'quit' ends the main loop"""
+    from command_bus import POLL_INTERVAL, CommandBus
+    bus = CommandBus()
+    bus.subscribe('quit', root.quit)
+
+    def poll():
+        bus.drain()
+        root.after(POLL_INTERVAL, poll)
+
+    poll()
+    return bus
+
+def bench_clipboard():
+    """Compare copy+readback latency of the Tk clipboard backend with pyperclip"""
+    print("Clipboard copy + readback latency (milliseconds per character)")
+    chars = "你好我是一個學生" * 25
+
+    try:
+        import tkinter as tk
+        from clipboard import TkClipboard
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"{'tk':>12}: skipped ({e})")
+    else:
+        bus = start_bus(root)
+        clipboard = TkClipboard(root, bus)
+        timings = []
+
+        def worker():
+            # Copy from a worker thread, as the typing engine does
+            start = time.perf_counter()
+            for char in chars:
+                clipboard.copy(char)
+                clipboard.get()
+            timings.append(time.perf_counter() - start)
+            bus.post('quit')
+
+        threading.Thread(target=worker, daemon=True).start()
+        root.mainloop()
+        root.destroy()
+        print(f"{'tk':>12}: {timings[0] / len(chars) * 1000:8.3f}")
+
+    try:
+        from clipboard import PyperclipClipboard
+        clipboard = PyperclipClipboard()
+        start = time.perf_counter()
+        for char in chars[:50]:
+            clipboard.copy(char)
+            clipboard.get()
+        print(f"{'pyperclip':>12}: {(time.perf_counter() - start) / 50 * 1000:8.3f}")
+    except Exception as e:
+        print(f"{'pyperclip':>12}: skipped ({e})")
+
+def bench_unicode():
+    """Compare native X11 Unicode keystrokes with clipboard pasting into a Tk text box"""
+    print("Direct mode per-character latency on X11 (milliseconds per character)")
+    chars = "你好我是一個學生" * 10
+    try:
+        import tkinter as tk
+        from clipboard import TkClipboard
+        from unicode_input import X11UnicodeTyper
+        root = tk.Tk()
+    except Exception as e:
+        print(f"skipped ({e}); run under Xvfb, e.g. xvfb-run python benchmark.py unicode")
+        return
+
+    target = tk.Text(root)
+    target.pack()
+    bus = start_bus(root)
+    clipboard = TkClipboard(root, bus)
+    results = []
+
+    def contents():
+        return clipboard._call(lambda: target.get('1.0', tk.END).rstrip('\n'))
+
+    def worker():
+        try:
+            typer = X11UnicodeTyper()
+        except OSError as e:
+            results.append(f"skipped ({e})")
+            bus.post('quit')
+            return
+        try:
+            time.sleep(0.5)  # Let the window map and take focus
+            start = time.perf_counter()
+            typer.type_text(chars)
+            native = time.perf_counter() - start
+            time.sleep(0.2)
+            native_ok = contents() == chars
+
+            clipboard._call(lambda: target.delete('1.0', tk.END))
+            start = time.perf_counter()
+            for char in chars:
+                clipboard.copy(char)
+                typer.press_chord(0xffe3, ord('v'))  # Control_L + v
+                time.sleep(0.01)  # Let Tk read the clipboard before it changes
+            paste = time.perf_counter() - start
+            time.sleep(0.2)
+            paste_ok = contents() == chars
+
+            results.append(f"{'native':>8}: {native / len(chars) * 1000:8.3f}  (text correct: {native_ok})")
+            results.append(f"{'paste':>8}: {paste / len(chars) * 1000:8.3f}  (text correct: {paste_ok}, "
+                           f"includes 10 ms settle)")
+        finally:
+            typer.close()
+            bus.post('quit')
+
+    root.after(0, target.focus_force)
+    threading.Thread(target=worker, daemon=True).start()
+    root.mainloop()
+    root.destroy()
+    print("\n".join(results))
+
+def bench_engine():
+    """Compare typing throughput of the human-like and Instant paths on the recording backend"""
+    from output_backends import MeteredBackend, RecordingBackend
+    from typing_config import DEFAULT_SETTINGS, build_config
+    from typing_engine import TypingEngine
+    print("Engine throughput on the recording backend (characters per second, delays skipped)")
+    text = "Hello, 你好! I like to 看書 and 聽音樂 in my free time.\n" * 5
+
+    for speed in ("Very Fast", "Instant"):
+        config = build_config(dict(DEFAULT_SETTINGS, speed=speed, output_backend="recording",
+                                   word_by_word=False, enable_errors=False, thinking_pauses=False,
+                                   speed_variation=False))
+        engine = TypingEngine(config)
+        engine.punctuation_errors = {}  # The ASCII-to-fullwidth punctuation swap runs even without errors
+        engine.paste_settle_delay = 0.0
+        engine.output = MeteredBackend(RecordingBackend())
+        engine.scheduler.wait = lambda seconds, paced=True: True  # Measure the engine, not the planned delays
+        start = time.perf_counter()
+        plan = engine.compile_plan(text)
+        engine.scheduler.start()
+        engine.play_plan(plan.events)
+        elapsed = time.perf_counter() - start
+        correct = engine.output.backend.typed_text() == text
+        print(f"{speed:>10}: {len(text) / elapsed:12.0f}  ({engine.output.calls} backend calls, text correct: {correct})")
+
+def bench_config():
+    """Compare per-character settings reads through Tk variables with a frozen TypingConfig"""
+    print("Settings reads per typed character, from the typing thread (microseconds per character)")
+    chars = 2000
+    try:
+        import tkinter as tk
+        from typing_config import DEFAULT_SETTINGS, build_config
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"skipped ({e}); run under Xvfb, e.g. xvfb-run python benchmark.py config")
+        return
+
+    # The variables the engine used to read for every character
+    variables = {
+        'enable_errors': tk.BooleanVar(value=True), 'error_rate': tk.StringVar(value="15"),
+        'auto_correct': tk.BooleanVar(value=True), 'correction_rate': tk.StringVar(value="80"),
+        'speed_variation': tk.BooleanVar(value=True), 'thinking_pauses': tk.BooleanVar(value=True),
+        'pause_freq': tk.StringVar(value="10"), 'min_pause': tk.StringVar(value="0.5"),
+        'max_pause': tk.StringVar(value="2.0"),
+    }
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update({name: var.get() for name, var in variables.items()})
+    config = build_config(settings)
+    bus = start_bus(root)
+    results = []
+
+    def tk_reads():
+        return (variables['enable_errors'].get(), float(variables['error_rate'].get()),
+                variables['thinking_pauses'].get(), float(variables['pause_freq'].get()),
+                variables['speed_variation'].get())
+
+    def config_reads():
+        return (config.enable_errors, config.error_rate, config.thinking_pauses, config.pause_rate,
+                config.speed_variation)
+
+    def worker():
+        for label, reads in (("tk vars", tk_reads), ("config", config_reads)):
+            start = time.perf_counter()
+            for _ in range(chars):
+                reads()
+            results.append(f"{label:>10}: {(time.perf_counter() - start) / chars * 1e6:10.2f}")
+        bus.post('quit')
+
+    threading.Thread(target=worker, daemon=True).start()
+    root.mainloop()
+    root.destroy()
+    print("\n".join(results))
+
+def bench_scheduler():
+    """Compare chained sleeps with the deadline scheduler over a simulated typing run"""
+    from scheduler import DeadlineScheduler
+    print("Planned vs. actual run time for 500 keystrokes (1-20 ms delays, 0-2 ms backend calls)")
+    rng = random.Random(0)
+    events = [(rng.uniform(0.0, 0.002), rng.uniform(0.001, 0.02)) for _ in range(500)]
+    planned = sum(delay for _, delay in events)
+
+    def backend_call(seconds):
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            pass
+
+    start = time.perf_counter()
+    for work, delay in events:
+        backend_call(work)
+        time.sleep(delay)
+    chained = time.perf_counter() - start
+
+    scheduler = DeadlineScheduler()
+    start = time.perf_counter()
+    for work, delay in events:
+        backend_call(work)
+        scheduler.wait(delay)
+    deadline = time.perf_counter() - start
+
+    print(f"{'planned':>10}: {planned:8.3f} s")
+    print(f"{'chained':>10}: {chained:8.3f} s  (drift {(chained - planned) * 1000:+.1f} ms)")
+    print(f"{'deadline':>10}: {deadline:8.3f} s  ({scheduler.summary()})")
+
+def bench_sampling():
+    """Compare per-character random draws from the global random module with a block Sampler"""
+    import sampling
+    print("Per-character delay and decision sampling (microseconds per character)")
+    chars = 100000
+
+    def per_char(uniform, rand):
+        # Roughly the draws the engine makes for one character: errors, pause, delay, variation
+        for _ in range(chars):
+            rand()
+            rand()
+            uniform(0.05, 0.15) * uniform(0.5, 2.0)
+            rand()
+
+    def report(label, func):
+        start = time.perf_counter()
+        func()
+        print(f"{label:>24}: {(time.perf_counter() - start) / chars * 1e6:8.3f}")
+
+    report("global random", lambda: per_char(random.uniform, random.random))
+    numpy = sampling._load_numpy()
+    for label, module_numpy in (("Sampler (NumPy)", numpy), ("Sampler (pure Python)", None)):
+        if label.endswith("(NumPy)") and numpy is None:
+            print(f"{label:>24}: skipped (NumPy not installed)")
+            continue
+        sampling._numpy = module_numpy
+        try:
+            sampler = sampling.Sampler(seed=1)
+            report(label, lambda: per_char(sampler.uniform, sampler.random))
+            for distribution in ("Log-normal", "Gamma"):
+                sampler = sampling.Sampler(seed=1, distribution=distribution)
+                report(f"{distribution} {label[8:]}", lambda: [sampler.delay(0.05, 0.15) for _ in range(chars)])
+        finally:
+            sampling._numpy = numpy
+
+def bench_plan():
+    """Replay a saved typing plan on the recording backend and compare event times with the plan"""
+    from output_backends import MeteredBackend, RecordingBackend
+    from scheduler import DeadlineScheduler
+    from typing_plan import PlanExecutor, TypingPlan
+    print("Plan replay timing on the recording backend (500 keys, 1-20 ms pauses)")
+    rng = random.Random(0)
+    plan = TypingPlan(seed=0)
+    for _ in range(500):
+        plan.write(rng.choice("abcdefghij"))
+        plan.pause(rng.uniform(0.001, 0.02))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "plan.jsonl")
+        start = time.perf_counter()
+        plan.save(path)
+        loaded = TypingPlan.load(path)
+        io_ms = (time.perf_counter() - start) * 1000
+
+    recorder = RecordingBackend()
+    scheduler = DeadlineScheduler()
+    executor = PlanExecutor(MeteredBackend(recorder), scheduler)
+    scheduler.start()
+    executor.run(loaded.events)
+
+    # Each key is due at the sum of the pauses before it
+    due, errors = 0.0, []
+    writes = iter(recorder.events)
+    for event in loaded.events:
+        if event[0] == 'pause':
+            due += event[1]
+        else:
+            errors.append(abs(next(writes)[0] - scheduler.origin - due))
+    errors.sort()
+    print(f"{'save+load':>12}: {io_ms:8.2f} ms for {len(loaded)} events")
+    print(f"{'predicted':>12}: {loaded.duration():8.3f} s")
+    print(f"{'actual':>12}: {recorder.events[-1][0] - scheduler.origin:8.3f} s  ({scheduler.summary()})")
+    print(f"{'key timing':>12}: p50 {errors[len(errors) // 2] * 1000:.3f} ms, "
+          f"p99 {errors[int(len(errors) * 0.99)] * 1000:.3f} ms, max {errors[-1] * 1000:.3f} ms off plan")
+
+def bench_pipeline():
+    """Time to the first planned block vs. planning a whole document, and per-stage throughput"""
+    from pipeline import PipelineStats, Planner, normalize, split_blocks, text_chunks
+    print("Streaming pipeline (read -> normalize -> block) on a planner thread")
+    rng = random.Random(0)
+    words = ["hello", "world", "typing", "你好", "世界", "打字"]
+    for size in (10_000, 100_000, 1_000_000):
+        parts, length = [], 0
+        while length < size:
+            word = rng.choice(words)
+            parts.append(word + ("\r\n" if rng.random() < 0.05 else " "))
+            length += len(parts[-1])
+        text = "".join(parts)
+
+        stats = PipelineStats()
+        chunks = stats.stage('read', text_chunks(text))
+        chunks = stats.stage('normalize', normalize(chunks))
+        blocks = stats.stage('block', split_blocks(chunks), size=lambda item: len(item[0]))
+        start = time.perf_counter()
+        planner = Planner(blocks)
+        planner.start()
+        first = None
+        for _ in planner.items():
+            if first is None:
+                first = time.perf_counter() - start
+        total = time.perf_counter() - start
+        print(f"{len(text):>9} chars: first block {first * 1000:7.2f} ms, all {total * 1000:8.2f} ms")
+        print(f"{'':>16}{stats.summary()}")
+
+def bench_memory():
+    """Peak Python memory: streaming a file through the pipeline vs. reading and tokenizing it whole"""
+    import tracemalloc
+    from pipeline import file_chunks, normalize, split_blocks
+    print("Peak traced memory while splitting a UTF-8 file into blocks and words")
+    rng = random.Random(0)
+    words = ["hello", "world", "typing", "你好", "世界", "打字"]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.txt")
+        line = " ".join(rng.choice(words) for _ in range(2000)) + "\n"
+        for megabytes in (2, 8, 32):
+            with open(path, 'w', encoding='utf-8') as f:
+                while f.tell() < megabytes * 1024 * 1024:
+                    f.write(line)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            tokens = 0
+            for block, _ in split_blocks(normalize(file_chunks(path))):
+                tokens += sum(1 for _ in re.finditer(r'\S+|\s+', block))
+            streamed = time.perf_counter() - start
+            streamed_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{megabytes:>4} MB  streamed: peak {streamed_peak / 2 ** 20:7.2f} MB, "
+                  f"{tokens} tokens in {streamed:.2f} s")
+
+            if megabytes > 8:
+                continue  # Memory-mapped; the whole-text approach would need about 450 MB here
+            tracemalloc.start()
+            start = time.perf_counter()
+            with open(path, encoding='utf-8') as f:
+                tokens = len(re.findall(r'\S+|\s+', f.read()))
+            whole = time.perf_counter() - start
+            whole_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{'':>9}whole:    peak {whole_peak / 2 ** 20:7.2f} MB, {tokens} tokens in {whole:.2f} s")
+
+def bench_startup():
+    """Wall time of a headless command-line run vs. a bare interpreter, and the CLI's own startup"""
+    import json
+    import subprocess
+    print("Headless CLI startup (recording backend, 5-character text, median of 5 runs)")
+    here = os.path.dirname(os.path.abspath(__file__))
+    command = [sys.executable, os.path.join(here, "auto_typer.py"), "type", "-", "--backend", "recording",
+               "--now", "--speed", "instant", "--errors", "0"]
+    cases = {
+        'python -c pass': ([sys.executable, "-c", "pass"], None),
+        'cli type': (command, "hello"),
+    }
+    for name, (args, stdin) in cases.items():
+        walls, startups = [], []
+        for _ in range(5):
+            start = time.perf_counter()
+            done = subprocess.run(args, input=stdin, capture_output=True, text=True, check=True)
+            walls.append(time.perf_counter() - start)
+            if stdin is not None:
+                startups.append(json.loads(done.stdout.splitlines()[-1])['startup_ms'])
+        walls.sort()
+        line = f"{name:>16}: {walls[2] * 1000:7.1f} ms wall"
+        if startups:
+            startups.sort()
+            line += f", {startups[2]:.1f} ms from CLI entry to engine ready"
+        print(line)
+    check = "import sys, cli; print(sorted(m for m in ('tkinter', 'pyautogui', 'pynput') if m in sys.modules))"
+    loaded = subprocess.run([sys.executable, "-c", check], cwd=here, capture_output=True, text=True).stdout.strip()
+    print(f"{'GUI modules':>16}: {loaded} imported by the CLI")
+
+def bench_icon():
+    """Window icon load time: decoding the full-size icon.png vs. loading cached scaled copies"""
+    print("Window icon load time (ms)")
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+        root.withdraw()
+    except Exception as e:
+        print(f"skipped ({e}); run under Xvfb, e.g. xvfb-run python benchmark.py icon")
+        return
+    from app_icon import load_icon
+    source = os.path.join(os.path.dirname(os.path.abspath(__file__)), "icon.png")
+
+    def timed(label, func):
+        start = time.perf_counter()
+        func()
+        print(f"{label:>24}: {(time.perf_counter() - start) * 1000:8.1f}")
+
+    with tempfile.TemporaryDirectory() as cache:
+        timed("full icon.png", lambda: root.iconphoto(True, tk.PhotoImage(master=root, file=source)))
+        timed("first launch (scale)", lambda: root.iconphoto(True, *load_icon(root, source, cache_dir=cache)))
+        timed("cached copies", lambda: root.iconphoto(True, *load_icon(root, source, cache_dir=cache)))
+    root.destroy()
+
+def bench_async():
+    """Run several typing sessions from one event loop and measure how responsive the loop stays"""
+    import asyncio
+    import contextlib
+    import io
+    from async_engine import AsyncTypingEngine
+    from typing_config import DEFAULT_SETTINGS, build_config
+    print("Concurrent asyncio sessions on the recording backend (Very Fast, 50 characters each)")
+    config = build_config(dict(DEFAULT_SETTINGS, speed="Very Fast", output_backend="recording",
+                               enable_errors=False, thinking_pauses=False, speed_variation=False, seed=1))
+    text = "The quick brown fox jumps over the lazy dog. 你好世界"
+
+    async def sessions(count):
+        lag = 0.0
+        running = True
+
+        async def ticker():
+            # Another coroutine that wants the loop every 10 ms
+            nonlocal lag
+            while running:
+                start = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lag = max(lag, time.perf_counter() - start - 0.01)
+
+        tick = asyncio.create_task(ticker())
+        start = time.perf_counter()
+        engines = [AsyncTypingEngine() for _ in range(count)]
+        results = await asyncio.gather(*(engine.type(text, config) for engine in engines))
+        wall = time.perf_counter() - start
+        running = False
+        await tick
+        return wall, max(result['duration'] for result in results), lag
+
+    for count in (1, 4, 16):
+        with contextlib.redirect_stdout(io.StringIO()):  # Per-run summaries
+            wall, longest, lag = asyncio.run(sessions(count))
+        print(f"{count:>3} sessions: {wall:6.2f} s wall (longest run {longest:.2f} s), "
+              f"event loop lag max {lag * 1000:.1f} ms")
+
+def bench_stop():
+    """Measure how long a stop request takes to end a run, with plain and interruptible waits"""
+    import contextlib
+    import io
+    from scheduler import DeadlineScheduler
+    from typing_config import DEFAULT_SETTINGS, build_config
+    from typing_engine import TypingEngine
+    print("Stop latency on the recording backend (Medium, 2 s thinking pause before each Chinese character)")
+    config = build_config(dict(DEFAULT_SETTINGS, speed="Medium", output_backend="recording",
+                               enable_errors=False, pause_freq=100, min_pause=2, max_pause=2, seed=1))
+    text = "你好世界，今天天氣很好。" * 4
+    rng = random.Random(0)
+
+    def stop_latency(interruptible):
+        engine = TypingEngine(config)
+        engine.prepare()
+        if not interruptible:
+            engine.scheduler = DeadlineScheduler()  # Waits that never look at stop requests
+        threading.Timer(rng.uniform(0.5, 3.0), engine.stop).start()
+        with contextlib.redirect_stdout(io.StringIO()):  # Per-run summary
+            result = engine.run(text)
+        return result['stop_latency_ms']
+
+    for label, interruptible in (("sleeping waits", False), ("interruptible waits", True)):
+        latencies = sorted(stop_latency(interruptible) for _ in range(8))
+        print(f"{label:>20}: median {latencies[len(latencies) // 2]:7.1f} ms, max {latencies[-1]:7.1f} ms")
+
+    # A pause must freeze the run: no keys while paused, and the schedule continues after it
+    engine = TypingEngine(config.replace(thinking_pauses=False))
+    engine.prepare()
+    def pause_once():
+        time.sleep(0.5)
+        engine.pause()
+        typed = len(engine.output.backend.events)
+        time.sleep(1.0)
+        frozen.append(len(engine.output.backend.events) - typed)
+        engine.resume()
+    frozen = []
+    threading.Thread(target=pause_once).start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = engine.run("The quick brown fox jumps over the lazy dog.")
+    print(f"Paused {result['paused_seconds']:.2f} s: {frozen[0]} keys while paused, "
+          f"drift after resuming {result['drift_ms']:+.1f} ms")
+
+def bench_bus():
+    """Measure hotkey-to-action latency through the command bus and its per-message cost"""
+    from command_bus import POLL_INTERVAL, CommandBus
+    print(f"Command bus drained every {POLL_INTERVAL} ms on a poller thread (stands in for root.after)")
+    bus = CommandBus(history=1000)
+    bus.subscribe('hotkey', lambda command: None)
+    running = True
+
+    def poller():
+        while running:
+            bus.drain()
+            time.sleep(POLL_INTERVAL / 1000)
+
+    thread = threading.Thread(target=poller)
+    thread.start()
+    rng = random.Random(0)
+    for _ in range(300):
+        time.sleep(rng.uniform(0, 0.02))  # Hotkey presses at random moments
+        bus.post('hotkey', 'stop')
+    time.sleep(0.05)
+    running = False
+    thread.join()
+    latencies = sorted(bus.latencies['hotkey'])
+    print(f"  hotkey to action: p50 {latencies[len(latencies) // 2] * 1000:.2f} ms, "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:.2f} ms, max {latencies[-1] * 1000:.2f} ms")
+
+    count = 100000
+    bus.subscribe('progress', lambda typed: None)
+    start = time.perf_counter()
+    for typed in range(count):
+        bus.post('progress', typed)
+    posted = time.perf_counter()
+    bus.drain()
+    end = time.perf_counter()
+    print(f"  post {(posted - start) / count * 1e6:.2f} us, drain {(end - posted) / count * 1e6:.2f} us per message")
+
+BENCHMARKS = {
+    'lookup': bench_lookup,
+    'dictionary': bench_dictionary,
+    'clipboard': bench_clipboard,
+    'unicode': bench_unicode,
+    'engine': bench_engine,
+    'config': bench_config,
+    'scheduler': bench_scheduler,
+    'sampling': bench_sampling,
+    'plan': bench_plan,
+    'pipeline': bench_pipeline,
+    'memory': bench_memory,
+    'startup': bench_startup,
+    'icon': bench_icon,
+    'async': bench_async,
+    'stop': bench_stop,
+    'bus': bench_bus,
+}
+
+if __name__ == "__main__":
+    names = sys.argv[1:] or list(BENCHMARKS)
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
+        print()
@@ -0,0 +1,145 @@
+# Command-line interface
+# Runs the typing engine without Tk, pyautogui's GUI or global hotkeys, so the typer can be
+# used from scripts, cron jobs or a kiosk session:
+#     python -m auto_typer type notes.txt --speed fast --method paste --seed 42
+#     some-command | python -m auto_typer type - --now
+# Status messages go to stderr; the last line on stdout is a JSON summary of the run.
+
+import time
+
+START = time.perf_counter()  # Taken before the engine's imports, for the startup time
+
+import argparse
+import json
+import os
+import sys
+import threading
+
+from output_backends import BACKENDS
+from pipeline import file_chunks, stream_chunks
+from sampling import DISTRIBUTIONS
+from typing_config import DEFAULT_SETTINGS, SPEED_DELAYS, build_config
+from typing_engine import TypingEngine
+from zhuyin_mapping import KEYBOARD_LAYOUTS
+
+# Command-line spelling of the speed presets and input methods
+SPEEDS = {name.lower().replace(' ', '-'): name for name in SPEED_DELAYS}
+METHODS = {'direct': "Direct", 'paste': "Copy-Paste", 'zhuyin': "Zhuyin"}
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="auto_typer", description="Type text with human-like timing.")
+    commands = parser.add_subparsers(dest='command', required=True)
+    typer = commands.add_parser('type', help="type a text file or stdin into the focused window")
+    typer.add_argument('file', nargs='?', default='-', help="UTF-8 text file to type, or - for stdin (default)")
+    typer.add_argument('--speed', choices=SPEEDS, default='medium')
+    typer.add_argument('--method', choices=METHODS, default='direct',
+                       help="how Chinese text is entered: native keys, clipboard paste or the Zhuyin IME")
+    typer.add_argument('--layout', choices=KEYBOARD_LAYOUTS, default=DEFAULT_SETTINGS['layout'],
+                       help="Bopomofo keyboard layout for --method zhuyin")
+    typer.add_argument('--backend', choices=BACKENDS, default=DEFAULT_SETTINGS['output_backend'],
+                       help="keystroke backend; 'recording' types nothing, for trying settings out")
+    typer.add_argument('--seed', type=int, help="seed for every delay and error decision")
+    typer.add_argument('--delays', choices=DISTRIBUTIONS, default=DEFAULT_SETTINGS['delay_distribution'],
+                       help="shape of the inter-key delays")
+    typer.add_argument('--chars', action='store_true', help="type character by character instead of word by word")
+    typer.add_argument('--errors', type=float, default=DEFAULT_SETTINGS['error_rate'], metavar='PERCENT',
+                       help="typo rate; 0 makes no typos (default %(default)s)")
+    typer.add_argument('--corrections', type=float, default=DEFAULT_SETTINGS['correction_rate'],
+                       metavar='PERCENT', help="share of typos that are corrected (default %(default)s)")
+    typer.add_argument('--no-pauses', action='store_true', help="no thinking pauses")
+    typer.add_argument('--no-variation', action='store_true', help="no speed variation")
+    typer.add_argument('--burst', type=int, metavar='CHUNK', help="paste Chinese text in chunks of CHUNK characters")
+    typer.add_argument('--target', type=float, metavar='RATE', help="hold this typing rate")
+    typer.add_argument('--unit', choices=("WPM", "CPM"), default=DEFAULT_SETTINGS['target_unit'],
+                       help="unit of --target")
+    typer.add_argument('--delay', type=float, default=3.0, metavar='SECONDS',
+                       help="seconds to wait before typing, to focus the target window (default %(default)s)")
+    typer.add_argument('--now', action='store_true', help="start typing immediately (same as --delay 0)")
+    return parser
+
+def read_settings(args):
+    """Raw engine settings for the parsed arguments"""
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update({
+        'speed': SPEEDS[args.speed],
+        'input_method': METHODS[args.method],
+        'layout': args.layout,
+        'output_backend': args.backend,
+        'seed': "" if args.seed is None else args.seed,
+        'delay_distribution': args.delays,
+        'word_by_word': not args.chars,
+        'enable_errors': args.errors > 0,
+        'error_rate': args.errors,
+        'correction_rate': args.corrections,
+        'thinking_pauses': not args.no_pauses,
+        'speed_variation': not args.no_variation,
+        'target_enabled': args.target is not None,
+        'target_unit': args.unit,
+    })
+    if args.burst is not None:
+        settings.update(burst_paste=True, burst_chunk=args.burst)
+    if args.target is not None:
+        settings['target_rate'] = args.target
+    return settings
+
+def log(message):
+    print(message, file=sys.stderr)
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    try:
+        config = build_config(read_settings(args))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.file == '-':
+        chunks = stream_chunks(sys.stdin)
+    elif os.access(args.file, os.R_OK):
+        chunks = file_chunks(args.file)
+    else:
+        parser.error(f"cannot read {args.file}")
+
+    try:
+        engine = TypingEngine(config)
+        engine.log_file = sys.stderr  # Keep stdout for the JSON summary
+        engine.prepare()
+    except Exception as e:
+        log(f"auto_typer: could not start the {config.output_backend} backend: {e}")
+        return 1
+    startup = time.perf_counter() - START
+
+    # Type on a worker thread so Ctrl+C can stop the run cleanly and still get a summary
+    outcome = {}
+    done = threading.Event()
+
+    def worker():
+        try:
+            outcome['result'] = engine.run(chunks=chunks, start_delay=0 if args.now else args.delay,
+                                           on_status=log)
+        except Exception as e:
+            outcome['error'] = e
+        finally:
+            done.set()
+
+    threading.Thread(target=worker, daemon=True).start()
+    interrupted = False
+    while True:
+        try:
+            if done.wait(0.1):
+                break
+        except KeyboardInterrupt:
+            interrupted = True
+            engine.stop()
+    if 'error' in outcome:
+        log(f"auto_typer: {outcome['error']}")
+        return 1
+
+    result = outcome['result'] or {'completed': False, 'characters': 0}  # None: stopped before typing
+    result['startup_ms'] = round(startup * 1000, 1)
+    print(json.dumps(result))
+    if interrupted:
+        return 130
+    return 0 if result['completed'] else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# Clipboard backends used for pasting text
+# TkClipboard keeps the selection owned by the running Tk process, so a copy is an
+# in-process call instead of a new xclip/xsel process per paste. Worker threads reach it
+# through the app's command bus, which runs the call on the Tk thread. Both backends can
+# save the user's clipboard when a run starts and put it back when the run ends; a clipboard
+# that held no text is cleared again.
+
+import queue
+import threading
+
+_NOTHING_SAVED = object()  # save() has not been called since the last restore()
+
+class TkClipboard:
+    """Clipboard owned by the Tk root; safe to call from worker threads"""
+
+    def __init__(self, root, bus, timeout=2.0):
+        self.root = root
+        self.bus = bus  # CommandBus drained on the Tk thread
+        self.timeout = timeout
+        self.saved = _NOTHING_SAVED
+        self._owned = None  # Text this app last put on the clipboard
+        self._main_thread = threading.current_thread()
+        bus.subscribe('clipboard', lambda func, *args: func(*args))
+
+    def _call(self, func, *args):
+        """Run func on the Tk main thread and return its result"""
+        if threading.current_thread() is self._main_thread:
+            return func(*args)
+        try:
+            return self.bus.request('clipboard', func, *args, timeout=self.timeout)
+        except queue.Empty:
+            raise TimeoutError("Tk main loop did not service the clipboard request") from None
+
+    def _set(self, text):
+        self.root.clipboard_clear()
+        self.root.clipboard_append(text)
+        self._owned = text
+
+    def _clear(self):
+        self.root.clipboard_clear()
+        self._owned = None
+
+    def _get(self):
+        try:
+            return self.root.clipboard_get()
+        except Exception:
+            return None  # Empty clipboard or non-text contents
+
+    def copy(self, text):
+        """Put text on the clipboard"""
+        self._call(self._set, text)
+
+    def get(self):
+        """Get the clipboard text, or None if it holds no text"""
+        return self._call(self._get)
+
+    def save(self):
+        """Remember the user's clipboard contents (None if it holds no text)"""
+        self.saved = self.get()
+
+    def restore(self):
+        """Put back the contents remembered by save(), clearing a clipboard that held no text"""
+        if self.saved is _NOTHING_SAVED:
+            return
+        if self.saved is None:
+            self._call(self._clear)
+        else:
+            self.copy(self.saved)
+        self.saved = _NOTHING_SAVED
+
+    def hand_off(self):
+        """Give text this app still has on the clipboard to pyperclip before the app exits
+
+        X11 drops a selection when the process that owns it exits, which would lose the
+        contents restore() put back; pyperclip's xclip/xsel helper keeps serving them.
+        Call from the Tk thread. Without pyperclip the contents go with the app.
+        """
+        if self._owned is None or self.root.tk.call('tk', 'windowingsystem') != 'x11':
+            return
+        if self._get() != self._owned:
+            return  # Another application has taken the clipboard since
+        try:
+            import pyperclip
+            pyperclip.copy(self._owned)
+        except Exception:
+            pass
+
+class PyperclipClipboard:
+    """Clipboard through pyperclip (one helper process per call on Linux)"""
+
+    def __init__(self):
+        import pyperclip
+        self._pyperclip = pyperclip
+        self.saved = _NOTHING_SAVED
+
+    def copy(self, text):
+        """Put text on the clipboard"""
+        self._pyperclip.copy(text)
+
+    def get(self):
+        """Get the clipboard text, or None if it holds no text"""
+        try:
+            return self._pyperclip.paste()
+        except Exception:
+            return None
+
+    def save(self):
+        """Remember the user's clipboard contents (None if it holds no text)"""
+        self.saved = self.get()
+
+    def restore(self):
+        """Put back the contents remembered by save(); a clipboard that held no text gets empty text"""
+        if self.saved is _NOTHING_SAVED:
+            return
+        self.copy('' if self.saved is None else self.saved)
+        self.saved = _NOTHING_SAVED
@@ -0,0 +1,85 @@
+# Command bus between the hotkeys, the Tk window and the typing worker
+# Tk may only be used from the thread running its mainloop, but hotkeys arrive on pynput's
+# listener thread and run status comes from the typing thread. Those threads never touch a
+# widget or the app's state: they post named messages to a CommandBus, and the Tk thread
+# drains it from a single root.after poller and calls the handler registered for each name.
+# Buttons post the same commands as the hotkeys, so every control goes through one place.
+#
+# Every message keeps the time it was posted, so the delay from a hotkey press to the
+# start of its action is measured per message name.
+
+import queue
+import time
+from collections import deque
+
+POLL_INTERVAL = 10  # Milliseconds between drains on the Tk thread (the most a message waits)
+
+class CommandBus:
+    """Thread-safe queue of named messages, handled in order by one consumer thread"""
+
+    def __init__(self, history=100):
+        self._queue = queue.SimpleQueue()
+        self._handlers = {}
+        self.history = history  # Latencies kept per message name
+        self.latencies = {}     # name -> recent seconds from post until the handler was called
+
+    def subscribe(self, name, handler):
+        """Call handler(*args) for every `name` message, replacing any previous handler"""
+        self._handlers[name] = handler
+
+    def post(self, name, *args):
+        """Queue a message; safe to call from any thread and never blocks"""
+        self._queue.put((name, args, time.perf_counter(), None))
+
+    def request(self, name, *args, timeout=5.0):
+        """Post a message and wait for its handler's return value
+
+        For threads other than the consumer, which would wait for itself. Raises queue.Empty
+        if the message isn't handled within `timeout` seconds, and re-raises handler errors.
+        """
+        reply = queue.Queue(1)
+        self._queue.put((name, args, time.perf_counter(), reply))
+        ok, value = reply.get(timeout=timeout)
+        if not ok:
+            raise value
+        return value
+
+    def drain(self):
+        """Handle every queued message in order; returns how many were handled
+
+        Call from the consumer thread only. An error in a handler without a waiting requester
+        is raised after the message is removed, so the next drain carries on with the rest.
+        """
+        handled = 0
+        while True:
+            try:
+                name, args, posted, reply = self._queue.get_nowait()
+            except queue.Empty:
+                return handled
+            handled += 1
+            latencies = self.latencies.get(name)
+            if latencies is None:
+                latencies = self.latencies[name] = deque(maxlen=self.history)
+            latencies.append(time.perf_counter() - posted)
+            try:
+                result = self._handlers[name](*args)
+            except Exception as e:
+                if reply is None:
+                    raise
+                reply.put((False, e))
+            else:
+                if reply is not None:
+                    reply.put((True, result))
+
+    def last_latency(self, name):
+        """Seconds the latest `name` message waited before its handler ran, or None"""
+        latencies = self.latencies.get(name)
+        return latencies[-1] if latencies else None
+
+    def latency_summary(self, name):
+        """Describe the recent latency of `name` messages in one line, or None if there were none"""
+        latencies = sorted(self.latencies.get(name, ()))
+        if not latencies:
+            return None
+        median = latencies[len(latencies) // 2]
+        return f"p50 {median * 1000:.1f} ms / max {latencies[-1] * 1000:.1f} ms over {len(latencies)}"
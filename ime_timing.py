@@ -0,0 +1,96 @@
+# Zhuyin IME timing policy and per-profile calibration cache
+# The waits between Bopomofo keys and before committing a candidate follow the selected
+# typing speed, but never drop below the fastest timing calibration found reliable (or,
+# without a calibration, below a conservative minimum).
+
+import json
+import logging
+import os
+import sys
+
+logger = logging.getLogger(__name__)
+
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.auto_typer', 'ime_timing.json')
+
+# (key delay, commit delay) in seconds used before the speed preset is known
+DEFAULT_TIMING = (0.05, 0.3)
+
+# Fastest timing used for a profile that has not been calibrated; common IMEs keep up with it
+UNCALIBRATED_FLOOR = (0.01, 0.05)
+
+# Timing requested by each speed preset
+SPEED_TIMING = {
+    "Very Slow": (0.1, 0.5),
+    "Slow": (0.07, 0.35),
+    "Medium": (0.04, 0.2),
+    "Fast": (0.02, 0.1),
+    "Very Fast": (0.0, 0.0),
+    "Instant": (0.0, 0.0)
+}
+
+# Calibration ladder, from safe to aggressive
+CALIBRATION_STEPS = [
+    (0.05, 0.3), (0.04, 0.2), (0.03, 0.15), (0.02, 0.1),
+    (0.015, 0.07), (0.01, 0.05), (0.005, 0.03), (0.0, 0.015)
+]
+CALIBRATION_TEXT = "你好我是學生"
+CALIBRATION_MARGIN = 1.25  # Headroom added on top of the fastest reliable step
+
+_calibrations = None
+
+def get_ime_profile(layout):
+    """Identify the active IME and keyboard layout, used as the calibration cache key"""
+    ime = sys.platform
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            hkl = ctypes.windll.user32.GetKeyboardLayout(0) & 0xffffffff
+            ime += f":{hkl:08x}"
+        except Exception:
+            pass
+    else:
+        ime += ":" + (os.environ.get('GTK_IM_MODULE') or os.environ.get('XMODIFIERS') or 'default')
+    return f"{ime}/{layout}"
+
+def _load_calibrations():
+    """Load the calibration cache from disk once"""
+    global _calibrations
+    if _calibrations is None:
+        try:
+            with open(CACHE_PATH, encoding='utf-8') as f:
+                _calibrations = {profile: tuple(timing) for profile, timing in json.load(f).items()}
+        except (OSError, ValueError):
+            _calibrations = {}
+    return _calibrations
+
+def load_calibration(profile):
+    """Get the calibrated (key delay, commit delay) for a profile, or None"""
+    return _load_calibrations().get(profile)
+
+def save_calibration(profile, timing):
+    """Store a calibrated timing for a profile"""
+    calibrations = _load_calibrations()
+    calibrations[profile] = tuple(timing)
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(calibrations, f, indent=2)
+    except OSError as e:
+        logger.warning("Could not save IME calibration: %s", e)
+
+def get_zhuyin_timing(speed, profile):
+    """Get the (key delay, commit delay) for a speed preset, floored at the profile's calibration"""
+    floor = load_calibration(profile) or UNCALIBRATED_FLOOR
+    requested = SPEED_TIMING.get(speed, DEFAULT_TIMING)
+    return max(floor[0], requested[0]), max(floor[1], requested[1])
+
+def calibrate(run_trial, steps=CALIBRATION_STEPS):
+    """Walk the ladder until run_trial(key_delay, commit_delay) fails; return the fastest reliable timing"""
+    reliable = None
+    for key_delay, commit_delay in steps:
+        if not run_trial(key_delay, commit_delay):
+            break
+        reliable = (key_delay, commit_delay)
+    if reliable is None:
+        return None
+    return reliable[0] * CALIBRATION_MARGIN, reliable[1] * CALIBRATION_MARGIN
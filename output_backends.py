@@ -0,0 +1,177 @@
+# Keystroke output backends
+# The typing engine only talks to an OutputBackend, so the same logic can drive pyautogui,
+# pynput, or an in-memory recorder that logs every event for headless tests and benchmarks.
+
+import time
+
+class OutputBackend:
+    """Interface for sending text and keys to the focused application"""
+
+    # Whether this backend drives a real desktop (native Unicode keystrokes may be used)
+    live = True
+
+    def write(self, text, interval=0.0):
+        """Type plain keyboard text, waiting `interval` seconds between keys"""
+        raise NotImplementedError
+
+    def press(self, key):
+        """Press and release a named key such as 'backspace', 'enter' or 'a'"""
+        raise NotImplementedError
+
+    def hotkey(self, *keys):
+        """Press a chord such as ('ctrl', 'v')"""
+        raise NotImplementedError
+
+    def paste(self, text):
+        """Put text on the clipboard and paste it"""
+        self.clipboard.copy(text)
+        self.hotkey('ctrl', 'v')
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+class PyAutoGUIBackend(OutputBackend):
+    """Keystrokes through pyautogui"""
+
+    def __init__(self, clipboard):
+        import pyautogui
+        # The engine owns all timing; pyautogui's implicit pause after every call would add to it
+        pyautogui.PAUSE = 0
+        # Moving the mouse to a screen corner aborts the run
+        pyautogui.FAILSAFE = True
+        self._pyautogui = pyautogui
+        self.clipboard = clipboard
+
+    def write(self, text, interval=0.0):
+        self._pyautogui.write(text, interval=interval)
+
+    def press(self, key):
+        self._pyautogui.press(key)
+
+    def hotkey(self, *keys):
+        self._pyautogui.hotkey(*keys)
+
+class PynputBackend(OutputBackend):
+    """Keystrokes through pynput's keyboard.Controller"""
+
+    def __init__(self, clipboard):
+        from pynput.keyboard import Controller, Key
+        self._controller = Controller()
+        self._key = Key
+        self.clipboard = clipboard
+
+    def _resolve(self, key):
+        # Named keys ('enter', 'ctrl', 'down') map to Key members; single characters are sent as-is
+        if len(key) > 1:
+            return getattr(self._key, key)
+        return key
+
+    def write(self, text, interval=0.0):
+        if not interval:
+            self._controller.type(text)
+            return
+        for char in text:
+            self._controller.type(char)
+            time.sleep(interval)
+
+    def press(self, key):
+        self._controller.tap(self._resolve(key))
+
+    def hotkey(self, *keys):
+        resolved = [self._resolve(key) for key in keys]
+        for key in resolved:
+            self._controller.press(key)
+        for key in reversed(resolved):
+            self._controller.release(key)
+
+class RecordingBackend(OutputBackend):
+    """In-memory backend that logs every event with a perf_counter timestamp"""
+
+    live = False
+
+    def __init__(self, clipboard=None):
+        self.events = []  # (timestamp, kind, value)
+
+    def _record(self, kind, value):
+        self.events.append((time.perf_counter(), kind, value))
+
+    def write(self, text, interval=0.0):
+        self._record('write', text)
+
+    def press(self, key):
+        self._record('press', key)
+
+    def hotkey(self, *keys):
+        self._record('hotkey', keys)
+
+    def paste(self, text):
+        self._record('paste', text)
+
+    def typed_text(self):
+        """Reconstruct the text the recorded events would have produced"""
+        special = {'enter': '\n', 'space': ' ', 'tab': '\t'}
+        output = []
+        for _, kind, value in self.events:
+            if kind in ('write', 'paste'):
+                output.extend(value)
+            elif kind == 'press':
+                if value == 'backspace':
+                    if output:
+                        output.pop()
+                elif value in special:
+                    output.append(special[value])
+                elif len(value) == 1:
+                    output.append(value)
+        return ''.join(output)
+
+    def duration(self):
+        """Seconds between the first and last recorded event"""
+        if len(self.events) < 2:
+            return 0.0
+        return self.events[-1][0] - self.events[0][0]
+
+class MeteredBackend(OutputBackend):
+    """Wraps a backend and accounts for the time spent inside its calls"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.live = backend.live
+        self.calls = 0
+        self.overhead = 0.0  # Total seconds spent in backend calls
+
+    def account(self, elapsed):
+        """Record time spent emitting output outside the wrapped backend"""
+        self.calls += 1
+        self.overhead += elapsed
+
+    def _timed(self, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.account(time.perf_counter() - start)
+
+    def write(self, text, interval=0.0):
+        self._timed(self.backend.write, text, interval)
+
+    def press(self, key):
+        self._timed(self.backend.press, key)
+
+    def hotkey(self, *keys):
+        self._timed(self.backend.hotkey, *keys)
+
+    def paste(self, text):
+        self._timed(self.backend.paste, text)
+
+    def close(self):
+        self.backend.close()
+
+BACKENDS = {
+    'pyautogui': PyAutoGUIBackend,
+    'pynput': PynputBackend,
+    'recording': RecordingBackend,
+}
+
+def create_backend(name, clipboard=None):
+    """Create an output backend by name"""
+    return BACKENDS[name](clipboard)
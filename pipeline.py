@@ -0,0 +1,229 @@
+# Streaming planner pipeline
+# A run is planned as a chain of generator stages (read -> normalize -> block -> plan) on a
+# planner thread that feeds a bounded queue; the executor plays events as soon as the first
+# block is planned. Time to the first keystroke therefore doesn't grow with the document,
+# at most `maxsize` planned blocks are held in memory, and every stage reports how much
+# time it took and how many characters it handled.
+#
+# The read stage can be an in-memory text, a file or a stream such as stdin. Files and
+# streams are decoded chunk by chunk, so typing a file of any size runs in flat memory.
+
+import codecs
+import mmap
+import os
+import queue
+import re
+import threading
+import time
+
+CHUNK_SIZE = 65536     # Characters (or, for files, bytes) read from the source at a time
+MMAP_THRESHOLD = 16 * 1024 * 1024  # Files at least this large are memory-mapped instead of read
+BLOCK_SIZE = 256       # Preferred characters per planned block
+MAX_BLOCK_SIZE = 4096  # Hard cut for text with no whitespace to split at
+# A block may end where whitespace is followed by a non-space, other than fullwidth punctuation
+# (which the burst planner would paste on its own at the start of a block). Each block is
+# planned separately, but the planners carry nothing across such a break, so where the
+# blocks end doesn't change the plan. Chinese sentence breaks are not used: a cut inside a
+# whitespace-free token would change how it is split into words and phrases.
+BLOCK_BOUNDARY = re.compile(r'(?<=\s)(?=[^\s，。！？；：（）「」『』、])')
+
+class StageTimer:
+    """Time spent in one pipeline stage, and the items and characters it produced"""
+
+    def __init__(self, name, upstream=None, size=len):
+        self.name = name
+        self.upstream = upstream
+        self.size = size
+        self.items = 0
+        self.characters = 0
+        self.seconds = 0.0  # Including upstream stages, which run inside this stage's next()
+        self.first_item = None  # perf_counter time the first item was produced
+
+    def wrap(self, iterable):
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds += time.perf_counter() - start
+                return
+            end = time.perf_counter()
+            self.seconds += end - start
+            if self.first_item is None:
+                self.first_item = end
+            self.items += 1
+            self.characters += self.size(item)
+            yield item
+
+    def own_seconds(self):
+        """Time spent in this stage alone"""
+        return self.seconds - (self.upstream.seconds if self.upstream else 0.0)
+
+class PipelineStats:
+    """Per-stage timing for a chain of generator stages"""
+
+    def __init__(self):
+        self.stages = []
+        self.started = time.perf_counter()
+
+    def stage(self, name, iterable, size=len):
+        """Wrap a stage's generator so its time and throughput are measured"""
+        timer = StageTimer(name, self.stages[-1] if self.stages else None, size)
+        self.stages.append(timer)
+        return timer.wrap(iterable)
+
+    def first_item_latency(self):
+        """Seconds from the start of the pipeline until its last stage produced something"""
+        if not self.stages or self.stages[-1].first_item is None:
+            return None
+        return self.stages[-1].first_item - self.started
+
+    def summary(self):
+        """Describe each stage's throughput in one line"""
+        parts = []
+        for stage in self.stages:
+            seconds = stage.own_seconds()
+            rate = f"{stage.characters / seconds / 1000:.0f}k chars/s" if seconds > 0 else "-"
+            parts.append(f"{stage.name} {stage.items} items {seconds * 1000:.1f} ms ({rate})")
+        latency = self.first_item_latency()
+        if latency is not None:
+            parts.append(f"first block after {latency * 1000:.1f} ms")
+        return ", ".join(parts)
+
+def text_chunks(text, size=CHUNK_SIZE):
+    """Feed an in-memory text into the pipeline in chunks"""
+    for start in range(0, len(text), size):
+        yield text[start:start + size]
+
+def file_chunks(path, size=CHUNK_SIZE, encoding='utf-8-sig'):
+    """Decode a text file incrementally; a character split across two reads is joined by the decoder"""
+    decoder = codecs.getincrementaldecoder(encoding)()
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size >= MMAP_THRESHOLD:
+            # Slices of the mapping are read straight from the page cache without a read() copy
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                for start in range(0, len(data), size):
+                    text = decoder.decode(data[start:start + size])
+                    if text:
+                        yield text
+        else:
+            for raw in iter(lambda: f.read(size), b''):
+                text = decoder.decode(raw)
+                if text:
+                    yield text
+    text = decoder.decode(b'', final=True)
+    if text:
+        yield text
+
+def stream_chunks(stream, size=CHUNK_SIZE):
+    """Read an open text stream such as sys.stdin in chunks until it ends"""
+    for text in iter(lambda: stream.read(size), ''):
+        yield text
+
+def normalize(chunks):
+    """Normalize line endings to '\\n', including a '\\r\\n' split across two chunks"""
+    pending = ''
+    for chunk in chunks:
+        chunk = pending + chunk
+        pending = ''
+        if chunk.endswith('\r'):
+            pending, chunk = '\r', chunk[:-1]
+        if chunk:
+            yield chunk.replace('\r\n', '\n').replace('\r', '\n')
+    if pending:
+        yield '\n'
+
+def _cut_point(text, start, block_size, max_block_size):
+    """Where the block starting at `start` should end: its last boundary within block_size, else the first after"""
+    cut = None
+    # Never cut at `start` itself: an empty block would not advance
+    for match in BLOCK_BOUNDARY.finditer(text, start + max(1, block_size // 2), start + block_size + 1):
+        cut = match.start()
+    if cut is None:
+        match = BLOCK_BOUNDARY.search(text, start + block_size, start + max_block_size + 1)
+        cut = match.start() if match else None
+    return cut
+
+def split_blocks(chunks, block_size=BLOCK_SIZE, max_block_size=MAX_BLOCK_SIZE):
+    """Regroup text chunks into (block, is_last) pairs that end between words where possible
+
+    A run of more than max_block_size characters without a boundary is cut every
+    max_block_size characters from the boundary before it, whatever the block size, so
+    the plan of a text doesn't depend on block_size (Instant mode may send an ASCII run as
+    two writes, with the same keys and timing). Raises ValueError unless
+    2 <= block_size <= max_block_size.
+    """
+    if block_size < 2 or max_block_size < block_size:
+        raise ValueError(f"Need 2 <= block_size <= max_block_size, got {block_size} and {max_block_size}")
+    buffer, start = '', 0
+    for chunk in chunks:
+        buffer = buffer[start:] + chunk
+        start = 0
+        while len(buffer) - start > block_size:
+            cut = _cut_point(buffer, start, block_size, max_block_size)
+            if cut is None:
+                if len(buffer) - start < max_block_size:
+                    break  # Wait for more text; a boundary may still follow
+                # End this block at the boundary before the long run, so the run's hard cuts
+                # fall at the same places for any block size
+                for match in BLOCK_BOUNDARY.finditer(buffer, start + 1, start + max_block_size + 1):
+                    cut = match.start()
+                if cut is None:
+                    cut = start + max_block_size
+            yield buffer[start:cut], False
+            start = cut
+    yield buffer[start:], True
+
+class _Failure:
+    """Wraps an exception raised on the planner thread so the consumer can re-raise it"""
+
+    def __init__(self, error):
+        self.error = error
+
+class Planner(threading.Thread):
+    """Runs a pipeline on its own thread and hands its items over through a bounded queue"""
+
+    _DONE = object()
+
+    def __init__(self, source, maxsize=64):
+        super().__init__(daemon=True)
+        self.source = source
+        self.queue = queue.Queue(maxsize)
+        self.stopped = threading.Event()
+        self.starved = 0.0  # Seconds the consumer waited for the planner
+
+    def run(self):
+        try:
+            for item in self.source:
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(_Failure(e))
+        finally:
+            self._put(self._DONE)
+
+    def _put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def items(self):
+        """Yield the planned items in order; re-raises an error from the planner thread"""
+        while True:
+            start = time.perf_counter()
+            item = self.queue.get()
+            self.starved += time.perf_counter() - start
+            if item is self._DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    def stop(self):
+        """Ask the planner thread to stop at the next item"""
+        self.stopped.set()
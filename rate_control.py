@@ -0,0 +1,77 @@
+# Closed-loop typing rate control
+# The speed presets only fix the delay ranges; the rate a run actually reaches also depends
+# on speed variation, thinking pauses and corrections. RateController measures the achieved
+# rate over a sliding window of typed characters and adjusts one scale factor that every
+# human-like delay is multiplied by, so the run holds a target rate while each delay keeps
+# its random variation.
+
+import time
+from collections import deque
+
+# Characters counted as one unit of each target rate (a "word" is 5 characters by convention)
+CHARS_PER_UNIT = {"WPM": 5, "CPM": 1}
+SCALE_LIMITS = (0.05, 20.0)  # Bounds of the delay scale factor
+
+def target_cps(target_rate, unit="WPM"):
+    """Characters per second for a target rate"""
+    return target_rate * CHARS_PER_UNIT[unit] / 60.0
+
+class RateController:
+    """Scales delays so the measured characters per second track a target"""
+
+    def __init__(self, target_rate, unit="WPM", window=5.0, update_interval=1.0, gain=0.5,
+                 scale_limits=SCALE_LIMITS, clock=time.perf_counter):
+        self.target_rate = target_rate
+        self.unit = unit
+        self.target_cps = target_cps(target_rate, unit)
+        self.window = window
+        self.update_interval = update_interval
+        self.gain = gain
+        self.scale_limits = scale_limits
+        self.clock = clock
+        self.start()
+
+    def start(self):
+        """Forget previous measurements at the beginning of a run"""
+        now = self.clock()
+        self.scale = 1.0
+        self.total = 0
+        self._samples = deque([(now, 0)])  # (time, characters typed so far)
+        self._last_update = now
+
+    def record(self, count):
+        """Note that `count` more characters of the text were typed"""
+        now = self.clock()
+        self.total += count
+        self._samples.append((now, self.total))
+        # Keep one sample at or before the window start as the measurement base
+        while len(self._samples) > 2 and self._samples[1][0] <= now - self.window:
+            self._samples.popleft()
+
+        if now - self._last_update >= self.update_interval:
+            self._last_update = now
+            achieved = self.achieved_cps()
+            if achieved > 0:
+                # Integral control on a log scale: too fast -> longer delays, too slow -> shorter
+                low, high = self.scale_limits
+                self.scale = min(high, max(low, self.scale * (achieved / self.target_cps) ** self.gain))
+
+    def shift(self, seconds):
+        """Leave `seconds` (a paused stretch) out of the measurement by moving the samples later"""
+        self._samples = deque((when + seconds, total) for when, total in self._samples)
+        self._last_update += seconds
+
+    def achieved_cps(self):
+        """Characters per second over the sliding window"""
+        (start, start_total), (end, end_total) = self._samples[0], self._samples[-1]
+        if end <= start:
+            return 0.0
+        return (end_total - start_total) / (end - start)
+
+    def achieved_rate(self):
+        """Achieved rate in the target's unit"""
+        return self.achieved_cps() * 60.0 / CHARS_PER_UNIT[self.unit]
+
+    def status(self):
+        """Describe achieved versus target rate"""
+        return f"{self.achieved_rate():.0f} / {self.target_rate:.0f} {self.unit}"
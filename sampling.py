@@ -0,0 +1,90 @@
+# Seeded, block-generated random sampling for a typing run
+# Every delay and error decision of a run is drawn from one Sampler seeded at the start of
+# the run, so a run can be reproduced exactly from its seed. Random numbers are generated
+# in blocks (vectorized with NumPy when it is installed) and handed out one at a time.
+# NumPy and the pure-Python fallback produce different streams for the same seed.
+
+import math
+import random
+
+_numpy = False  # NumPy module, None if it isn't installed, False until first looked up
+
+def _load_numpy():
+    """Import NumPy on first use; importing it at startup would delay the window"""
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy = numpy
+    return _numpy
+
+# Shapes available for the base inter-key delay; all keep the mean of the speed preset's range
+DISTRIBUTIONS = ("Uniform", "Log-normal", "Gamma")
+LOGNORMAL_SIGMA = 0.5  # Spread of the log-normal delay (sigma of the underlying normal)
+GAMMA_SHAPE = 4.0      # Gamma shape parameter; lower values give a longer tail
+
+class Sampler:
+    """Seeded source of uniform numbers, choices and inter-key delays"""
+
+    def __init__(self, seed=None, distribution="Uniform", block_size=4096):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown delay distribution '{distribution}'")
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        self.seed = seed
+        self.distribution = distribution
+        self.block_size = block_size
+        self._rng = None  # Created with the first block, so an unused Sampler costs nothing
+        self._streams = {}  # stream name -> remaining values, next value last
+        self._uniform = []  # The 'uniform' stream, kept apart because every decision draws from it
+
+    def _generate(self, stream):
+        """Generate one block of a stream: 'uniform' in [0, 1), standard 'normal' or standard 'gamma'"""
+        size = self.block_size
+        numpy = _load_numpy()
+        if self._rng is None:
+            self._rng = numpy.random.default_rng(self.seed) if numpy is not None else random.Random(self.seed)
+        if numpy is not None:
+            if stream == 'uniform':
+                block = self._rng.random(size)
+            elif stream == 'normal':
+                block = self._rng.standard_normal(size)
+            else:
+                block = self._rng.standard_gamma(GAMMA_SHAPE, size)
+            return block[::-1].tolist()
+        if stream == 'uniform':
+            return [self._rng.random() for _ in range(size)]
+        elif stream == 'normal':
+            return [self._rng.gauss(0.0, 1.0) for _ in range(size)]
+        return [self._rng.gammavariate(GAMMA_SHAPE, 1.0) for _ in range(size)]
+
+    def _next(self, stream):
+        values = self._streams.get(stream)
+        if not values:
+            values = self._streams[stream] = self._generate(stream)
+        return values.pop()
+
+    def random(self):
+        """Uniform number in [0, 1)"""
+        if not self._uniform:
+            self._uniform = self._generate('uniform')
+        return self._uniform.pop()
+
+    def uniform(self, a, b):
+        """Uniform number between a and b"""
+        return a + (b - a) * self.random()
+
+    def choice(self, seq):
+        """Random element of a non-empty sequence"""
+        return seq[int(self.random() * len(seq))]
+
+    def delay(self, low, high):
+        """Inter-key delay with the mean of [low, high], shaped by the configured distribution"""
+        if self.distribution == "Uniform":
+            return self.uniform(low, high)
+        mean = (low + high) / 2
+        if self.distribution == "Log-normal":
+            return mean * math.exp(LOGNORMAL_SIGMA * self._next('normal') - LOGNORMAL_SIGMA ** 2 / 2)
+        return mean * self._next('gamma') / GAMMA_SHAPE
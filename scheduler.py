@@ -0,0 +1,151 @@
+# Deadline-based keystroke scheduler
+# Every intentional delay moves an absolute deadline on time.perf_counter forward instead of
+# starting a fresh sleep from "now". Time spent in backend calls and any oversleep are
+# therefore absorbed by the next paced delay, so a run takes as long as planned no matter how
+# many events it has. Unpaced delays (IME and clipboard settles) are never cut short. Waits sleep coarsely and spin for the last stretch, because time.sleep
+# usually wakes up late (by up to a timer tick, ~15 ms on Windows).
+#
+# Waits sleep on a threading.Event instead of time.sleep, so a stop or pause request ends
+# them within milliseconds instead of after the rest of a long thinking pause.
+
+import sys
+import threading
+import time
+
+# Remaining time below which a wait stops sleeping and spins until the deadline
+SPIN_THRESHOLD = 0.016 if sys.platform == 'win32' else 0.002
+
+class RunControl:
+    """Stop and pause/resume requests for a run; every method is safe to call from any thread"""
+
+    def __init__(self):
+        self.interrupt = threading.Event()  # Set while a stop or pause is pending; ends waits early
+        self._resumed = threading.Event()
+        # Makes each request's check-then-set atomic, so a pause racing a stop can't leave a
+        # stopped run paused (and a worker held in hold() forever)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Clear any request before a new run"""
+        with self._lock:
+            self.stopped = False
+            self.stop_time = None  # perf_counter time of the stop request
+            self._resumed.set()
+            self.interrupt.clear()
+
+    def stop(self):
+        with self._lock:
+            if not self.stopped:
+                self.stop_time = time.perf_counter()
+            self.stopped = True
+            self.interrupt.set()
+            self._resumed.set()  # Wake a paused run so it can end
+
+    def pause(self):
+        with self._lock:
+            if not self.stopped:
+                self._resumed.clear()
+                self.interrupt.set()
+
+    def resume(self):
+        with self._lock:
+            if not self.stopped:
+                self.interrupt.clear()
+                self._resumed.set()
+
+    @property
+    def paused(self):
+        return not self._resumed.is_set()
+
+    def hold(self):
+        """Block while the run is paused; returns the seconds spent paused"""
+        start = time.perf_counter()
+        self._resumed.wait()
+        return time.perf_counter() - start
+
+    def sleep(self, seconds):
+        """Sleep for `seconds`; returns False if a stop or pause request ended the sleep early"""
+        return not self.interrupt.wait(seconds)
+
+    def wait(self, seconds):
+        """Sleep for `seconds`, holding while paused; returns False if the run is stopped first"""
+        end = time.perf_counter() + seconds
+        while not self.sleep(end - time.perf_counter()):
+            if self.stopped:
+                return False
+            end += self.hold()
+        return True
+
+class DeadlineScheduler:
+    """Schedules waits against absolute perf_counter deadlines and records how late each one ends"""
+
+    def __init__(self, spin_threshold=SPIN_THRESHOLD, clock=time.perf_counter, interrupt=None):
+        self.spin_threshold = spin_threshold
+        self.clock = clock
+        # Event that ends waits early when set (RunControl.interrupt); never set by default
+        self.interrupt = interrupt if interrupt is not None else threading.Event()
+        self.start()
+
+    def start(self):
+        """Anchor the schedule at the current time and clear the statistics"""
+        self.origin = self.deadline = self.clock()
+        self.planned = 0.0    # Sum of all requested delays
+        self.overshoots = []  # Seconds past the deadline at which each slept wait returned
+        self.late = 0         # Waits whose deadline had already passed (backend calls ran long)
+        self.paused = 0.0     # Seconds the schedule was shifted by pauses
+
+    def wait(self, seconds, paced=True):
+        """Wait until the previous deadline plus `seconds`
+
+        Only paced waits absorb lateness. An unpaced wait is a minimum gap the target needs (an
+        IME or clipboard settle), so when the run is behind it is timed from now instead.
+        Returns False if the interrupt event ended the wait early; wait(0) then finishes it.
+        """
+        self.planned += seconds
+        if paced:
+            self.deadline += seconds
+        else:
+            self.deadline = max(self.deadline, self.clock()) + seconds
+        remaining = self.deadline - self.clock()
+        if remaining <= 0:
+            # Already behind: skip the wait and let the following delays catch up
+            self.late += 1
+            return True
+        if remaining > self.spin_threshold:
+            if self.interrupt.wait(remaining - self.spin_threshold):
+                return False
+        while self.clock() < self.deadline:
+            if self.interrupt.is_set():
+                return False
+            time.sleep(0)  # Yield the GIL while spinning
+        self.overshoots.append(self.clock() - self.deadline)
+        return True
+
+    def shift(self, seconds):
+        """Move the schedule later by `seconds`, e.g. the length of a pause"""
+        self.deadline += seconds
+        self.paused += seconds
+
+    def drift(self):
+        """Seconds the run is behind (positive) or ahead of its planned schedule, pauses excluded"""
+        return self.clock() - self.deadline
+
+    def overshoot_percentiles(self, percentiles=(50, 90, 99, 100)):
+        """Get {percentile: overshoot seconds} over every slept wait"""
+        if not self.overshoots:
+            return {}
+        ordered = sorted(self.overshoots)
+        last = len(ordered) - 1
+        return {p: ordered[round(last * p / 100)] for p in percentiles}
+
+    def summary(self):
+        """Describe drift and the overshoot distribution in one line"""
+        text = f"drift {self.drift() * 1000:+.1f} ms"
+        stats = self.overshoot_percentiles()
+        if stats:
+            text += ", overshoot " + " / ".join(
+                f"{'max' if p == 100 else f'p{p}'} {value * 1000:.2f} ms" for p, value in stats.items())
+        if self.late:
+            text += f", {self.late} waits already late"
+        return text
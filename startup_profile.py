@@ -0,0 +1,60 @@
+# Startup timing
+# `python auto_typer.py --startup-profile` prints how long each import and initialization
+# step took between launch and the window appearing. Disabled profiles cost nothing.
+
+import builtins
+import sys
+import time
+
+class StartupProfile:
+    """Records the steps between launch and the first window"""
+
+    def __init__(self, enabled=False, start=None):
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.last = self.start
+        self.steps = []  # (name, seconds, is an import)
+        self._import = None
+        self._depth = 0
+        if enabled:
+            self._hook_imports()
+
+    def _hook_imports(self):
+        """Time each top-level import statement (imports nested inside it count towards it)"""
+        original = self._import = builtins.__import__
+
+        def timed_import(name, *args, **kwargs):
+            if self._depth:
+                return original(name, *args, **kwargs)
+            start = time.perf_counter()
+            self._depth += 1
+            try:
+                return original(name, *args, **kwargs)
+            finally:
+                self._depth -= 1
+                elapsed = time.perf_counter() - start
+                if elapsed >= 0.0001:  # Skip modules that were already loaded
+                    self.steps.append((name, elapsed, True))
+
+        builtins.__import__ = timed_import
+
+    def mark(self, name):
+        """Note that the step `name` just finished"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last, False))
+        self.last = now
+
+    def report(self, file=sys.stdout):
+        """Print the breakdown and stop timing imports"""
+        if not self.enabled:
+            return
+        if self._import is not None:
+            builtins.__import__ = self._import
+            self._import = None
+        print("Startup profile (ms):", file=file)
+        for name, seconds, is_import in self.steps:
+            label = f"  import {name}" if is_import else name
+            print(f"  {label:<32} {seconds * 1000:8.1f}", file=file)
+        print(f"  {'total':<32} {(self.last - self.start) * 1000:8.1f}", file=file)
@@ -0,0 +1,59 @@
+# Tests for saving and restoring the user's clipboard around a run
+# Run with: python -m pytest
+
+import sys
+import types
+
+from clipboard import PyperclipClipboard, TkClipboard
+from command_bus import CommandBus
+
+class FakeRoot:
+    """The clipboard calls of a Tk root, kept in memory"""
+
+    def __init__(self, text=None):
+        self.text = text
+
+    def clipboard_clear(self):
+        self.text = ''
+
+    def clipboard_append(self, text):
+        self.text += text
+
+    def clipboard_get(self):
+        if not self.text:
+            raise RuntimeError("CLIPBOARD selection doesn't exist")
+        return self.text
+
+def test_tk_restore_puts_back_saved_text():
+    root = FakeRoot("user text")
+    clipboard = TkClipboard(root, CommandBus())
+    clipboard.save()
+    clipboard.copy("typed")
+    clipboard.restore()
+    assert clipboard.get() == "user text"
+
+def test_tk_restore_clears_a_clipboard_that_was_empty():
+    root = FakeRoot()
+    clipboard = TkClipboard(root, CommandBus())
+    clipboard.save()
+    clipboard.copy("typed")
+    clipboard.restore()
+    assert clipboard.get() is None
+
+def test_restore_without_save_leaves_the_clipboard_alone():
+    root = FakeRoot()
+    clipboard = TkClipboard(root, CommandBus())
+    clipboard.copy("typed")
+    clipboard.restore()
+    assert clipboard.get() == "typed"
+
+def test_pyperclip_restore_clears_a_clipboard_that_was_empty(monkeypatch):
+    module = types.SimpleNamespace(text='')
+    module.copy = lambda text: setattr(module, 'text', text)
+    module.paste = lambda: module.text
+    monkeypatch.setitem(sys.modules, 'pyperclip', module)
+    clipboard = PyperclipClipboard()
+    clipboard.save()
+    clipboard.copy("typed")
+    clipboard.restore()
+    assert module.text == ''
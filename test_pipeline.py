@@ -0,0 +1,58 @@
+# Tests for the streaming planner pipeline
+# Run with: python -m pytest
+
+import itertools
+import random
+
+import pytest
+
+import typing_engine
+from pipeline import split_blocks, text_chunks
+from typing_config import DEFAULT_SETTINGS, build_config
+from typing_engine import TypingEngine
+
+TEXT = ("Hello, world!  我們今天去看書。你好嗎？好！\n"
+        "The quick brown fox，「跳過」 the lazy dog; 爸爸媽媽在家。\n") * 20
+
+@pytest.mark.parametrize('block_size', [1, 0, -3])
+def test_split_blocks_rejects_block_sizes_below_two(block_size):
+    with pytest.raises(ValueError):
+        next(split_blocks(["a b c"], block_size))
+
+def test_split_blocks_round_trips_at_the_smallest_block_size():
+    rng = random.Random(0)
+    for _ in range(200):
+        text = ''.join(rng.choice("ab 。\n你") for _ in range(rng.randrange(40)))
+        chunks = [text[i:i + 3] for i in range(0, len(text), 3)]
+        # The zero-length cut loop yielded empty blocks forever; cap the count to fail instead
+        blocks = list(itertools.islice(split_blocks(chunks, 2, 8), len(text) + 2))
+        assert blocks[-1][1]
+        assert ''.join(block for block, _ in blocks) == text
+        assert all(block for block, _ in blocks[:-1])
+        assert all(len(block) <= 8 for block, _ in blocks)
+
+@pytest.mark.parametrize('settings', [
+    dict(word_by_word=False),
+    dict(word_by_word=True),
+    dict(word_by_word=True, input_method="Zhuyin"),
+    dict(burst_paste=True, burst_chunk=8),
+    dict(burst_paste=True, burst_chunk=8, input_method="Zhuyin"),
+])
+def test_plan_does_not_depend_on_block_size(monkeypatch, settings):
+    config = build_config(dict(DEFAULT_SETTINGS, output_backend="recording", seed=7, **settings))
+    plans = []
+    for block_size in (2, 40, 256, 100_000):
+        monkeypatch.setattr(typing_engine, 'split_blocks',
+                            lambda chunks, size=block_size: split_blocks(chunks, size, 100_000))
+        plans.append(TypingEngine(config).compile_plan(TEXT).events)
+    assert all(plan == plans[0] for plan in plans[1:])
+
+def test_long_runs_are_cut_at_the_same_places_for_any_block_size():
+    text = "lead " + "你" * 50 + " tail " + "好" * 30
+    cuts = set()
+    for block_size in (2, 7, 16):
+        blocks = [block for block, _ in split_blocks(text_chunks(text, 5), block_size, 16)]
+        assert ''.join(blocks) == text
+        positions = list(itertools.accumulate(len(block) for block in blocks))
+        cuts.add(tuple(p for p in positions if text[p - 1] in "你好" and p < len(text)))
+    assert len(cuts) == 1
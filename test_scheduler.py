@@ -0,0 +1,33 @@
+# Tests for the deadline scheduler and run control
+# Run with: python -m pytest
+
+import threading
+import time
+
+from scheduler import DeadlineScheduler, RunControl
+
+def test_paced_wait_absorbs_lateness():
+    scheduler = DeadlineScheduler()
+    time.sleep(0.05)  # A slow backend call
+    start = time.perf_counter()
+    assert scheduler.wait(0.03)
+    assert time.perf_counter() - start < 0.01
+    assert scheduler.late == 1
+
+def test_unpaced_wait_keeps_its_gap_when_late():
+    scheduler = DeadlineScheduler()
+    time.sleep(0.05)
+    for _ in range(2):
+        start = time.perf_counter()
+        assert scheduler.wait(0.02, paced=False)
+        assert time.perf_counter() - start >= 0.02
+    assert scheduler.late == 0
+
+def test_pause_racing_stop_never_leaves_a_stopped_run_paused():
+    for _ in range(2000):
+        control = RunControl()
+        pauser = threading.Thread(target=control.pause)
+        pauser.start()
+        control.stop()
+        pauser.join()
+        assert control.stopped and not control.paused
@@ -0,0 +1,61 @@
+# Tests for the typing engine on in-memory backends
+# Run with: python -m pytest
+
+import output_backends
+import typing_engine
+from output_backends import RecordingBackend
+from typing_config import DEFAULT_SETTINGS, build_config
+from typing_engine import TypingEngine
+
+class FakeClipboard:
+    """Clipboard kept in memory, recording every copy"""
+
+    def __init__(self):
+        self.text = "user text"
+        self.copies = []
+
+    def copy(self, text):
+        self.text = text
+        self.copies.append(text)
+
+    def get(self):
+        return self.text
+
+    def save(self):
+        self.saved = self.text
+
+    def restore(self):
+        self.text = self.saved
+
+class LiveRecordingBackend(RecordingBackend):
+    """Recording backend that pastes through its clipboard like the desktop backends do"""
+
+    def __init__(self, clipboard):
+        super().__init__()
+        self.clipboard = clipboard
+
+    def paste(self, text):
+        output_backends.OutputBackend.paste(self, text)
+        self._record('paste', text)
+
+def test_readme_example_pastes_through_default_clipboard(monkeypatch):
+    clipboards = []
+
+    def open_clipboard():
+        clipboards.append(FakeClipboard())
+        return clipboards[-1]
+
+    monkeypatch.setitem(output_backends.BACKENDS, 'pyautogui', LiveRecordingBackend)
+    monkeypatch.setattr(typing_engine, 'PyperclipClipboard', open_clipboard)
+    config = build_config(dict(DEFAULT_SETTINGS, speed="Instant", seed=42, input_method="Copy-Paste",
+                               enable_errors=False))
+    engine = TypingEngine()
+    engine.punctuation_errors = {}
+    engine.paste_settle_delay = 0.0
+    result = engine.type("Hello, 你好!", config)
+
+    assert result['completed']
+    assert len(clipboards) == 1
+    assert clipboards[0].copies
+    assert clipboards[0].text == "user text"  # Handed back after the run
+    assert engine.output.backend.typed_text() == "Hello, 你好!"
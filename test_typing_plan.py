@@ -0,0 +1,49 @@
+# Tests for saving and loading typing plans
+# Run with: python -m pytest
+
+import json
+
+import pytest
+
+from typing_plan import PLAN_FORMAT, PLAN_VERSION, TypingPlan
+
+def write_plan(path, events, **header):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(dict({'format': PLAN_FORMAT, 'version': PLAN_VERSION, 'seed': 3}, **header)) + '\n')
+        for event in events:
+            f.write((event if isinstance(event, str) else json.dumps(event)) + '\n')
+
+def test_save_and_load_round_trip(tmp_path):
+    plan = TypingPlan(seed=42)
+    plan.write("hi", 0.01)
+    plan.press('enter')
+    plan.paste("你好")
+    plan.insert("世界")
+    plan.pause(0.5)
+    plan.pause(0, False)
+    plan.progress(6)
+    plan.errors = 2
+    path = tmp_path / "plan.jsonl"
+    plan.save(path)
+    loaded = TypingPlan.load(path)
+    assert loaded.events == plan.events
+    assert (loaded.seed, loaded.errors) == (42, 2)
+
+@pytest.mark.parametrize('event', [
+    5, {"events": [5]}, [], [5], ["jump"], "not json",
+    ["pause", "x", True], ["pause", 0.1, 1], ["pause", -1, True], ["pause", 0.1],
+    ["write", 3], ["write", "a", None], ["write", "a", True], ["press", None],
+    ["progress", 1.5], ["progress", -1], ["progress", True],
+])
+def test_load_rejects_malformed_events(tmp_path, event):
+    path = tmp_path / "plan.jsonl"
+    write_plan(path, [["press", "a"], event])
+    with pytest.raises(ValueError, match=r"^Event 1 \(line 3\)"):
+        TypingPlan.load(path)
+
+@pytest.mark.parametrize('header', [{'seed': "x"}, {'seed': -1}, {'errors': None}])
+def test_load_rejects_malformed_header(tmp_path, header):
+    path = tmp_path / "plan.jsonl"
+    write_plan(path, [], **header)
+    with pytest.raises(ValueError):
+        TypingPlan.load(path)
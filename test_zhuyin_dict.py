@@ -0,0 +1,73 @@
+# Tests for the compiled Zhuyin dictionary format
+# Run with: python -m pytest
+
+import pytest
+
+from zhuyin_dict import HEADER, ZhuyinDictionary, compile_dictionary, open_dictionary, parse_source
+
+ENTRIES = [
+    ('ㄋㄧˇ', '你', 50), ('ㄋㄧˇ', '妳', 80), ('ㄋㄧˇ ㄏㄠˇ', '你好', 30),
+    ('ㄏㄠˇ', '好', 10), ('ㄋㄧˇ', '你', 70),  # Duplicates keep their highest frequency
+]
+
+@pytest.fixture
+def dictionary(tmp_path):
+    path = str(tmp_path / "test.dict")
+    assert compile_dictionary(ENTRIES, path) == 4
+    dictionary = ZhuyinDictionary(path)
+    yield dictionary
+    dictionary.close()
+
+def test_candidates_are_ranked_by_frequency(dictionary):
+    assert dictionary.get_candidates('ㄋㄧˇ') == ['妳', '你']
+    assert dictionary.get_candidates('ㄇㄚ') == []
+
+def test_find_candidate_and_readings(dictionary):
+    assert dictionary.find_candidate('你') == ('ㄋㄧˇ', 1)
+    assert dictionary.find_candidate('你好') == ('ㄋㄧˇ ㄏㄠˇ', 0)
+    assert dictionary.find_candidate('他') is None
+    assert dictionary.get_readings('好') == ['ㄏㄠˇ']
+    assert dictionary.match_ends("你好嗎", 0) == [1, 2]
+
+def test_entries_round_trip(dictionary):
+    assert sorted(dictionary.entries()) == sorted([
+        ('ㄋㄧˇ', '妳', 80), ('ㄋㄧˇ', '你', 70), ('ㄋㄧˇ ㄏㄠˇ', '你好', 30), ('ㄏㄠˇ', '好', 10)])
+    assert len(dictionary) == 4
+
+def test_source_order_is_kept_without_frequency_ranking(tmp_path):
+    path = str(tmp_path / "ordered.dict")
+    compile_dictionary(ENTRIES, path, rank_by_frequency=False)
+    dictionary = ZhuyinDictionary(path)
+    try:
+        assert dictionary.get_candidates('ㄋㄧˇ') == ['你', '妳']
+    finally:
+        dictionary.close()
+
+def test_parse_source():
+    lines = ["# comment", "ㄋㄧˇ\t你\t5", "", "ㄏㄠˇ 好"]
+    assert list(parse_source(lines)) == [('ㄋㄧˇ', '你', 5), ('ㄏㄠˇ', '好', 0)]
+    with pytest.raises(ValueError):
+        list(parse_source(["ㄋㄧˇ"]))
+
+@pytest.mark.parametrize('size', [1, HEADER.size - 1, HEADER.size, HEADER.size + 10])
+def test_truncated_files_are_rejected(tmp_path, size):
+    path = str(tmp_path / "test.dict")
+    compile_dictionary(ENTRIES, path)
+    with open(path, 'rb') as f:
+        data = f.read()
+    with open(path, 'wb') as f:
+        f.write(data[:size])
+    with pytest.raises(ValueError):
+        ZhuyinDictionary(path)
+    assert open_dictionary(path) is None
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = str(tmp_path / "test.dict")
+    compile_dictionary(ENTRIES, path)
+    with open(path, 'r+b') as f:
+        f.write(b'XXXX')
+    with pytest.raises(ValueError, match="not a compiled"):
+        ZhuyinDictionary(path)
+
+def test_missing_file_opens_as_none(tmp_path):
+    assert open_dictionary(str(tmp_path / "missing.dict")) is None
@@ -0,0 +1,36 @@
+# Tests for the user dictionary overlay
+# Run with: python -m pytest
+
+import pytest
+
+import zhuyin_mapping
+from zhuyin_mapping import (add_user_entry, find_candidate, get_candidates, load_user_dictionary,
+                            save_user_dictionary)
+
+@pytest.fixture
+def user_dictionary(monkeypatch):
+    monkeypatch.setattr(zhuyin_mapping, 'USER_DICTIONARY', {})
+    monkeypatch.setattr(zhuyin_mapping, 'WORD_FREQUENCIES', {})
+
+def test_user_candidates_come_first(user_dictionary):
+    builtin = get_candidates('ㄋㄧˇ')
+    add_user_entry('ㄋㄧˇ', '丄')
+    assert get_candidates('ㄋㄧˇ') == ['丄'] + builtin
+    assert find_candidate('丄') == ('ㄋㄧˇ', 0)
+
+def test_user_candidate_order_survives_save_and_load(user_dictionary, monkeypatch, tmp_path):
+    path = str(tmp_path / "user.dict")
+    add_user_entry('ㄋㄧˇ', '丄', 1)
+    add_user_entry('ㄋㄧˇ', '丂', 5)  # A higher count must not move it ahead
+    save_user_dictionary(path)
+
+    monkeypatch.setattr(zhuyin_mapping, 'USER_DICTIONARY', {})
+    assert load_user_dictionary(path)
+    assert get_candidates('ㄋㄧˇ')[:2] == ['丄', '丂']
+    assert zhuyin_mapping.WORD_FREQUENCIES['丂'] == 5
+
+def test_add_user_entry_rejects_non_zhuyin_readings(user_dictionary):
+    with pytest.raises(ValueError):
+        add_user_entry('ni3', '你')
+    with pytest.raises(ValueError):
+        add_user_entry('ㄋㄧˇ', '')
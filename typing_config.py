@@ -0,0 +1,144 @@
+# Frozen typing settings for a run
+# The settings widgets are read and validated once when a run starts. The typing thread
+# then reads plain attributes of an immutable TypingConfig instead of calling .get() on
+# Tk variables (a cross-thread Tcl round trip) for every character.
+
+from rate_control import CHARS_PER_UNIT
+from sampling import DISTRIBUTIONS
+
+# (min delay, max delay, word delay, sentence delay) in seconds for each speed preset
+SPEED_DELAYS = {
+    "Very Slow": (0.1, 0.3, 0.5, 1.2),
+    "Slow": (0.08, 0.2, 0.4, 1.0),
+    "Medium": (0.05, 0.15, 0.3, 0.8),
+    "Fast": (0.03, 0.1, 0.2, 0.5),
+    "Very Fast": (0.01, 0.05, 0.1, 0.3),
+    "Instant": (0.0, 0.0, 0.0, 0.0)
+}
+
+# Raw settings a run starts from when nothing else is chosen (the GUI's initial widget values)
+DEFAULT_SETTINGS = {
+    'speed': "Medium",
+    'word_by_word': True,
+    'output_backend': "pyautogui",
+    'input_method': "Direct",
+    'layout': "Standard",
+    'burst_paste': False,
+    'burst_chunk': 50,
+    'burst_pacing': True,
+    'enable_errors': True,
+    'error_rate': 15,
+    'auto_correct': True,
+    'correction_rate': 80,
+    'speed_variation': True,
+    'thinking_pauses': True,
+    'pause_freq': 10,
+    'min_pause': 0.5,
+    'max_pause': 2.0,
+    'target_enabled': False,
+    'target_rate': 85,
+    'target_unit': "WPM",
+    'seed': "",
+    'delay_distribution': "Uniform",
+    'learn': False,
+}
+
+class TypingConfig:
+    """Read-only snapshot of every setting the typing engine uses"""
+
+    __slots__ = (
+        'speed', 'min_delay', 'max_delay', 'word_delay', 'sentence_delay',
+        'word_by_word', 'output_backend', 'input_method', 'layout',
+        'burst_paste', 'burst_chunk', 'burst_pacing',
+        'enable_errors', 'error_rate', 'auto_correct', 'correction_rate',
+        'speed_variation', 'thinking_pauses', 'pause_rate', 'min_pause', 'max_pause',
+        'target_rate', 'target_unit', 'seed', 'delay_distribution', 'learn',
+    )
+
+    def __init__(self, **settings):
+        missing = [name for name in self.__slots__ if name not in settings]
+        if missing:
+            raise TypeError(f"Missing settings: {', '.join(missing)}")
+        for name in self.__slots__:
+            object.__setattr__(self, name, settings[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("TypingConfig is read-only; use replace() to derive a new one")
+
+    def __delattr__(self, name):
+        raise AttributeError("TypingConfig is read-only")
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"TypingConfig({fields})"
+
+    def replace(self, **changes):
+        """Return a copy with some settings changed"""
+        settings = {name: getattr(self, name) for name in self.__slots__}
+        settings.update(changes)
+        return TypingConfig(**settings)
+
+def _number(value, label, low, high, kind=float):
+    """Parse a settings field, raising ValueError with a message fit for the user"""
+    try:
+        number = kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{label} must be a number, got '{value}'") from None
+    if not low <= number <= high:
+        raise ValueError(f"{label} must be between {low} and {high}, got {number}")
+    return number
+
+def build_config(settings):
+    """Validate raw widget values (a dict of name -> value) and freeze them into a TypingConfig"""
+    speed = settings['speed']
+    if speed not in SPEED_DELAYS:
+        raise ValueError(f"Unknown typing speed '{speed}'")
+    min_delay, max_delay, word_delay, sentence_delay = SPEED_DELAYS[speed]
+
+    target_rate = None
+    if settings['target_enabled']:
+        if settings['target_unit'] not in CHARS_PER_UNIT:
+            raise ValueError(f"Unknown target rate unit '{settings['target_unit']}'")
+        target_rate = _number(settings['target_rate'], "Target rate", 1, 5000)
+
+    # A blank seed means a fresh random seed for every run
+    seed = None
+    if str(settings['seed']).strip():
+        seed = _number(str(settings['seed']).strip(), "Seed", 0, 2 ** 32 - 1, int)
+    if settings['delay_distribution'] not in DISTRIBUTIONS:
+        raise ValueError(f"Unknown delay distribution '{settings['delay_distribution']}'")
+
+    min_pause = _number(settings['min_pause'], "Minimum thinking pause", 0, 60)
+    max_pause = _number(settings['max_pause'], "Maximum thinking pause", 0, 60)
+    return TypingConfig(
+        speed=speed,
+        min_delay=min_delay,
+        max_delay=max_delay,
+        word_delay=word_delay,
+        sentence_delay=sentence_delay,
+        word_by_word=bool(settings['word_by_word']),
+        output_backend=settings['output_backend'],
+        input_method=settings['input_method'],
+        layout=settings['layout'],
+        burst_paste=bool(settings['burst_paste']),
+        burst_chunk=_number(settings['burst_chunk'], "Burst chunk size", 1, 100000, int),
+        burst_pacing=bool(settings['burst_pacing']),
+        enable_errors=bool(settings['enable_errors']),
+        error_rate=_number(settings['error_rate'], "Error rate", 0, 100) / 100.0,
+        auto_correct=bool(settings['auto_correct']),
+        correction_rate=_number(settings['correction_rate'], "Correction rate", 0, 100) / 100.0,
+        speed_variation=bool(settings['speed_variation']),
+        thinking_pauses=bool(settings['thinking_pauses']),
+        pause_rate=_number(settings['pause_freq'], "Thinking pause frequency", 0, 100) / 100.0,
+        # As before, a minimum above the maximum is clamped rather than rejected
+        min_pause=min(min_pause, max_pause),
+        max_pause=max_pause,
+        target_rate=target_rate,
+        target_unit=settings['target_unit'],
+        seed=seed,
+        delay_distribution=settings['delay_distribution'],
+        # Learning from typed text only makes sense for Zhuyin runs that reach a real IME; it
+        # changes the shared user dictionary, so scripts and tests leave it off
+        learn=(bool(settings['learn']) and settings['input_method'] == "Zhuyin"
+               and settings['output_backend'] != "recording"),
+    )
@@ -0,0 +1,930 @@
+# Typing engine
+# Everything a run needs apart from the GUI: it plans text into keystrokes and delays with
+# human-like timing and errors, and plays them on an output backend. The Tk app and the
+# command line both drive a TypingEngine; it never touches a widget, so it runs headless
+# and can be embedded in other programs:
+#
+#     engine = TypingEngine()
+#     result = engine.type("你好, world", build_config(DEFAULT_SETTINGS))
+#
+# type() blocks until the run ends; stop() ends it early and pause()/resume() freeze and
+# continue it from another thread. For asyncio programs, AsyncTypingEngine (async_engine.py)
+# wraps the same engine.
+
+import math
+import re
+import time
+
+from clipboard import PyperclipClipboard
+from ime_timing import DEFAULT_TIMING, get_ime_profile, get_zhuyin_timing
+from output_backends import MeteredBackend, create_backend
+from pipeline import PipelineStats, Planner, normalize, split_blocks, text_chunks
+from rate_control import CHARS_PER_UNIT, RateController, target_cps
+from sampling import Sampler
+from scheduler import DeadlineScheduler, RunControl
+from typing_plan import PlanExecutor, TypingPlan
+from zhuyin_mapping import (USER_DICTIONARY_LOCK, WORD_FREQUENCIES, compile_zhuyin_keys, find_candidate, find_zhuyin,
+                            is_chinese_character, learn_from_text, save_user_dictionary, segment_text)
+
+class TypingEngine:
+    """Plans and types text with human-like timing on an output backend"""
+
+    def __init__(self, config=None, clipboard=None):
+        # Typing settings for the next run (a frozen TypingConfig)
+        self.config = config
+        
+        # Clipboard used for pasting and kept for the user during a run; open_output() defaults
+        # live backends to pyperclip, and the recording backend needs none
+        self.clipboard = clipboard
+        
+        # Keystroke output backend, created by open_output() before a run
+        self.output = None
+        
+        # Plan the engine records a run's keystrokes and delays into before they are played
+        self.plan = TypingPlan()
+        
+        # Stop and pause requests for the current run, made from any thread
+        self.control = RunControl()
+        
+        # Deadline clock for every intentional delay in a run; stop and pause end its waits
+        self.scheduler = DeadlineScheduler(interrupt=self.control.interrupt)
+        
+        # Seeded source of every random delay and decision, reseeded for each run
+        self.sampler = Sampler()
+        
+        # Learned word counts segmentation breaks ties with, frozen for each run (empty unless learning)
+        self.word_frequencies = {}
+        
+        # Target-rate controller for the current run, or None when no target is set
+        self.rate_controller = None
+        
+        # Native Unicode keystroke backend, opened for Direct mode runs when available
+        self.unicode_typer = None
+        
+        # Stream for diagnostics and run summaries; None prints to whatever sys.stdout is then
+        self.log_file = None
+        
+        # Called with the number of characters typed so far as a run progresses, or None
+        self.on_progress = None
+        self.typed = 0        # Source characters played in the current run
+        self.errors_made = 0  # Wrong characters and words in the blocks played so far
+        
+        self.instant_key_interval = 0.002  # Fixed gap between keys in Instant mode
+        
+        # Zhuyin IME waits, refreshed from the speed preset and calibration at start
+        self.zhuyin_key_delay, self.zhuyin_commit_delay = DEFAULT_TIMING
+        
+        # Error dictionaries for simulation
+        self.setup_error_data()
+        
+    def log(self, message):
+        """Print a diagnostic or summary line to log_file"""
+        print(message, file=self.log_file)
+        
+    @property
+    def stop_typing(self):
+        """Whether the current run was asked to stop; setting False clears stop and pause requests"""
+        return self.control.stopped
+        
+    @stop_typing.setter
+    def stop_typing(self, value):
+        if value:
+            self.control.stop()
+        else:
+            self.control.reset()
+            
+    @property
+    def paused(self):
+        return self.control.paused
+        
+    def setup_error_data(self):
+        """Setup error simulation data"""
+        # Characters that need copy-pasting for reliability
+        self.paste_chars = "，。！？；：（）「」『』、"
+        
+        # Time the target application gets to read the clipboard before it is overwritten
+        self.paste_settle_delay = 0.05
+        
+        # Number keys that pick IME candidates 1-9 in the candidate window
+        self.candidate_select_keys = "123456789"
+        
+        # Common homophone errors (同音字錯誤)
+        self.homophone_errors = {
+            "你": ["妳"],
+            "的": ["得", "地"],
+            "在": ["再"],
+            "做": ["作"],
+            "他": ["她"],
+            "那": ["哪"],
+            "這": ["者"],
+            "時": ["是", "事"],
+            "事": ["是", "時"],
+            "已": ["以"],
+            "以": ["已"],
+            "會": ["回"],
+            "回": ["會"],
+            "年": ["念"],
+            "念": ["年"],
+            "聽": ["廳"],
+            "廳": ["聽"],
+            "話": ["畫"],
+            "畫": ["話"],
+            "帶": ["代"],
+            "代": ["帶"],
+            "錢": ["前"],
+            "前": ["錢"],
+            "先": ["仙"],
+            "仙": ["先"],
+            "現": ["線"],
+            "線": ["現"],
+            "經": ["精"],
+            "精": ["經"]
+        }
+        
+        # Similar looking characters (形似字錯誤)
+        self.similar_char_errors = {
+            "己": ["已"],
+            "已": ["己"],
+            "未": ["末"],
+            "末": ["未"],
+            "干": ["千"],
+            "千": ["干"],
+            "土": ["士"],
+            "士": ["土"],
+            "戶": ["尸"],
+            "尸": ["戶"],
+            "貝": ["見"],
+            "見": ["貝"],
+            "刀": ["力"],
+            "力": ["刀"],
+            "入": ["人"],
+            "人": ["入"],
+            "木": ["本"],
+            "本": ["木"],
+            "大": ["太"],
+            "太": ["大"]
+        }
+        
+        # English punctuation to Chinese punctuation errors
+        self.punctuation_errors = {
+            ",": "，",
+            ".": "。",
+            "!": "！",
+            "?": "？",
+            ";": "；",
+            ":": "：",
+            "(": "（",
+            ")": "）"
+        }
+        
+        # Common English typing errors
+        self.english_errors = {
+            "the": ["teh", "hte"],
+            "and": ["adn", "nad"],
+            "you": ["yuo", "oyu"],
+            "that": ["taht", "htat"],
+            "have": ["ahve", "hvae"],
+            "with": ["wtih", "whit"],
+            "this": ["tihs", "htis"],
+            "they": ["tehy", "htey"],
+            "from": ["form", "fomr"],
+            "been": ["bene", "been"],
+            "said": ["siad", "said"],
+            "each": ["eahc", "caeh"],
+            "which": ["whihc", "hwich"],
+            "their": ["thier", "theyr"],
+            "time": ["tiem", "tmie"],
+            "will": ["wil", "wlil"],
+            "about": ["aobut", "baout"],
+            "would": ["woudl", "owuld"],
+            "there": ["tehre", "theer"],
+            "could": ["coudl", "ocudl"]
+        }
+        
+    def get_typing_delay(self, char_type='normal'):
+        """Get random delay to simulate human typing with variation"""
+        base_delay = self.sampler.delay(self.config.min_delay, self.config.max_delay)
+        
+        if self.config.speed_variation:
+            # Different speeds for different character types
+            if char_type == 'chinese':
+                # Chinese characters typically take longer
+                base_delay *= self.sampler.uniform(1.5, 2.5)
+            elif char_type == 'english':
+                # English characters are faster
+                base_delay *= self.sampler.uniform(0.8, 1.2)
+            elif char_type == 'punctuation':
+                # Punctuation has moderate speed
+                base_delay *= self.sampler.uniform(1.0, 1.5)
+            
+            # Add random variation to simulate human inconsistency
+            variation = self.sampler.uniform(0.5, 2.0)
+            base_delay *= variation
+            
+            # Occasionally add longer pauses (fatigue, distraction)
+            if self.sampler.random() < 0.05:  # 5% chance
+                base_delay += self.sampler.uniform(0.3, 1.0)
+        
+        return max(0.01, base_delay)  # Ensure minimum delay
+    
+    def should_make_error(self):
+        """Determine if an error should be made"""
+        if not self.config.enable_errors:
+            return False
+        return self.sampler.random() < self.config.error_rate
+    
+    def should_correct_error(self):
+        """Determine if an error should be corrected"""
+        if not self.config.auto_correct:
+            return False
+        return self.sampler.random() < self.config.correction_rate
+    
+    def should_pause_for_thinking(self):
+        """Determine if should pause for thinking based on the run's settings"""
+        if not self.config.thinking_pauses:
+            return False
+        return self.sampler.random() < self.config.pause_rate
+    
+    def get_thinking_pause(self):
+        """Get thinking pause duration from the run's settings"""
+        return self.sampler.uniform(self.config.min_pause, self.config.max_pause)
+    
+    def simulate_error(self, char):
+        """Simulate a typing error for the given character"""
+        if is_chinese_character(char):
+            # Try homophone error first
+            if char in self.homophone_errors:
+                return self.sampler.choice(self.homophone_errors[char])
+            # Try similar character error
+            elif char in self.similar_char_errors:
+                return self.sampler.choice(self.similar_char_errors[char])
+            # Random character replacement (rare)
+            elif self.sampler.random() < 0.3:
+                similar_chars = list(self.homophone_errors.keys()) + list(self.similar_char_errors.keys())
+                return self.sampler.choice(similar_chars)
+        else:
+            # English character errors
+            if char.lower() in 'aeiou':  # Vowel confusion
+                vowels = 'aeiou'
+                return self.sampler.choice([v for v in vowels if v != char.lower()])
+            elif char.lower() in 'qwertyuiop':  # Adjacent key errors
+                adjacent = {'q': 'wa', 'w': 'qes', 'e': 'wrd', 'r': 'etf', 't': 'ryg',
+                           'y': 'tuh', 'u': 'yij', 'i': 'uok', 'o': 'ipl', 'p': 'ol'}
+                if char.lower() in adjacent:
+                    return self.sampler.choice(adjacent[char.lower()])
+            # Random adjacent character
+            keyboard_layout = 'qwertyuiopasdfghjklzxcvbnm'
+            idx = keyboard_layout.find(char.lower())
+            if idx >= 0:
+                # Pick adjacent character
+                choices = []
+                if idx > 0: choices.append(keyboard_layout[idx-1])
+                if idx < len(keyboard_layout)-1: choices.append(keyboard_layout[idx+1])
+                if choices:
+                    return self.sampler.choice(choices)
+        
+        return char  # Return original if no error pattern found
+    
+    def type_with_corrections(self, text_to_type):
+        """Type text with error correction simulation"""
+        if self.config.input_method != "Zhuyin":
+            self.type_characters_with_corrections(text_to_type)
+            return
+
+        # Zhuyin mode: enter known phrases in a single composition and commit
+        for segment in segment_text(text_to_type, self.word_frequencies):
+            if self.stop_typing:
+                break
+            if len(segment) > 1 and find_zhuyin(segment) and not self.should_make_error():
+                if self.should_pause_for_thinking():
+                    self.wait(self.get_thinking_pause())
+                self.simulate_zhuyin_input(segment)
+                self.advance(len(segment))
+            else:
+                self.type_characters_with_corrections(segment, use_zhuyin=True)
+
+    def type_characters_with_corrections(self, text_to_type, use_zhuyin=False):
+        """Type text one character at a time with error correction simulation"""
+        errors_made = []  # Track errors for correction
+        
+        for char in text_to_type:
+            if self.stop_typing:
+                break
+            self.advance(1)
+                
+            # Thinking pause before difficult characters
+            if self.should_pause_for_thinking() and (is_chinese_character(char) or char in self.paste_chars):
+                self.wait(self.get_thinking_pause())
+                
+            # Determine if error should be made
+            if self.should_make_error():
+                error_char = self.simulate_error(char)
+                if error_char != char:
+                    self.plan.errors += 1
+                    # Type the wrong character first
+                    if is_chinese_character(error_char) or error_char in self.paste_chars:
+                        self.insert_text(error_char)
+                    else:
+                        self.plan.write(error_char)
+                    
+                    char_type = 'chinese' if is_chinese_character(error_char) or error_char in self.paste_chars else 'english'
+                    self.wait(self.get_typing_delay(char_type))
+                    
+                    # Store error for potential correction
+                    errors_made.append((error_char, char))
+                    
+                    # Decide whether to correct immediately or later
+                    if self.should_correct_error():
+                        correction_delay = self.sampler.uniform(0.2, 1.5)
+                        self.wait(correction_delay)
+                        
+                        # Backspace to remove error
+                        self.plan.press('backspace')
+                        self.wait(0.1)
+                        
+                        # Type correct character
+                        if is_chinese_character(char) or char in self.paste_chars:
+                            self.insert_text(char)
+                        else:
+                            self.plan.write(char)
+                        
+                        char_type = 'chinese' if is_chinese_character(char) or char in self.paste_chars else 'english'
+                        self.wait(self.get_typing_delay(char_type))
+                        
+                        # Remove from errors list
+                        errors_made = [e for e in errors_made if e[1] != char]
+                    continue
+            
+            # --- Type correct character (no error made) ---
+            
+            # Zhuyin mode enters Chinese characters through the IME
+            if use_zhuyin and is_chinese_character(char):
+                self.simulate_zhuyin_input(char)
+                continue
+
+            # Handle CJK characters and punctuation that need pasting
+            if is_chinese_character(char) or char in self.paste_chars:
+                self.insert_text(char)
+                char_type = 'chinese'
+            
+            # Handle English characters and punctuation
+            else:
+                # Simulate English punctuation being corrected to Chinese punctuation
+                if char in self.punctuation_errors and self.sampler.random() < 0.3:
+                    chinese_punc = self.punctuation_errors[char]
+                    # Simulate typing English punc, backspace, then Chinese punc
+                    if self.sampler.random() < 0.5:
+                        self.plan.write(char)  # Type English punc like '.'
+                        self.wait(0.2)
+                        self.plan.press('backspace')
+                        self.wait(0.1)
+                        self.insert_text(chinese_punc)  # Paste Chinese punc like '。'
+                    else: # Or just "correctly" type the Chinese punc
+                        self.insert_text(chinese_punc)
+                    
+                    char_type = 'punctuation'
+                else:
+                    # Type normal English characters and punctuation
+                    self.plan.write(char)
+                    char_type = 'punctuation' if char in '.,!?;:()' else 'english'
+            
+            self.wait(self.get_typing_delay(char_type))
+    
+    def simulate_zhuyin_input(self, chinese_char):
+        """Enter a character or phrase through the Zhuyin IME, pasting it if the IME can't select it"""
+        candidate = find_candidate(chinese_char)
+        if not candidate or candidate[1] >= len(self.candidate_select_keys):
+            # No selectable Zhuyin candidate found, use copy-paste
+            self.log(f"No Zhuyin mapping found for '{chinese_char}', using copy-paste")
+            self.paste_text(chinese_char)
+            self.wait(self.get_typing_delay('chinese'))
+            return
+            
+        zhuyin, rank = candidate
+        self.log(f"Typing '{chinese_char}' using Zhuyin: {zhuyin} (candidate {rank + 1})")
+        
+        # Convert Zhuyin to keyboard keys
+        try:
+            keys = self.convert_zhuyin_to_keys(zhuyin)
+        except KeyError as e:
+            self.log(f"Zhuyin error for '{chinese_char}': no key for {e}")
+            keys = None
+        else:
+            self.log(f"Keyboard keys: {keys}")
+        
+        if not keys:
+            # Fallback to copy-paste if no key mapping
+            self.paste_text(chinese_char)
+            self.wait(self.get_typing_delay())
+            return
+        
+        # Type each key and commit the intended candidate
+        if self.type_zhuyin_keys(keys, rank):
+            self.wait(self.get_typing_delay('chinese'))
+    
+    def type_zhuyin_keys(self, keys, rank):
+        """Press a composition's keys and commit the candidate at the given rank"""
+        for key in keys:
+            if self.stop_typing:
+                return False
+            self.plan.press(key)
+            self.wait(self.zhuyin_key_delay, paced=False)
+        
+        # Wait for the IME to finish composing before committing
+        self.wait(self.zhuyin_commit_delay, paced=False)
+        self.select_zhuyin_candidate(rank)
+        return True
+        
+    def select_zhuyin_candidate(self, rank):
+        """Commit the composition, picking the candidate at the given rank"""
+        if rank > 0:
+            # Open the candidate window and pick the candidate by its number key
+            self.plan.press('down')
+            self.wait(self.zhuyin_commit_delay, paced=False)
+            self.plan.press(self.candidate_select_keys[rank])
+            self.wait(self.zhuyin_key_delay, paced=False)
+        
+        # The tone keys already composed every syllable, so Enter commits
+        self.plan.press('enter')
+        
+    def convert_zhuyin_to_keys(self, zhuyin):
+        """Convert Zhuyin symbols (including tones) to keyboard keys for the selected Bopomofo layout"""
+        return list(compile_zhuyin_keys(zhuyin, self.config.layout))
+        
+    def type_text_word_by_word(self, text, space_after_last=True):
+        """Type text word by word with human-like features"""
+        # Split text into words, preserving spaces and punctuation
+        words = re.findall(r'\S+|\s+', text)
+        
+        for index, word in enumerate(words):
+            if self.stop_typing:
+                break
+            
+            # Text that directly follows this run must not be pushed away by an added space
+            add_space = space_after_last or index < len(words) - 1
+                
+            token = word
+            word = word.strip()
+            if not word:
+                self.advance(len(token))
+                self.plan.write(' ')
+                self.wait(self.config.word_delay)
+                continue
+            
+            # Check for whole word errors (English words)
+            if not any(is_chinese_character(c) for c in word):
+                # This is an English word, check for common word errors
+                word_lower = word.lower()
+                if word_lower in self.english_errors and self.should_make_error():
+                    error_word = self.sampler.choice(self.english_errors[word_lower])
+                    self.plan.errors += 1
+                    
+                    # Type the wrong word
+                    self.plan.write(error_word)
+                    self.wait(self.get_typing_delay('english') * len(error_word))
+                    
+                    # Correct if should correct
+                    if self.should_correct_error():
+                        correction_delay = self.sampler.uniform(0.5, 2.0)
+                        self.wait(correction_delay)
+                        
+                        # Select and delete wrong word
+                        for _ in range(len(error_word)):
+                            self.plan.press('backspace')
+                            self.wait(0.05)
+                        
+                        # Type correct word
+                        self.type_with_corrections(word)
+                    else:
+                        self.advance(len(word))
+                    
+                    # Add space after word (except for punctuation)
+                    if add_space and word and not word[-1] in '.,!?;:，。！？；：':
+                        self.plan.write(' ')
+                    
+                    # Pause between words
+                    self.wait(self.config.word_delay)
+                    continue
+            
+            # Chinese runs have no spaces, so pace each dictionary word separately
+            pieces = self.split_chinese_words(word)
+            for piece in pieces[:-1]:
+                if self.stop_typing:
+                    break
+                self.type_with_corrections(piece)
+                word_pause = self.config.word_delay
+                if self.config.speed_variation:
+                    word_pause *= self.sampler.uniform(0.5, 1.5)
+                self.wait(word_pause)
+            if self.stop_typing:
+                break
+
+            # Type word character by character with human-like features
+            self.type_with_corrections(pieces[-1])
+                    
+            # Add space after word (except for punctuation)
+            if add_space and word and not word[-1] in '.,!?;:，。！？；：':
+                self.plan.write(' ')
+                
+            # Pause between words with variation
+            word_pause = self.config.word_delay
+            if self.config.speed_variation:
+                word_pause *= self.sampler.uniform(0.5, 1.5)
+            self.wait(word_pause)
+            
+            # Longer pause after sentences
+            if word and word[-1] in '.!?。！？':
+                sentence_pause = self.config.sentence_delay
+                if self.config.speed_variation:
+                    sentence_pause *= self.sampler.uniform(0.8, 2.0)
+                self.wait(sentence_pause)
+                
+    def split_chinese_words(self, word):
+        """Split a whitespace-free token into Chinese words, keeping punctuation and Latin runs attached"""
+        pieces = []
+        for segment in segment_text(word, self.word_frequencies):
+            if pieces and not is_chinese_character(segment[0]):
+                pieces[-1] += segment
+            else:
+                pieces.append(segment)
+        return pieces
+
+    def split_burst_runs(self, text, use_zhuyin=False):
+        """Split text into [run, pasteable] pairs; pasteable runs are Chinese text and fullwidth punctuation"""
+        runs = []
+        for segment in (segment_text(text, self.word_frequencies) if use_zhuyin else text):
+            pasteable = all(is_chinese_character(c) or c in self.paste_chars for c in segment)
+            if pasteable and use_zhuyin and any(find_zhuyin(part) for part in [segment, *segment]):
+                # Leave anything the IME can enter to the Zhuyin path
+                pasteable = False
+            if runs and runs[-1][1] == pasteable:
+                runs[-1][0] += segment
+            else:
+                runs.append([segment, pasteable])
+        return runs
+        
+    def burst_paste(self, text):
+        """Enter text in chunks (one paste or native key burst each) instead of one character at a time"""
+        chunk_size = self.config.burst_chunk
+        pace = self.config.burst_pacing
+        
+        for start in range(0, len(text), chunk_size):
+            if self.stop_typing:
+                break
+            chunk = text[start:start + chunk_size]
+            self.insert_text(chunk)
+            self.advance(len(chunk))
+            
+            if pace:
+                # Roughly the time a person takes between bursts of output
+                if self.should_pause_for_thinking():
+                    self.wait(self.get_thinking_pause())
+                self.wait(self.get_typing_delay('chinese'))
+            else:
+                self.wait(self.paste_settle_delay, paced=False)
+                
+    def type_text_burst(self, text):
+        """Type text, pasting runs of Chinese text and fullwidth punctuation in bulk"""
+        use_zhuyin = self.config.input_method == "Zhuyin"
+        for run, pasteable in self.split_burst_runs(text, use_zhuyin):
+            if self.stop_typing:
+                break
+            if pasteable:
+                self.burst_paste(run)
+            elif self.config.word_by_word:
+                self.type_text_word_by_word(run, space_after_last=False)
+            else:
+                self.type_text_character_by_character(run)
+                
+    def type_text_instant(self, text):
+        """Type text as fast as the target accepts it: one write per ASCII run, one insert per non-ASCII run"""
+        for run in re.findall(r'[\x00-\x7f]+|[^\x00-\x7f]+', text):
+            if self.stop_typing:
+                break
+            if run.isascii():
+                self.plan.write(run, self.instant_key_interval)
+            else:
+                self.insert_text(run)
+                self.wait(self.paste_settle_delay, paced=False)
+            self.advance(len(run))
+                
+    def wait(self, seconds, paced=True):
+        """Plan an intentional delay
+
+        Paced (human-like) delays are scaled by the target-rate controller; IME and clipboard
+        waits are not, since the target application needs them whatever the rate.
+        """
+        self.plan.pause(seconds, paced)
+        
+    def advance(self, count):
+        """Plan progress: `count` more characters of the source text are typed"""
+        self.plan.progress(count)
+        
+    def report_progress(self, count):
+        """Feed played progress to the target-rate controller and the progress callback"""
+        self.typed += count
+        if self.rate_controller is not None:
+            self.rate_controller.record(count)
+        if self.on_progress is not None:
+            self.on_progress(self.typed)
+            
+    def paste_text(self, text):
+        """Paste text through the clipboard"""
+        self.plan.paste(text)
+        
+    def insert_text(self, text):
+        """Enter text that can't be typed as plain keys: native Unicode keystrokes in Direct mode, else paste"""
+        if self.config.input_method == "Direct":
+            self.plan.insert(text)
+        else:
+            self.plan.paste(text)
+            
+    def type_native(self, text):
+        """Play an insert event: native Unicode keystrokes when available, else paste"""
+        if self.unicode_typer is not None:
+            try:
+                start = time.perf_counter()
+                self.unicode_typer.type_text(text)
+                self.output.account(time.perf_counter() - start)
+                return
+            except Exception as e:
+                self.log(f"Native Unicode typing failed, switching to copy-paste: {e}")
+                self.close_unicode_typer()
+        self.output.paste(text)
+        
+    def close_unicode_typer(self):
+        """Release the native Unicode keystroke backend"""
+        if self.unicode_typer is not None:
+            try:
+                self.unicode_typer.close()
+            except Exception:
+                pass
+            self.unicode_typer = None
+        
+    def type_text_character_by_character(self, text):
+        """Type text character by character with human-like features"""
+        for char in text:
+            if self.stop_typing:
+                break
+                
+            if char == '\n':
+                self.advance(1)
+                self.plan.press('enter')
+                pause = self.config.sentence_delay
+                if self.config.speed_variation:
+                    pause *= self.sampler.uniform(0.5, 1.5)
+                self.wait(pause)
+            elif char == ' ':
+                self.advance(1)
+                self.plan.write(' ')
+                pause = self.config.word_delay
+                if self.config.speed_variation:
+                    pause *= self.sampler.uniform(0.3, 1.2)
+                self.wait(pause)
+            else:
+                # Use human-like typing for each character
+                self.type_with_corrections(char)
+                
+            # Longer pause after sentences
+            if char in '.!?。！？':
+                sentence_pause = self.config.sentence_delay
+                if self.config.speed_variation:
+                    sentence_pause *= self.sampler.uniform(0.8, 2.0)
+                self.wait(sentence_pause)
+                
+    def plan_block(self, block, final):
+        """Record the keystrokes and delays for one block of text into a new TypingPlan"""
+        self.plan = TypingPlan(seed=self.sampler.seed)
+        if self.config.speed == "Instant":
+            self.type_text_instant(block)
+        elif self.config.burst_paste:
+            self.type_text_burst(block)
+        elif self.config.word_by_word:
+            # Only the end of the whole text may get the trailing space a word is typed with
+            self.type_text_word_by_word(block, space_after_last=final)
+        else:
+            self.type_text_character_by_character(block)
+        return self.plan
+        
+    def plan_stream(self, chunks, stats):
+        """Chain the planning stages from raw text chunks to one TypingPlan per block"""
+        chunks = stats.stage('read', chunks)
+        chunks = stats.stage('normalize', normalize(chunks))
+        blocks = stats.stage('block', split_blocks(chunks), size=lambda item: len(item[0]))
+        return stats.stage('plan', (self.plan_block(block, final) for block, final in blocks),
+                           size=lambda plan: plan.characters())
+        
+    def start_planning(self):
+        """Reseed the sampler and freeze the learned word counts for a new plan
+
+        A plan then depends only on the text, the settings and the seed, plus the learned
+        counts at this point when the config learns from typed text.
+        """
+        self.sampler = Sampler(self.config.seed, self.config.delay_distribution)
+        if self.config.learn:
+            with USER_DICTIONARY_LOCK:
+                self.word_frequencies = dict(WORD_FREQUENCIES)
+        else:
+            self.word_frequencies = {}
+            
+    def compile_plan(self, text):
+        """Record every keystroke and delay a run of text would make, without typing anything"""
+        self.start_planning()
+        plan = TypingPlan(seed=self.sampler.seed)
+        for block in self.plan_stream(text_chunks(text), PipelineStats()):
+            plan.events.extend(block.events)
+            plan.errors += block.errors
+        if self.config.target_rate:
+            # A live run's rate controller stretches the paced pauses to hold the target; bake in
+            # the equivalent fixed scale so the predicted duration and a replay of the plan match
+            plan.scale_paced(plan.rate_scale(target_cps(self.config.target_rate, self.config.target_unit)))
+        return plan
+        
+    def block_events(self, blocks):
+        """Events of planned blocks in order, counting each block's errors as it starts to play"""
+        for block in blocks:
+            self.errors_made += block.errors
+            yield from block.events
+        
+    def play_plan(self, events):
+        """Play plan events on the output backend with deadline timing; returns False if stopped"""
+        executor = PlanExecutor(self.output, self.scheduler, insert=self.type_native,
+                                rate_controller=self.rate_controller, control=self.control,
+                                on_progress=self.report_progress)
+        return executor.run(events)
+        
+    def update_zhuyin_timing(self):
+        """Refresh the Zhuyin IME waits from the speed preset and the calibration cache"""
+        profile = get_ime_profile(self.config.layout)
+        self.zhuyin_key_delay, self.zhuyin_commit_delay = get_zhuyin_timing(self.config.speed, profile)
+        
+    def open_output(self):
+        """Create the configured keystroke output backend; raises if it is unavailable"""
+        if self.clipboard is None and self.config.output_backend != 'recording':
+            # Live backends paste through a clipboard; without one from the caller, use pyperclip
+            self.clipboard = PyperclipClipboard()
+        self.output = MeteredBackend(create_backend(self.config.output_backend, self.clipboard))
+        
+    def prepare(self, config=None):
+        """Get ready for a run: apply `config` (if given), refresh the IME timing and open the output"""
+        if config is not None:
+            self.config = config
+        self.stop_typing = False
+        self.update_zhuyin_timing()
+        self.open_output()
+        
+    def type(self, text=None, config=None, chunks=None, plan=None, start_delay=0,
+             on_progress=None, on_status=None):
+        """Type text, streamed text `chunks` or a saved plan, blocking until the run ends
+
+        `on_progress(typed)` and `on_status(message)` are called from this thread during the
+        run. Returns the run's result (see result()), or None if it was stopped before typing.
+        """
+        self.prepare(config)
+        previous = self.on_progress
+        if on_progress is not None:
+            self.on_progress = on_progress
+        try:
+            return self.run(text, plan, chunks, start_delay, on_status)
+        finally:
+            self.on_progress = previous
+            
+    def stop(self):
+        """Stop the current run, cutting short any wait in progress; safe to call from any thread"""
+        self.control.stop()
+        
+    def pause(self):
+        """Freeze the current run where it is, mid-wait included; safe to call from any thread"""
+        self.control.pause()
+        
+    def resume(self):
+        """Continue a paused run with the rest of its schedule; safe to call from any thread"""
+        self.control.resume()
+        
+    def toggle_pause(self):
+        """Pause a running run or resume a paused one; returns whether it is now paused"""
+        if self.control.paused:
+            self.control.resume()
+        else:
+            self.control.pause()
+        return self.control.paused
+        
+    def run(self, text=None, plan=None, chunks=None, start_delay=0, on_status=None):
+        """Type text, streamed text `chunks` (e.g. from a file) or a saved plan on self.output
+
+        Counts down `start_delay` seconds first, reporting each second through on_status.
+        Returns the run's result (see result()), or None if it was stopped before typing.
+        """
+        status = on_status or (lambda message: None)
+        planner = None
+        self.typed = 0
+        self.errors_made = 0
+        try:
+            if plan is None:
+                # Plan on a separate thread while typing; blocks arrive through a bounded queue
+                self.start_planning()
+                seed = self.sampler.seed
+                stats = PipelineStats()
+                planner = Planner(self.plan_stream(chunks if chunks is not None else text_chunks(text), stats))
+                planner.start()
+                events = self.block_events(planner.items())
+                # Streamed input can't be checked for non-ASCII text up front
+                uses_insert = self.config.input_method == "Direct" and (text is None or not text.isascii())
+            else:
+                seed = plan.seed
+                events = plan.events
+                self.errors_made = plan.errors
+                uses_insert = bool(plan.counts().get('insert'))
+                
+            # Give user time to switch to target application; a pause holds the countdown
+            for i in range(math.ceil(start_delay), 0, -1):
+                if self.stop_typing:
+                    return None
+                status(f"Starting in {i}...")
+                while not self.control.sleep(min(1.0, start_delay - (i - 1))):
+                    if self.control.stopped:
+                        return None
+                    status("Paused")
+                    self.control.hold()
+                    status(f"Starting in {i}...")
+            if self.stop_typing:
+                return None
+                
+            # Direct mode types Chinese as native key events where the platform allows it
+            if uses_insert and self.output.live:
+                # Imported here: ctypes and its library lookup cost headless startup ~10 ms
+                from unicode_input import open_unicode_typer
+                self.unicode_typer = open_unicode_typer()
+            
+            # Keep the user's clipboard so pasting doesn't clobber it
+            if self.clipboard is not None:
+                self.clipboard.save()
+            status("Typing in progress...")
+            self.scheduler.start()
+            self.rate_controller = None
+            # A saved plan is replayed on its own schedule, which already has the rate scaling in it
+            if self.config.target_rate and plan is None:
+                self.rate_controller = RateController(self.config.target_rate, self.config.target_unit)
+            run_start = time.perf_counter()
+            
+            # Type the text
+            completed = self.play_plan(events)
+            run_end = time.perf_counter()
+            
+            result = self.result(run_end - run_start, seed, completed)
+            if self.control.stop_time is not None:
+                # From the stop request until the executor stopped playing
+                result['stop_latency_ms'] = round(max(0.0, run_end - self.control.stop_time) * 1000, 3)
+            self.log(self.run_summary(result))
+            if planner is not None:
+                self.log(f"Pipeline: {stats.summary()}; executor waited {planner.starved * 1000:.1f} ms for the planner")
+            if completed and text is not None and self.config.learn:
+                # Remember which words were typed so segmentation favors them
+                with USER_DICTIONARY_LOCK:
+                    learn_from_text(text)
+                    save_user_dictionary()
+            return result
+        finally:
+            if planner is not None:
+                planner.stop()
+            self.close_unicode_typer()
+            self.output.close()
+            if self.clipboard is not None:
+                try:
+                    # Let the target read the last paste before handing the clipboard back
+                    time.sleep(self.paste_settle_delay)
+                    self.clipboard.restore()
+                except Exception as e:
+                    self.log(f"Could not restore clipboard: {e}")
+                    
+    def result(self, elapsed, seed, completed):
+        """Machine-readable outcome of a run (JSON-serializable)
+
+        Stopped runs also get 'stop_latency_ms', added by run().
+        """
+        active = elapsed - self.scheduler.paused  # Rates leave paused time out
+        cps = self.typed / active if active > 0 else 0.0
+        return {
+            'completed': completed,
+            'seed': seed,
+            'characters': self.typed,
+            'duration': round(elapsed, 3),
+            'paused_seconds': round(self.scheduler.paused, 3),
+            'cpm': round(cps * 60 / CHARS_PER_UNIT["CPM"], 1),
+            'wpm': round(cps * 60 / CHARS_PER_UNIT["WPM"], 1),
+            'errors': self.errors_made,
+            'backend_calls': self.output.calls,
+            'backend_seconds': round(self.output.overhead, 3),
+            'delay_seconds': round(self.scheduler.planned, 3),
+            'drift_ms': round(self.scheduler.drift() * 1000, 3),
+        }
+        
+    def run_summary(self, result):
+        """Describe where a run's time went and how closely it kept to the planned schedule"""
+        return (f"Seed {result['seed']}, {result['duration']:.1f} s total: {result['backend_seconds']:.2f} s in "
+                f"{result['backend_calls']} backend calls, {self.scheduler.planned:.2f} s intentional delay; "
+                f"{self.scheduler.summary()}"
+                + (f"; paused {result['paused_seconds']:.1f} s" if result['paused_seconds'] else "")
+                + (f"; rate {self.rate_controller.status()}" if self.rate_controller else "")
+                + (f"; stopped {result['stop_latency_ms']:.1f} ms after the request"
+                   if 'stop_latency_ms' in result else ""))
@@ -0,0 +1,206 @@
+# Compiled typing plans
+# The typing engine does not send keystrokes itself: it records everything a run would type
+# and wait for into a TypingPlan, a flat list of compact event tuples. PlanExecutor plays a
+# plan against an output backend on the deadline scheduler. A plan can be inspected before
+# typing (dry run), saved as JSONL and replayed later with identical events and timing.
+#
+# Events:
+#     ('write', text, interval)   plain keyboard text, `interval` seconds between keys
+#     ('press', key)              named key such as 'backspace', 'enter' or 'a'
+#     ('paste', text)             text pasted through the clipboard
+#     ('insert', text)            native Unicode keystrokes where available, else a paste
+#     ('pause', seconds, paced)   intentional delay; paced delays follow the target-rate controller
+#     ('progress', count)         `count` more characters of the source text are done
+
+import json
+import math
+
+from rate_control import SCALE_LIMITS
+from scheduler import RunControl
+
+PLAN_FORMAT = "auto-typer-plan"
+PLAN_VERSION = 1
+# Field types of each event kind; 'seconds' is a finite float >= 0 and 'count' an int >= 0
+EVENT_FIELDS = {'write': ('text', 'seconds'), 'press': ('text',), 'paste': ('text',), 'insert': ('text',),
+                'pause': ('seconds', 'flag'), 'progress': ('count',)}
+WRITE_CHUNK = 32  # Keys per backend call for paced writes, so a stop doesn't wait for a long run
+
+class TypingPlan:
+    """Ordered typing events; the engine records into it through the backend-like methods"""
+
+    def __init__(self, events=None, seed=None):
+        self.events = events if events is not None else []
+        self.seed = seed  # Sampler seed the plan was compiled with, if known
+        self.errors = 0   # Typos the engine planned into it
+
+    def __len__(self):
+        return len(self.events)
+
+    def write(self, text, interval=0.0):
+        self.events.append(('write', text, interval))
+
+    def press(self, key):
+        self.events.append(('press', key))
+
+    def paste(self, text):
+        self.events.append(('paste', text))
+
+    def insert(self, text):
+        self.events.append(('insert', text))
+
+    def pause(self, seconds, paced=True):
+        self.events.append(('pause', seconds, paced))
+
+    def progress(self, count):
+        self.events.append(('progress', count))
+
+    def counts(self):
+        """Get {event kind: number of events}"""
+        counts = {}
+        for event in self.events:
+            counts[event[0]] = counts.get(event[0], 0) + 1
+        return counts
+
+    def duration(self):
+        """Predicted run time in seconds: the sum of all pauses (backend time is absorbed by them)"""
+        return sum(event[1] for event in self.events if event[0] == 'pause')
+
+    def rate_scale(self, target_cps, limits=SCALE_LIMITS):
+        """Fixed factor for the paced pauses that makes the whole plan run at target_cps"""
+        paced = sum(event[1] for event in self.events if event[0] == 'pause' and event[2])
+        if paced <= 0:
+            return 1.0
+        scale = (self.characters() / target_cps - (self.duration() - paced)) / paced
+        low, high = limits
+        return min(high, max(low, scale))
+
+    def scale_paced(self, scale):
+        """Multiply every paced pause by `scale`"""
+        self.events = [('pause', event[1] * scale, True) if event[0] == 'pause' and event[2] else event
+                       for event in self.events]
+
+    def characters(self):
+        """Number of source text characters the plan types"""
+        return sum(event[1] for event in self.events if event[0] == 'progress')
+
+    def summary(self):
+        """Describe the plan in one line"""
+        minutes, seconds = divmod(self.duration(), 60)
+        kinds = ', '.join(f"{count} {kind}" for kind, count in sorted(self.counts().items()))
+        seed = f", seed {self.seed}" if self.seed is not None else ""
+        return (f"{len(self.events)} events ({kinds}) for {self.characters()} characters, "
+                f"predicted {int(minutes)}:{seconds:04.1f}{seed}")
+
+    def save(self, path):
+        """Write the plan as JSONL: a header object, then one JSON array per event"""
+        with open(path, 'w', encoding='utf-8') as f:
+            header = {'format': PLAN_FORMAT, 'version': PLAN_VERSION, 'seed': self.seed,
+                      'events': len(self.events), 'duration': self.duration(), 'errors': self.errors}
+            f.write(json.dumps(header) + '\n')
+            for event in self.events:
+                f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+    @classmethod
+    def load(cls, path):
+        """Read a plan written by save(); raises ValueError if the file is not a valid plan"""
+        with open(path, encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = None
+            if not isinstance(header, dict) or header.get('format') != PLAN_FORMAT:
+                raise ValueError(f"{path} is not a typing plan")
+            if header.get('version') != PLAN_VERSION:
+                raise ValueError(f"Unsupported typing plan version {header.get('version')}")
+            seed, errors = header.get('seed'), header.get('errors', 0)
+            if not (seed is None or _valid_field('count', seed)) or not _valid_field('count', errors):
+                raise ValueError(f"{path} has an invalid plan header")
+            events = []
+            for line_number, line in enumerate(f, 2):
+                if not line.strip():
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    event = None
+                if not _valid_event(event):
+                    raise ValueError(f"Event {len(events)} (line {line_number}): invalid event {line.strip()[:80]}")
+                events.append(tuple(event))
+        plan = cls(events, seed)
+        plan.errors = errors
+        return plan
+
+def _valid_field(kind, value):
+    if kind == 'text':
+        return isinstance(value, str)
+    if kind == 'flag':
+        return isinstance(value, bool)
+    if isinstance(value, bool):
+        return False  # JSON true/false load as bools, which are ints to Python
+    if kind == 'count':
+        return isinstance(value, int) and value >= 0
+    return isinstance(value, (int, float)) and math.isfinite(value) and value >= 0
+
+def _valid_event(event):
+    """Whether a loaded JSON value is a well-formed event"""
+    if not isinstance(event, list) or not event or not isinstance(event[0], str):
+        return False
+    fields = EVENT_FIELDS.get(event[0])
+    return (fields is not None and len(fields) == len(event) - 1
+            and all(_valid_field(kind, value) for kind, value in zip(fields, event[1:])))
+
+class PlanExecutor:
+    """Plays a TypingPlan against an output backend with deadline timing"""
+
+    def __init__(self, output, scheduler, insert=None, rate_controller=None, control=None,
+                 on_progress=None):
+        self.output = output
+        self.scheduler = scheduler
+        self.insert = insert or output.paste  # Handler for 'insert' events
+        self.rate_controller = rate_controller
+        self.control = control if control is not None else RunControl()  # Stop and pause requests
+        self.on_progress = on_progress
+
+    def checkpoint(self):
+        """Hold here while the run is paused, shifting the schedule; returns False once it is stopped"""
+        if self.control.paused:
+            held = self.control.hold()
+            self.scheduler.shift(held)
+            if self.rate_controller is not None:
+                self.rate_controller.shift(held)
+        return not self.control.stopped
+
+    def run(self, events):
+        """Play events (a plan's list, or any iterable of them); returns False if stopped early"""
+        output, scheduler, rate_controller = self.output, self.scheduler, self.rate_controller
+        for event in events:
+            if not self.checkpoint():
+                return False
+            kind = event[0]
+            if kind == 'pause':
+                seconds, paced = event[1], event[2]
+                if paced and rate_controller is not None:
+                    seconds *= rate_controller.scale
+                # A stop or pause request ends the wait early; after a pause, finish the rest
+                while not scheduler.wait(seconds, paced):
+                    if not self.checkpoint():
+                        return False
+                    seconds = 0.0
+            elif kind == 'write':
+                text, interval = event[1], event[2]
+                if interval and len(text) > WRITE_CHUNK:
+                    for start in range(0, len(text), WRITE_CHUNK):
+                        if start and not self.checkpoint():
+                            return False
+                        output.write(text[start:start + WRITE_CHUNK], interval)
+                else:
+                    output.write(text, interval)
+            elif kind == 'press':
+                output.press(event[1])
+            elif kind == 'paste':
+                output.paste(event[1])
+            elif kind == 'insert':
+                self.insert(event[1])
+            elif kind == 'progress' and self.on_progress is not None:
+                self.on_progress(event[1])
+        return True
@@ -0,0 +1,133 @@
+# Native Unicode keystrokes for Direct mode on Linux/X11
+# X11 only delivers characters that some keycode maps to, so pyautogui.write silently drops
+# Chinese text. X11UnicodeTyper remaps spare (unused) keycodes to the keysym of each
+# character through XChangeKeyboardMapping and presses them with XTest, so any code point
+# arrives as a real key event without touching the clipboard. Uses ctypes; no extra packages.
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+import time
+
+logger = logging.getLogger(__name__)
+
+NO_SYMBOL = 0
+SPECIAL_KEYSYMS = {'\n': 0xff0d, '\t': 0xff09, '\b': 0xff08}  # Return, Tab, BackSpace
+MAX_SPARE_KEYCODES = 8  # Rotating keycodes keeps a remap from racing the previous key event
+
+def keysym_for_char(char):
+    """Get the X11 keysym for a character"""
+    if char in SPECIAL_KEYSYMS:
+        return SPECIAL_KEYSYMS[char]
+    code_point = ord(char)
+    if 0x20 <= code_point <= 0x7e or 0xa0 <= code_point <= 0xff:
+        return code_point  # Latin-1 keysyms equal their code points
+    return 0x01000000 | code_point
+
+def _load(name, soname):
+    return ctypes.cdll.LoadLibrary(ctypes.util.find_library(name) or soname)
+
+class X11UnicodeTyper:
+    """Types arbitrary Unicode text as XTest key events on remapped spare keycodes"""
+
+    def __init__(self, display_name=None):
+        self._xlib = _load('X11', 'libX11.so.6')
+        self._xtst = _load('Xtst', 'libXtst.so.6')
+        self._declare()
+
+        name = display_name.encode() if display_name else None
+        self._display = self._xlib.XOpenDisplay(name)
+        if not self._display:
+            raise OSError("Cannot open X display")
+        self._spare_keycodes = self._find_spare_keycodes()
+        if not self._spare_keycodes:
+            self._xlib.XCloseDisplay(self._display)
+            self._display = None
+            raise OSError("No unused keycode available for Unicode remapping")
+        self._next = 0
+
+    def _declare(self):
+        xlib, xtst = self._xlib, self._xtst
+        xlib.XOpenDisplay.restype = ctypes.c_void_p
+        xlib.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        xlib.XCloseDisplay.argtypes = [ctypes.c_void_p]
+        xlib.XDisplayKeycodes.argtypes = [ctypes.c_void_p, ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)]
+        xlib.XGetKeyboardMapping.restype = ctypes.POINTER(ctypes.c_ulong)
+        xlib.XGetKeyboardMapping.argtypes = [ctypes.c_void_p, ctypes.c_ubyte, ctypes.c_int, ctypes.POINTER(ctypes.c_int)]
+        xlib.XChangeKeyboardMapping.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int,
+                                                ctypes.POINTER(ctypes.c_ulong), ctypes.c_int]
+        xlib.XKeysymToKeycode.restype = ctypes.c_ubyte
+        xlib.XKeysymToKeycode.argtypes = [ctypes.c_void_p, ctypes.c_ulong]
+        xlib.XFree.argtypes = [ctypes.c_void_p]
+        xlib.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        xtst.XTestFakeKeyEvent.argtypes = [ctypes.c_void_p, ctypes.c_uint, ctypes.c_int, ctypes.c_ulong]
+
+    def _find_spare_keycodes(self):
+        """Find keycodes the current keyboard mapping leaves without any keysym"""
+        low, high = ctypes.c_int(), ctypes.c_int()
+        self._xlib.XDisplayKeycodes(self._display, ctypes.byref(low), ctypes.byref(high))
+        count = high.value - low.value + 1
+        per_keycode = ctypes.c_int()
+        mapping = self._xlib.XGetKeyboardMapping(self._display, low.value, count, ctypes.byref(per_keycode))
+        spare = []
+        try:
+            # Search from the top; low keycodes are the ones physical keyboards use
+            for index in range(count - 1, -1, -1):
+                row = mapping[index * per_keycode.value:(index + 1) * per_keycode.value]
+                if all(keysym == NO_SYMBOL for keysym in row):
+                    spare.append(low.value + index)
+                    if len(spare) == MAX_SPARE_KEYCODES:
+                        break
+        finally:
+            self._xlib.XFree(mapping)
+        return spare
+
+    def _remap(self, keycode, keysym):
+        keysyms = (ctypes.c_ulong * 2)(keysym, keysym)  # Same symbol with and without Shift
+        self._xlib.XChangeKeyboardMapping(self._display, keycode, 2, keysyms, 1)
+        self._xlib.XSync(self._display, 0)
+
+    def _tap(self, keycode):
+        self._xtst.XTestFakeKeyEvent(self._display, keycode, 1, 0)
+        self._xtst.XTestFakeKeyEvent(self._display, keycode, 0, 0)
+        self._xlib.XSync(self._display, 0)
+
+    def type_text(self, text, interval=0.0):
+        """Send every character of text as a key press and release"""
+        for char in text:
+            keycode = self._spare_keycodes[self._next]
+            self._next = (self._next + 1) % len(self._spare_keycodes)
+            self._remap(keycode, keysym_for_char(char))
+            self._tap(keycode)
+            if interval:
+                time.sleep(interval)
+
+    def press_chord(self, *keysyms):
+        """Press keys given as keysyms together, e.g. Control_L (0xffe3) + 'v'"""
+        keycodes = [self._xlib.XKeysymToKeycode(self._display, keysym) for keysym in keysyms]
+        for keycode in keycodes:
+            self._xtst.XTestFakeKeyEvent(self._display, keycode, 1, 0)
+        for keycode in reversed(keycodes):
+            self._xtst.XTestFakeKeyEvent(self._display, keycode, 0, 0)
+        self._xlib.XSync(self._display, 0)
+
+    def close(self):
+        """Give the spare keycodes back and close the display connection"""
+        if not self._display:
+            return
+        for keycode in self._spare_keycodes:
+            self._remap(keycode, NO_SYMBOL)
+        self._xlib.XCloseDisplay(self._display)
+        self._display = None
+
+def open_unicode_typer():
+    """Open the native Unicode keystroke backend for this platform, or None if unavailable"""
+    if not sys.platform.startswith('linux') or not os.environ.get('DISPLAY'):
+        return None
+    try:
+        return X11UnicodeTyper()
+    except OSError as e:
+        logger.warning("Native Unicode typing unavailable, using copy-paste: %s", e)
+        return None
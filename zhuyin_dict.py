@@ -0,0 +1,211 @@
+# Compact memory-mapped Zhuyin dictionary
+# A plain-text reading/phrase/frequency list is compiled offline into a binary file of
+# sorted fixed-size record tables plus a UTF-8 string pool. Lookups binary-search the
+# mmap directly, so opening a dictionary costs one header read no matter how large it is,
+# and every typer process shares the same page-cache pages.
+#
+# Source format, one entry per line (tab separated, frequency optional, '#' starts a comment):
+#     ㄋㄧˇ	你	9000
+#
+# Compile with:  python zhuyin_dict.py SOURCE.txt OUTPUT.dict
+
+import logging
+import mmap
+import os
+import struct
+import sys
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ZYD1'
+HEADER = struct.Struct('<4sIIIII')   # magic, reading count, entry count, word count, max word length, string pool size
+READING = struct.Struct('<IIII')     # string offset, string length, first entry, entry count
+ENTRY = struct.Struct('<III')        # string offset, string length, frequency
+WORD = struct.Struct('<IIII')        # string offset, string length, reading index, candidate rank
+
+def parse_source(lines):
+    """Parse 'reading<TAB>phrase[<TAB>frequency]' lines into (reading, phrase, frequency) tuples"""
+    for line_number, line in enumerate(lines, 1):
+        line = line.split('#', 1)[0].strip()
+        if not line:
+            continue
+        fields = line.split('\t') if '\t' in line else line.split()
+        if len(fields) < 2:
+            raise ValueError(f"Line {line_number}: expected 'reading<TAB>phrase[<TAB>frequency]'")
+        frequency = int(fields[2]) if len(fields) > 2 else 0
+        yield fields[0], fields[1], frequency
+
+def compile_dictionary(entries, output_path, rank_by_frequency=True):
+    """Compile (reading, phrase, frequency) tuples into a binary dictionary file
+
+    Each reading's candidates are ranked by descending frequency, or with
+    rank_by_frequency=False kept in the order they first appear in `entries`.
+    """
+    # Merge duplicates, keeping each phrase's highest frequency
+    by_reading = {}
+    for reading, phrase, frequency in entries:
+        candidates = by_reading.setdefault(reading, {})
+        candidates[phrase] = max(frequency, candidates.get(phrase, 0))
+
+    strings = bytearray()
+    string_offsets = {}
+
+    def intern(text):
+        data = text.encode('utf-8')
+        if data not in string_offsets:
+            string_offsets[data] = len(strings)
+            strings.extend(data)
+        return string_offsets[data], len(data)
+
+    reading_records = []
+    entry_records = []
+    word_keys = []
+    for reading_index, reading in enumerate(sorted(by_reading, key=lambda r: r.encode('utf-8'))):
+        ranked = list(by_reading[reading].items())
+        if rank_by_frequency:
+            ranked.sort(key=lambda item: -item[1])
+        reading_records.append(READING.pack(*intern(reading), len(entry_records), len(ranked)))
+        for rank, (phrase, frequency) in enumerate(ranked):
+            entry_records.append(ENTRY.pack(*intern(phrase), frequency))
+            word_keys.append((phrase.encode('utf-8'), rank, reading_index, phrase))
+    word_keys.sort()
+    word_records = [WORD.pack(*intern(phrase), reading_index, rank)
+                    for _, rank, reading_index, phrase in word_keys]
+    max_word_length = max((len(key[3]) for key in word_keys), default=0)
+
+    tmp_path = output_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(reading_records), len(entry_records), len(word_records),
+                            max_word_length, len(strings)))
+        f.write(b''.join(reading_records))
+        f.write(b''.join(entry_records))
+        f.write(b''.join(word_records))
+        f.write(strings)
+    os.replace(tmp_path, output_path)
+    return len(entry_records)
+
+class ZhuyinDictionary:
+    """Read-only view of a compiled dictionary file, searched lazily through mmap"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) < HEADER.size:
+            self._mm.close()
+            raise ValueError(f"{path} is too short to be a compiled Zhuyin dictionary")
+        magic, self.reading_count, self.entry_count, self.word_count, self.max_word_length, pool_size = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            self._mm.close()
+            raise ValueError(f"{path} is not a compiled Zhuyin dictionary")
+        self._readings_offset = HEADER.size
+        self._entries_offset = self._readings_offset + self.reading_count * READING.size
+        self._words_offset = self._entries_offset + self.entry_count * ENTRY.size
+        self._strings_offset = self._words_offset + self.word_count * WORD.size
+        if self._strings_offset + pool_size > len(self._mm):
+            self._mm.close()
+            raise ValueError(f"{path} is truncated or corrupt: its tables run past the end of the file")
+
+    def __len__(self):
+        return self.entry_count
+
+    def close(self):
+        """Release the memory map"""
+        self._mm.close()
+
+    def _string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._mm[start:start + length]
+
+    def _lower_bound(self, table_offset, record, count, key):
+        """Binary-search a table whose records start with (string offset, string length)"""
+        lo, hi = 0, count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset, length = struct.unpack_from('<II', self._mm, table_offset + mid * record.size)
+            if self._string(offset, length) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _find_reading(self, zhuyin):
+        key = zhuyin.encode('utf-8')
+        index = self._lower_bound(self._readings_offset, READING, self.reading_count, key)
+        if index < self.reading_count:
+            record = READING.unpack_from(self._mm, self._readings_offset + index * READING.size)
+            if self._string(record[0], record[1]) == key:
+                return record
+        return None
+
+    def get_candidates(self, zhuyin):
+        """Get the candidates for a reading in rank order"""
+        record = self._find_reading(zhuyin)
+        if record is None:
+            return []
+        _, _, first, count = record
+        candidates = []
+        for i in range(first, first + count):
+            offset, length, _ = ENTRY.unpack_from(self._mm, self._entries_offset + i * ENTRY.size)
+            candidates.append(self._string(offset, length).decode('utf-8'))
+        return candidates
+
+    def _word_records(self, word):
+        key = word.encode('utf-8')
+        index = self._lower_bound(self._words_offset, WORD, self.word_count, key)
+        while index < self.word_count:
+            record = WORD.unpack_from(self._mm, self._words_offset + index * WORD.size)
+            if self._string(record[0], record[1]) != key:
+                break
+            yield record
+            index += 1
+
+    def _reading_at(self, reading_index):
+        offset, length, _, _ = READING.unpack_from(self._mm, self._readings_offset + reading_index * READING.size)
+        return self._string(offset, length).decode('utf-8')
+
+    def find_candidate(self, word):
+        """Get the best-ranked (zhuyin, candidate_rank) pair for a word, or None"""
+        for _, _, reading_index, rank in self._word_records(word):
+            return self._reading_at(reading_index), rank
+        return None
+
+    def get_readings(self, word):
+        """Get every reading whose candidates include the word"""
+        return [self._reading_at(reading_index) for _, _, reading_index, _ in self._word_records(word)]
+
+    def __contains__(self, word):
+        return self.find_candidate(word) is not None
+
+    def match_ends(self, text, start=0):
+        """Return the end index of every word that starts at `start`, shortest first"""
+        return [start + length for length in range(1, min(self.max_word_length, len(text) - start) + 1)
+                if text[start:start + length] in self]
+
+    def entries(self):
+        """Iterate over every (reading, phrase, frequency) entry in rank order"""
+        for index in range(self.reading_count):
+            offset, length, first, count = READING.unpack_from(self._mm, self._readings_offset + index * READING.size)
+            zhuyin = self._string(offset, length).decode('utf-8')
+            for i in range(first, first + count):
+                offset, length, frequency = ENTRY.unpack_from(self._mm, self._entries_offset + i * ENTRY.size)
+                yield zhuyin, self._string(offset, length).decode('utf-8'), frequency
+
+def open_dictionary(path):
+    """Open a compiled dictionary, or return None if the file is missing or unreadable"""
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return ZhuyinDictionary(path)
+    except (OSError, ValueError) as e:
+        logger.warning("Could not load Zhuyin dictionary '%s': %s", path, e)
+        return None
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python zhuyin_dict.py SOURCE.txt OUTPUT.dict")
+        sys.exit(1)
+    with open(sys.argv[1], encoding='utf-8') as source:
+        count = compile_dictionary(parse_source(source), sys.argv[2])
+    print(f"Compiled {count} entries into {sys.argv[2]}")
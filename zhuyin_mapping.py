@@ -1,208 +1,217 @@
 # Zhuyin (Bopomofo) to Traditional Chinese mapping
+import logging
+import os
+import threading
+from functools import lru_cache
+
+from zhuyin_dict import compile_dictionary, open_dictionary, parse_source
+
+# Warnings go to the logging system (stderr unless the program configures it), never stdout
+logger = logging.getLogger(__name__)
+
 # This file contains mappings for common Traditional Chinese characters with their Zhuyin pronunciation
+# Each reading maps to its candidates in IME candidate-window order (index 0 is the IME's default choice)
+# A full-size compiled dictionary (see zhuyin_dict.py) takes precedence when one is installed;
+# the mapping below is the built-in fallback
 
 ZHUYIN_TO_CHINESE = {
     # Basic pronouns and common words
-    "ㄋㄧˇ": "你",     # nǐ - you
-    "ㄏㄠˇ": "好",     # hǎo - good/hello
-    "ㄨㄛˇ": "我",     # wǒ - I/me
-    "ㄕˋ": "是",       # shì - is/am/are
-    "ㄧ": "一",        # yī - one
-    "ㄍㄜˋ": "個",     # gè - classifier
-    "ㄒㄩㄝˊ": "學",   # xué - study/learn
-    "ㄕㄥ": "生",      # shēng - life/student
-    "ㄉㄜ˙": "的",     # de - possessive particle
-    "ㄌㄜ˙": "了",     # le - aspect particle
-    "ㄋㄜ˙": "呢",     # ne - question particle
-    "ㄇㄚ˙": "嗎",     # ma - question particle
-    "ㄅㄨˋ": "不",     # bù - not
-    "ㄧㄡˇ": "有",     # yǒu - have
-    "ㄇㄟˊ": "沒",     # méi - not have
-    "ㄗㄞˋ": "在",     # zài - at/in
-    "ㄏㄜˊ": "和",     # hé - and/with
-    "ㄧㄝˇ": "也",     # yě - also
-    "ㄏㄣˇ": "很",     # hěn - very
-    "ㄉㄡ": "都",      # dōu - all
-    "ㄏㄞˊ": "還",     # hái - still
-    "ㄐㄧㄡˋ": "就",   # jiù - then
-    "ㄎㄜˇㄧˇ": "可以", # kěyǐ - can/may
-    "ㄧㄥ": "應",      # yīng - should
-    "ㄍㄞ": "該",      # gāi - should
+    "ㄋㄧˇ": ["你"],     # nǐ - you
+    "ㄏㄠˇ": ["好"],     # hǎo - good/hello
+    "ㄨㄛˇ": ["我"],     # wǒ - I/me
+    "ㄕˋ": ["是"],       # shì - is/am/are
+    "ㄧ": ["一"],        # yī - one
+    "ㄍㄜˋ": ["個"],     # gè - classifier
+    "ㄒㄩㄝˊ": ["學"],   # xué - study/learn
+    "ㄕㄥ": ["生"],      # shēng - life/student
+    "ㄉㄜ˙": ["的"],     # de - possessive particle
+    "ㄌㄜ˙": ["了"],     # le - aspect particle
+    "ㄋㄜ˙": ["呢"],     # ne - question particle
+    "ㄇㄚ˙": ["嗎"],     # ma - question particle
+    "ㄅㄨˋ": ["不"],     # bù - not
+    "ㄧㄡˇ": ["有"],     # yǒu - have
+    "ㄇㄟˊ": ["沒"],     # méi - not have
+    "ㄗㄞˋ": ["在"],     # zài - at/in
+    "ㄏㄜˊ": ["和"],     # hé - and/with
+    "ㄧㄝˇ": ["也"],     # yě - also
+    "ㄏㄣˇ": ["很"],     # hěn - very
+    "ㄉㄡ": ["都"],      # dōu - all
+    "ㄏㄞˊ": ["還"],     # hái - still
+    "ㄐㄧㄡˋ": ["就"],   # jiù - then
+    "ㄎㄜˇㄧˇ": ["可以"], # kěyǐ - can/may
+    "ㄧㄥ": ["應"],      # yīng - should
+    "ㄍㄞ": ["該"],      # gāi - should
     
     # Numbers with correct tones
-    "ㄦˋ": "二",       # èr  
-    "ㄙㄢ": "三",      # sān
-    "ㄙˋ": "四",       # sì
-    "ㄨˇ": "五",       # wǔ
-    "ㄌㄧㄡˋ": "六",   # liù
-    "ㄑㄧ": "七",      # qī
-    "ㄅㄚ": "八",      # bā
-    "ㄐㄧㄡˇ": "九",   # jiǔ
-    "ㄕˊ": "十",       # shí
-    "ㄅㄞˇ": "百",     # bǎi - hundred
-    "ㄑㄧㄢ": "千",    # qiān - thousand
-    "ㄨㄢˋ": "萬",     # wàn - ten thousand
+    "ㄦˋ": ["二"],       # èr  
+    "ㄙㄢ": ["三"],      # sān
+    "ㄙˋ": ["四"],       # sì
+    "ㄨˇ": ["五", "午"],  # wǔ - five / noon
+    "ㄌㄧㄡˋ": ["六"],   # liù
+    "ㄑㄧ": ["七"],      # qī
+    "ㄅㄚ": ["八"],      # bā
+    "ㄐㄧㄡˇ": ["九"],   # jiǔ
+    "ㄕˊ": ["十"],       # shí
+    "ㄅㄞˇ": ["百"],     # bǎi - hundred
+    "ㄑㄧㄢ": ["千"],    # qiān - thousand
+    "ㄨㄢˋ": ["萬"],     # wàn - ten thousand
     
     # Family terms
-    "ㄅㄚˋㄅㄚ˙": "爸爸", # bàba - dad
-    "ㄇㄚㄇㄚ˙": "媽媽", # māma - mom
-    "ㄅㄚˋ": "爸",     # bà - dad
-    "ㄇㄚ": "媽",      # mā - mom
-    "ㄍㄜ": "哥",      # gē - older brother
-    "ㄐㄧㄝˇ": "姐",   # jiě - older sister
-    "ㄉㄧˋ": "弟",     # dì - younger brother
-    "ㄇㄟˋ": "妹",     # mèi - younger sister
-    "ㄐㄧㄚ": "家",     # jiā - home/family
-    "ㄐㄧㄚㄊㄧㄥˊ": "家庭", # jiātíng - family
+    "ㄅㄚˋㄅㄚ˙": ["爸爸"], # bàba - dad
+    "ㄇㄚㄇㄚ˙": ["媽媽"], # māma - mom
+    "ㄅㄚˋ": ["爸"],     # bà - dad
+    "ㄇㄚ": ["媽"],      # mā - mom
+    "ㄍㄜ": ["哥"],      # gē - older brother
+    "ㄐㄧㄝˇ": ["姐"],   # jiě - older sister
+    "ㄉㄧˋ": ["弟"],     # dì - younger brother
+    "ㄇㄟˋ": ["妹"],     # mèi - younger sister
+    "ㄐㄧㄚ": ["家"],     # jiā - home/family
+    "ㄐㄧㄚㄊㄧㄥˊ": ["家庭"], # jiātíng - family
     
     # Common verbs
-    "ㄔ": "吃",        # chī - eat
-    "ㄏㄜ": "喝",      # hē - drink
-    "ㄗㄡˇ": "走",     # zǒu - walk/go
-    "ㄆㄠˇ": "跑",     # pǎo - run
-    "ㄎㄢˋ": "看",     # kàn - look/see
-    "ㄊㄧㄥ": "聽",    # tīng - listen
-    "ㄕㄨㄛ": "說",    # shuō - speak/say
-    "ㄒㄧㄝˇ": "寫",   # xiě - write
-    "ㄉㄨˊ": "讀",     # dú - read
-    "ㄐㄧㄠ": "教",    # jiāo - teach
-    "ㄌㄞˊ": "來",     # lái - come
-    "ㄑㄩˋ": "去",     # qù - go
-    "ㄏㄨㄟˊ": "回",   # huí - return
-    "ㄗㄨㄛˋ": "做",   # zuò - do/make
-    "ㄍㄨㄥ": "工",    # gōng - work
-    "ㄗㄨㄛˋ": "作",   # zuò - work/do
-    "ㄒㄧㄤˇ": "想",   # xiǎng - think/want
-    "ㄓˉ": "知",      # zhī - know
-    "ㄉㄠˋ": "道",     # dào - way/know
-    "ㄓˉㄉㄠˋ": "知道", # zhīdào - know
-    "ㄖㄣˊㄨㄟˊ": "認為", # rénwéi - think
-    "ㄒㄧㄤ": "相",    # xiāng - mutual
-    "ㄒㄧㄣˋ": "信",   # xìn - believe
-    "ㄒㄧㄤㄒㄧㄣˋ": "相信", # xiāngxìn - believe
-    "ㄒㄧ": "希",      # xī - hope
-    "ㄨㄤˋ": "望",     # wàng - hope
-    "ㄒㄧㄨㄤˋ": "希望", # xīwàng - hope
+    "ㄔ": ["吃"],        # chī - eat
+    "ㄏㄜ": ["喝"],      # hē - drink
+    "ㄗㄡˇ": ["走"],     # zǒu - walk/go
+    "ㄆㄠˇ": ["跑"],     # pǎo - run
+    "ㄎㄢˋ": ["看"],     # kàn - look/see
+    "ㄊㄧㄥ": ["聽"],    # tīng - listen
+    "ㄕㄨㄛ": ["說"],    # shuō - speak/say
+    "ㄒㄧㄝˇ": ["寫"],   # xiě - write
+    "ㄉㄨˊ": ["讀"],     # dú - read
+    "ㄐㄧㄠ": ["教"],    # jiāo - teach
+    "ㄌㄞˊ": ["來"],     # lái - come
+    "ㄑㄩˋ": ["去"],     # qù - go
+    "ㄏㄨㄟˊ": ["回"],   # huí - return
+    "ㄗㄨㄛˋ": ["做", "作", "坐"], # zuò - do/make / work / sit
+    "ㄍㄨㄥ": ["工"],    # gōng - work
+    "ㄒㄧㄤˇ": ["想"],   # xiǎng - think/want
+    "ㄓˉ": ["知"],      # zhī - know
+    "ㄉㄠˋ": ["道"],     # dào - way/know
+    "ㄓˉㄉㄠˋ": ["知道"], # zhīdào - know
+    "ㄖㄣˊㄨㄟˊ": ["認為"], # rénwéi - think
+    "ㄒㄧㄤ": ["相"],    # xiāng - mutual
+    "ㄒㄧㄣˋ": ["信"],   # xìn - believe
+    "ㄒㄧㄤㄒㄧㄣˋ": ["相信"], # xiāngxìn - believe
+    "ㄒㄧ": ["希"],      # xī - hope
+    "ㄨㄤˋ": ["望"],     # wàng - hope
+    "ㄒㄧㄨㄤˋ": ["希望"], # xīwàng - hope
     
     # Time expressions
-    "ㄐㄧㄣ": "今",     # jīn - today
-    "ㄊㄧㄢ": "天",     # tiān - day/sky
-    "ㄐㄧㄣㄊㄧㄢ": "今天", # jīntiān - today
-    "ㄇㄧㄥˊ": "明",    # míng - bright/tomorrow
-    "ㄇㄧㄥˊㄊㄧㄢ": "明天", # míngtiān - tomorrow
-    "ㄗㄨㄛˊ": "昨",    # zuó - yesterday
-    "ㄗㄨㄛˊㄊㄧㄢ": "昨天", # zuótiān - yesterday
-    "ㄕㄤˋ": "上",     # shàng - up/on
-    "ㄒㄧㄚˋ": "下",    # xià - down/under
-    "ㄨˇ": "午",       # wǔ - noon
-    "ㄨㄢˇ": "晚",     # wǎn - evening
-    "ㄕㄤˋㄨˇ": "上午", # shàngwǔ - morning
-    "ㄒㄧㄚˋㄨˇ": "下午", # xiàwǔ - afternoon
-    "ㄨㄢˇㄕㄤˋ": "晚上", # wǎnshàng - evening
-    "ㄒㄧㄢˋㄗㄞˋ": "現在", # xiànzài - now
-    "ㄧˇㄑㄧㄢˊ": "以前", # yǐqián - before
-    "ㄧˇㄏㄡˋ": "以後", # yǐhòu - after
-    "ㄕˊㄏㄡˋ": "時候", # shíhou - time
-    "ㄕˊㄐㄧㄢ": "時間", # shíjiān - time
+    "ㄐㄧㄣ": ["今"],     # jīn - today
+    "ㄊㄧㄢ": ["天"],     # tiān - day/sky
+    "ㄐㄧㄣㄊㄧㄢ": ["今天"], # jīntiān - today
+    "ㄇㄧㄥˊ": ["明"],    # míng - bright/tomorrow
+    "ㄇㄧㄥˊㄊㄧㄢ": ["明天"], # míngtiān - tomorrow
+    "ㄗㄨㄛˊ": ["昨"],    # zuó - yesterday
+    "ㄗㄨㄛˊㄊㄧㄢ": ["昨天"], # zuótiān - yesterday
+    "ㄕㄤˋ": ["上"],     # shàng - up/on
+    "ㄒㄧㄚˋ": ["下"],    # xià - down/under
+    "ㄨㄢˇ": ["晚"],     # wǎn - evening
+    "ㄕㄤˋㄨˇ": ["上午"], # shàngwǔ - morning
+    "ㄒㄧㄚˋㄨˇ": ["下午"], # xiàwǔ - afternoon
+    "ㄨㄢˇㄕㄤˋ": ["晚上"], # wǎnshàng - evening
+    "ㄒㄧㄢˋㄗㄞˋ": ["現在"], # xiànzài - now
+    "ㄧˇㄑㄧㄢˊ": ["以前"], # yǐqián - before
+    "ㄧˇㄏㄡˋ": ["以後"], # yǐhòu - after
+    "ㄕˊㄏㄡˋ": ["時候"], # shíhou - time
+    "ㄕˊㄐㄧㄢ": ["時間"], # shíjiān - time
     
     # Places and objects
-    "ㄒㄩㄝˊㄒㄧㄠˋ": "學校",  # xuéxiào - school
-    "ㄌㄠˇㄕ": "老師",  # lǎoshī - teacher
-    "ㄕㄨ": "書",      # shū - book
-    "ㄅㄧˇ": "筆",     # bǐ - pen
-    "ㄓˇ": "紙",       # zhǐ - paper
-    "ㄎㄜˋ": "課",     # kè - class
-    "ㄗㄨㄛˋㄧㄝˋ": "作業", # zuòyè - homework
-    "ㄎㄠˇㄕˋ": "考試", # kǎoshì - exam
-    "ㄔㄥˊㄐㄧˋ": "成績", # chéngjì - grade
-    "ㄉㄧˋㄈㄤ": "地方", # dìfang - place
-    "ㄔㄥˊㄕˋ": "城市", # chéngshì - city
-    "ㄍㄨㄛˊㄐㄧㄚ": "國家", # guójiā - country
-    "ㄓㄜˋㄌㄧˇ": "這裡", # zhèlǐ - here
-    "ㄋㄚˋㄌㄧˇ": "那裡", # nàlǐ - there
-    "ㄋㄚˇㄌㄧˇ": "哪裡", # nǎlǐ - where
-    "ㄉㄨㄥㄒㄧ": "東西", # dōngxi - thing
-    "ㄕˋㄑㄧㄥˊ": "事情", # shìqíng - matter
+    "ㄒㄩㄝˊㄒㄧㄠˋ": ["學校"],  # xuéxiào - school
+    "ㄌㄠˇㄕ": ["老師"],  # lǎoshī - teacher
+    "ㄕㄨ": ["書"],      # shū - book
+    "ㄅㄧˇ": ["筆"],     # bǐ - pen
+    "ㄓˇ": ["紙"],       # zhǐ - paper
+    "ㄎㄜˋ": ["課"],     # kè - class
+    "ㄗㄨㄛˋㄧㄝˋ": ["作業"], # zuòyè - homework
+    "ㄎㄠˇㄕˋ": ["考試"], # kǎoshì - exam
+    "ㄔㄥˊㄐㄧˋ": ["成績"], # chéngjì - grade
+    "ㄉㄧˋㄈㄤ": ["地方"], # dìfang - place
+    "ㄔㄥˊㄕˋ": ["城市", "程式"], # chéngshì - city / program
+    "ㄍㄨㄛˊㄐㄧㄚ": ["國家"], # guójiā - country
+    "ㄓㄜˋㄌㄧˇ": ["這裡"], # zhèlǐ - here
+    "ㄋㄚˋㄌㄧˇ": ["那裡"], # nàlǐ - there
+    "ㄋㄚˇㄌㄧˇ": ["哪裡"], # nǎlǐ - where
+    "ㄉㄨㄥㄒㄧ": ["東西"], # dōngxi - thing
+    "ㄕˋㄑㄧㄥˊ": ["事情"], # shìqíng - matter
     
     # Emotions and descriptions
-    "ㄞˋ": "愛",       # ài - love
-    "ㄒㄧˇㄏㄨㄢ": "喜歡", # xǐhuān - like
-    "ㄍㄠ": "高",      # gāo - tall/high
-    "ㄉㄧ": "低",      # dī - low
-    "ㄉㄚˋ": "大",     # dà - big
-    "ㄒㄧㄠˇ": "小",   # xiǎo - small
-    "ㄉㄨㄛ": "多",    # duō - many/much
-    "ㄕㄠˇ": "少",     # shǎo - few/little
-    "ㄔㄤˊ": "長",     # cháng - long
-    "ㄉㄨㄢˇ": "短",   # duǎn - short
-    "ㄏㄨㄞˋ": "壞",   # huài - bad
-    "ㄇㄟˇㄌㄧˋ": "美麗", # měilì - beautiful
-    "ㄆㄧㄠˋㄌㄧㄤˋ": "漂亮", # piàoliang - pretty
-    "ㄔㄡˇ": "醜",     # chǒu - ugly
-    "ㄕㄣˊㄇㄜ˙": "什麼", # shénme - what
-    "ㄨㄟˊㄕㄣˊㄇㄜ˙": "為什麼", # wèishénme - why
-    "ㄗㄣˇㄇㄜ˙": "怎麼", # zěnme - how
-    "ㄕㄟˊ": "誰",     # shéi - who
+    "ㄞˋ": ["愛"],       # ài - love
+    "ㄒㄧˇㄏㄨㄢ": ["喜歡"], # xǐhuān - like
+    "ㄍㄠ": ["高"],      # gāo - tall/high
+    "ㄉㄧ": ["低"],      # dī - low
+    "ㄉㄚˋ": ["大"],     # dà - big
+    "ㄒㄧㄠˇ": ["小"],   # xiǎo - small
+    "ㄉㄨㄛ": ["多"],    # duō - many/much
+    "ㄕㄠˇ": ["少"],     # shǎo - few/little
+    "ㄔㄤˊ": ["長"],     # cháng - long
+    "ㄉㄨㄢˇ": ["短"],   # duǎn - short
+    "ㄏㄨㄞˋ": ["壞"],   # huài - bad
+    "ㄇㄟˇㄌㄧˋ": ["美麗"], # měilì - beautiful
+    "ㄆㄧㄠˋㄌㄧㄤˋ": ["漂亮"], # piàoliang - pretty
+    "ㄔㄡˇ": ["醜"],     # chǒu - ugly
+    "ㄕㄣˊㄇㄜ˙": ["什麼"], # shénme - what
+    "ㄨㄟˊㄕㄣˊㄇㄜ˙": ["為什麼"], # wèishénme - why
+    "ㄗㄣˇㄇㄜ˙": ["怎麼"], # zěnme - how
+    "ㄕㄟˊ": ["誰"],     # shéi - who
     
     # Colors
-    "ㄏㄨㄥˊ": "紅",   # hóng - red
-    "ㄌㄩˋ": "綠",     # lǜ - green
-    "ㄌㄢˊ": "藍",     # lán - blue
-    "ㄏㄨㄤˊ": "黃",   # huáng - yellow
-    "ㄅㄞˊ": "白",     # bái - white
-    "ㄏㄟ": "黑",      # hēi - black
-    "ㄧㄢˊㄙㄜˋ": "顏色", # yánsè - color
+    "ㄏㄨㄥˊ": ["紅"],   # hóng - red
+    "ㄌㄩˋ": ["綠"],     # lǜ - green
+    "ㄌㄢˊ": ["藍"],     # lán - blue
+    "ㄏㄨㄤˊ": ["黃"],   # huáng - yellow
+    "ㄅㄞˊ": ["白"],     # bái - white
+    "ㄏㄟ": ["黑"],      # hēi - black
+    "ㄧㄢˊㄙㄜˋ": ["顏色"], # yánsè - color
     
     # More common words
-    "ㄑㄧㄢˊ": "錢",   # qián - money
-    "ㄍㄨㄥㄙ": "公司", # gōngsī - company
-    "ㄕㄤㄉㄧㄢˋ": "商店", # shāngdiàn - store
-    "ㄕˋㄔㄤˇ": "市場", # shìchǎng - market
-    "ㄇㄞˇ": "買",     # mǎi - buy
-    "ㄇㄞˋ": "賣",     # mài - sell
-    "ㄐㄧㄚˋㄍㄜˊ": "價格", # jiàgé - price
-    "ㄔㄜ": "車",      # chē - car
-    "ㄈㄟㄐㄧ": "飛機", # fēijī - airplane
-    "ㄏㄨㄛˇㄔㄜ": "火車", # huǒchē - train
-    "ㄍㄨㄥㄔㄜ": "公車", # gōngchē - bus
-    "ㄐㄧㄠˇㄊㄚˋㄔㄜ": "腳踏車", # jiǎotàchē - bicycle
-    "ㄗㄡˇㄌㄨˋ": "走路", # zǒulù - walk
-    "ㄎㄞㄔㄜ": "開車", # kāichē - drive
-    "ㄗㄨㄛˋㄔㄜ": "坐車", # zuòchē - take vehicle
+    "ㄑㄧㄢˊ": ["錢"],   # qián - money
+    "ㄍㄨㄥㄙ": ["公司"], # gōngsī - company
+    "ㄕㄤㄉㄧㄢˋ": ["商店"], # shāngdiàn - store
+    "ㄕˋㄔㄤˇ": ["市場"], # shìchǎng - market
+    "ㄇㄞˇ": ["買"],     # mǎi - buy
+    "ㄇㄞˋ": ["賣"],     # mài - sell
+    "ㄐㄧㄚˋㄍㄜˊ": ["價格"], # jiàgé - price
+    "ㄔㄜ": ["車"],      # chē - car
+    "ㄈㄟㄐㄧ": ["飛機"], # fēijī - airplane
+    "ㄏㄨㄛˇㄔㄜ": ["火車"], # huǒchē - train
+    "ㄍㄨㄥㄔㄜ": ["公車"], # gōngchē - bus
+    "ㄐㄧㄠˇㄊㄚˋㄔㄜ": ["腳踏車"], # jiǎotàchē - bicycle
+    "ㄗㄡˇㄌㄨˋ": ["走路"], # zǒulù - walk
+    "ㄎㄞㄔㄜ": ["開車"], # kāichē - drive
+    "ㄗㄨㄛˋㄔㄜ": ["坐車"], # zuòchē - take vehicle
     
     # Health and medical
-    "ㄧㄩㄢˋ": "醫院", # yīyuàn - hospital
-    "ㄧㄕㄥ": "醫生", # yīshēng - doctor
-    "ㄏㄨˋㄕˋ": "護士", # hùshì - nurse
-    "ㄅㄧㄥˋ": "病",   # bìng - sick
-    "ㄐㄧㄢˋㄎㄤ": "健康", # jiànkāng - healthy
-    "ㄧㄠˋ": "藥",     # yào - medicine
-    "ㄓˋㄌㄧㄠˊ": "治療", # zhìliáo - treatment
-    "ㄐㄧㄢˇㄔㄚˊ": "檢查", # jiǎnchá - check
+    "ㄧㄩㄢˋ": ["醫院"], # yīyuàn - hospital
+    "ㄧㄕㄥ": ["醫生"], # yīshēng - doctor
+    "ㄏㄨˋㄕˋ": ["護士"], # hùshì - nurse
+    "ㄅㄧㄥˋ": ["病"],   # bìng - sick
+    "ㄐㄧㄢˋㄎㄤ": ["健康"], # jiànkāng - healthy
+    "ㄧㄠˋ": ["藥"],     # yào - medicine
+    "ㄓˋㄌㄧㄠˊ": ["治療"], # zhìliáo - treatment
+    "ㄐㄧㄢˇㄔㄚˊ": ["檢查"], # jiǎnchá - check
     
     # Technology
-    "ㄉㄧㄢˋㄋㄠˇ": "電腦", # diànnǎo - computer
-    "ㄕㄡˇㄐㄧ": "手機", # shǒujī - mobile phone
-    "ㄨㄤˇㄌㄨˋ": "網路", # wǎnglù - internet
-    "ㄨㄤˇㄓˋ": "網站", # wǎngzhàn - website
-    "ㄧㄡˊㄐㄧㄢˋ": "郵件", # yóujiàn - email
-    "ㄒㄩㄣˋㄒㄧˊ": "訊息", # xùnxī - message
-    "ㄎㄜㄐㄧˋ": "科技", # kējì - technology
-    "ㄔㄥˊㄕˋ": "程式", # chéngshì - program
+    "ㄉㄧㄢˋㄋㄠˇ": ["電腦"], # diànnǎo - computer
+    "ㄕㄡˇㄐㄧ": ["手機"], # shǒujī - mobile phone
+    "ㄨㄤˇㄌㄨˋ": ["網路"], # wǎnglù - internet
+    "ㄨㄤˇㄓˋ": ["網站"], # wǎngzhàn - website
+    "ㄧㄡˊㄐㄧㄢˋ": ["郵件"], # yóujiàn - email
+    "ㄒㄩㄣˋㄒㄧˊ": ["訊息"], # xùnxī - message
+    "ㄎㄜㄐㄧˋ": ["科技"], # kējì - technology
     
     # Basic particles and grammar words
-    "ㄌㄜ˙": "了",     # le - completed action
-    "ㄓㄜˋ": "著",     # zhe - continuous action
-    "ㄍㄨㄛˋ": "過",   # guò - experienced action
-    "ㄅㄟˋ": "被",     # bèi - passive marker
-    "ㄅㄚˇ": "把",     # bǎ - object marker
-    "ㄧㄣㄨㄟˊ": "因為", # yīnwèi - because
-    "ㄙㄨㄛˇㄧˇ": "所以", # suǒyǐ - therefore
-    "ㄖㄨˊㄍㄨㄛˇ": "如果", # rúguǒ - if
-    "ㄉㄢˋㄕˋ": "但是", # dànshì - but
-    "ㄏㄞˊㄕˋ": "還是", # háishì - or/still
-    "ㄓˉㄧㄠˋ": "只要", # zhǐyào - as long as
-    "ㄓˉㄗㄞˋ": "只在", # zhǐzài - only at
+    "ㄓㄜˋ": ["著"],     # zhe - continuous action
+    "ㄍㄨㄛˋ": ["過"],   # guò - experienced action
+    "ㄅㄟˋ": ["被"],     # bèi - passive marker
+    "ㄅㄚˇ": ["把"],     # bǎ - object marker
+    "ㄧㄣㄨㄟˊ": ["因為"], # yīnwèi - because
+    "ㄙㄨㄛˇㄧˇ": ["所以"], # suǒyǐ - therefore
+    "ㄖㄨˊㄍㄨㄛˇ": ["如果"], # rúguǒ - if
+    "ㄉㄢˋㄕˋ": ["但是"], # dànshì - but
+    "ㄏㄞˊㄕˋ": ["還是"], # háishì - or/still
+    "ㄓˉㄧㄠˋ": ["只要"], # zhǐyào - as long as
+    "ㄓˉㄗㄞˋ": ["只在"], # zhǐzài - only at
 }
 
 # Common Traditional Chinese words without Zhuyin input (for direct typing)
@@ -228,18 +237,336 @@ COMMON_CHINESE_WORDS = [
     "學習", "練習", "複習", "預習", "準備", "計畫", "決定", "選擇"
 ]
 
+# Bopomofo keyboard layouts: Zhuyin symbol -> key, including tone keys
+# The empty string is the first (unmarked) tone, entered with space on every layout
+KEYBOARD_LAYOUTS = {
+    # Standard (大千) layout used by Microsoft Bopomofo
+    "Standard": {
+        'ㄅ': '1', 'ㄆ': 'q', 'ㄇ': 'a', 'ㄈ': 'z', 'ㄉ': '2', 'ㄊ': 'w', 'ㄋ': 's', 'ㄌ': 'x',
+        'ㄍ': 'e', 'ㄎ': 'd', 'ㄏ': 'c', 'ㄐ': 'r', 'ㄑ': 'f', 'ㄒ': 'v', 'ㄓ': '5', 'ㄔ': 't',
+        'ㄕ': 'g', 'ㄖ': 'b', 'ㄗ': 'y', 'ㄘ': 'h', 'ㄙ': 'n',
+        'ㄧ': 'u', 'ㄨ': 'j', 'ㄩ': 'm',
+        'ㄚ': '8', 'ㄛ': 'i', 'ㄜ': 'k', 'ㄝ': ',', 'ㄞ': '9', 'ㄟ': 'o', 'ㄠ': 'l', 'ㄡ': '.',
+        'ㄢ': '0', 'ㄣ': 'p', 'ㄤ': ';', 'ㄥ': '/', 'ㄦ': '-',
+        '': 'space', 'ˉ': 'space', 'ˊ': '6', 'ˇ': '3', 'ˋ': '4', '˙': '7',
+    },
+    # ETen (倚天) layout
+    "ETen": {
+        'ㄅ': 'b', 'ㄆ': 'p', 'ㄇ': 'm', 'ㄈ': 'f', 'ㄉ': 'd', 'ㄊ': 't', 'ㄋ': 'n', 'ㄌ': 'l',
+        'ㄍ': 'v', 'ㄎ': 'k', 'ㄏ': 'h', 'ㄐ': 'g', 'ㄑ': '7', 'ㄒ': 'c', 'ㄓ': ',', 'ㄔ': '.',
+        'ㄕ': '/', 'ㄖ': 'j', 'ㄗ': ';', 'ㄘ': "'", 'ㄙ': 's',
+        'ㄧ': 'e', 'ㄨ': 'x', 'ㄩ': 'u',
+        'ㄚ': 'a', 'ㄛ': 'o', 'ㄜ': 'r', 'ㄝ': 'w', 'ㄞ': 'i', 'ㄟ': 'q', 'ㄠ': 'z', 'ㄡ': 'y',
+        'ㄢ': '8', 'ㄣ': '9', 'ㄤ': '0', 'ㄥ': '-', 'ㄦ': '=',
+        '': 'space', 'ˉ': 'space', 'ˊ': '2', 'ˇ': '3', 'ˋ': '4', '˙': '1',
+    },
+    # Hsu (許氏) layout; several keys are shared and disambiguated by the IME
+    "Hsu": {
+        'ㄅ': 'b', 'ㄆ': 'p', 'ㄇ': 'm', 'ㄈ': 'f', 'ㄉ': 'd', 'ㄊ': 't', 'ㄋ': 'n', 'ㄌ': 'l',
+        'ㄍ': 'g', 'ㄎ': 'k', 'ㄏ': 'h', 'ㄐ': 'j', 'ㄑ': 'v', 'ㄒ': 'c', 'ㄓ': 'j', 'ㄔ': 'v',
+        'ㄕ': 'c', 'ㄖ': 'r', 'ㄗ': 'z', 'ㄘ': 'a', 'ㄙ': 's',
+        'ㄧ': 'e', 'ㄨ': 'x', 'ㄩ': 'u',
+        'ㄚ': 'y', 'ㄛ': 'h', 'ㄜ': 'g', 'ㄝ': 'e', 'ㄞ': 'i', 'ㄟ': 'a', 'ㄠ': 'w', 'ㄡ': 'o',
+        'ㄢ': 'm', 'ㄣ': 'n', 'ㄤ': 'k', 'ㄥ': 'l', 'ㄦ': 'l',
+        '': 'space', 'ˉ': 'space', 'ˊ': 'd', 'ˇ': 'f', 'ˋ': 'j', '˙': 's',
+    },
+}
+
+ZHUYIN_INITIALS = 'ㄅㄆㄇㄈㄉㄊㄋㄌㄍㄎㄏㄐㄑㄒㄓㄔㄕㄖㄗㄘㄙ'
+ZHUYIN_MEDIALS = 'ㄧㄨㄩ'
+ZHUYIN_FINALS = 'ㄚㄛㄜㄝㄞㄟㄠㄡㄢㄣㄤㄥㄦ'
+ZHUYIN_TONES = 'ˉˊˇˋ˙'
+ZHUYIN_SYMBOLS = frozenset(ZHUYIN_INITIALS + ZHUYIN_MEDIALS + ZHUYIN_FINALS + ZHUYIN_TONES)
+
+def is_zhuyin_reading(zhuyin):
+    """Check that a reading is made of Zhuyin symbols and tone marks only"""
+    return bool(zhuyin) and all(symbol in ZHUYIN_SYMBOLS for symbol in zhuyin)
+
+def split_syllables(zhuyin):
+    """Split a Zhuyin reading into (symbols, tone) syllables; tone is '' for the unmarked first tone"""
+    syllables = []
+    symbols = ''
+    stage = 0  # 1 after an initial, 2 after a medial, 3 after a final
+    for symbol in zhuyin:
+        if symbol in ZHUYIN_TONES:
+            syllables.append((symbols, symbol))
+            symbols, stage = '', 0
+            continue
+        if symbol in ZHUYIN_INITIALS:
+            next_stage = 1
+        elif symbol in ZHUYIN_MEDIALS:
+            next_stage = 2
+        elif symbol in ZHUYIN_FINALS:
+            next_stage = 3
+        else:
+            next_stage = stage + 1  # Unknown symbol; reported by compile_zhuyin_keys
+        if symbols and next_stage <= stage:
+            # This symbol cannot continue the current syllable, which had no tone mark
+            syllables.append((symbols, ''))
+            symbols = ''
+        symbols += symbol
+        stage = next_stage
+    if symbols:
+        syllables.append((symbols, ''))
+    return syllables
+
+@lru_cache(maxsize=None)
+def compile_zhuyin_keys(zhuyin, layout="Standard"):
+    """Compile a Zhuyin reading into the key sequence for a keyboard layout (memoized)"""
+    table = KEYBOARD_LAYOUTS[layout]
+    keys = []
+    for symbols, tone in split_syllables(zhuyin):
+        for symbol in symbols:
+            if symbol in table:
+                keys.append(table[symbol])
+            else:
+                logger.warning("No key mapping for Zhuyin character '%s'", symbol)
+        keys.append(table[tone])
+    return tuple(keys)
+
+def build_reverse_indexes(mapping):
+    """Build character->readings and word->(reading, rank) indexes for a Zhuyin mapping"""
+    char_index = {}
+    word_index = {}
+    for zhuyin, candidates in mapping.items():
+        for rank, chinese in enumerate(candidates):
+            word_index.setdefault(chinese, []).append((zhuyin, rank))
+            for char in set(chinese):
+                readings = char_index.setdefault(char, [])
+                if zhuyin not in readings:
+                    readings.append(zhuyin)
+    # Prefer the reading where the word is the highest-ranked candidate
+    for entries in word_index.values():
+        entries.sort(key=lambda entry: entry[1])
+    return char_index, word_index
+
+# Reverse lookup indexes, built once at import time
+CHARACTER_TO_ZHUYIN, WORD_TO_ZHUYIN = build_reverse_indexes(ZHUYIN_TO_CHINESE)
+
+# Every character that appears in COMMON_CHINESE_WORDS
+COMMON_WORD_CHARACTERS = frozenset(''.join(COMMON_CHINESE_WORDS))
+
+class PhraseTrie:
+    """Character trie used for longest-match segmentation of Chinese text"""
+
+    _END = ''  # Marks the end of a word; never a real character key
+
+    def __init__(self, words=()):
+        self.root = {}
+        for word in words:
+            self.add(word)
+
+    def add(self, word):
+        """Insert a word into the trie"""
+        if not word:
+            return
+        node = self.root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[self._END] = True
+
+    def match_ends(self, text, start=0):
+        """Return the end index of every word that starts at `start`, shortest first"""
+        node = self.root
+        ends = []
+        for i in range(start, len(text)):
+            node = node.get(text[i])
+            if node is None:
+                break
+            if self._END in node:
+                ends.append(i + 1)
+        return ends
+
+    def segment(self, text):
+        """Split text into dictionary words, single Chinese characters and non-Chinese runs"""
+        return _segment(text, [self.match_ends], WORD_FREQUENCIES)
+
+def _segment(text, matchers, frequencies):
+    """Segment text using every matcher(text, start) -> word end indexes, breaking ties by word counts"""
+    def ends_at(start):
+        return {end for match in matchers for end in match(text, start)}
+
+    segments = []
+    i = 0
+    length = len(text)
+    while i < length:
+        ends = ends_at(i)
+        if len(ends) > 1:
+            # Prefer the word that lets the next word reach furthest, then the one
+            # typed most often, then the longest
+            end = max(ends, key=lambda e: (max(ends_at(e), default=e),
+                                           frequencies.get(text[i:e], 0), e))
+        elif ends:
+            end = ends.pop()
+        else:
+            end = i + 1
+            if not is_chinese_character(text[i]):
+                # Keep runs of Latin text, digits and punctuation together
+                while end < length and not is_chinese_character(text[end]):
+                    end += 1
+        segments.append(text[i:end])
+        i = end
+    return segments
+
+# Longest-match segmenter over every mapped phrase and common word
+PHRASE_TRIE = PhraseTrie(list(WORD_TO_ZHUYIN) + COMMON_CHINESE_WORDS)
+
+# Optional full-size compiled dictionary, opened lazily through mmap
+DICTIONARY_PATH = os.environ.get('AUTO_TYPER_DICT',
+                                 os.path.join(os.path.expanduser('~'), '.auto_typer', 'zhuyin.dict'))
+EXTERNAL_DICTIONARY = None
+_phrase_matchers = [PHRASE_TRIE.match_ends]
+
+# User dictionary overlay: readings -> user-added candidates, plus word counts learned from typed text
+USER_DICTIONARY_PATH = os.path.join(os.path.expanduser('~'), '.auto_typer', 'user.dict')
+USER_DICTIONARY = {}
+WORD_FREQUENCIES = {}
+# Held while the user dictionary is changed and saved, which the GUI and typing threads both do
+USER_DICTIONARY_LOCK = threading.Lock()
+
+def load_dictionary(path):
+    """Use a compiled dictionary file ahead of the built-in mapping; returns True if it loaded"""
+    global EXTERNAL_DICTIONARY, _phrase_matchers
+    dictionary = open_dictionary(path)
+    if dictionary is None:
+        return False
+    if EXTERNAL_DICTIONARY is not None:
+        EXTERNAL_DICTIONARY.close()
+    EXTERNAL_DICTIONARY = dictionary
+    _phrase_matchers = [PHRASE_TRIE.match_ends, dictionary.match_ends]
+    return True
+
+def _merge(first, second):
+    """Merge two reading lists, keeping order and dropping duplicates"""
+    return first + [reading for reading in second if reading not in first]
+
 def get_zhuyin_for_character(char):
     """Get possible Zhuyin pronunciations for a given character"""
-    zhuyin_options = []
-    for zhuyin, chinese_char in ZHUYIN_TO_CHINESE.items():
-        if char in chinese_char:
-            zhuyin_options.append(zhuyin)
-    return zhuyin_options
+    readings = list(CHARACTER_TO_ZHUYIN.get(char, ()))
+    if EXTERNAL_DICTIONARY is not None:
+        readings = _merge(EXTERNAL_DICTIONARY.get_readings(char), readings)
+    return readings
+
+def get_zhuyin_for_word(word):
+    """Get Zhuyin pronunciations whose candidates include exactly the given word"""
+    readings = [zhuyin for zhuyin, _ in WORD_TO_ZHUYIN.get(word, ())]
+    if EXTERNAL_DICTIONARY is not None:
+        readings = _merge(EXTERNAL_DICTIONARY.get_readings(word), readings)
+    return readings
+
+def get_candidates(zhuyin):
+    """Get the candidates for a Zhuyin reading in IME candidate-window order"""
+    candidates = []
+    if EXTERNAL_DICTIONARY is not None:
+        candidates = EXTERNAL_DICTIONARY.get_candidates(zhuyin)
+    candidates = _merge(candidates, ZHUYIN_TO_CHINESE.get(zhuyin, []))
+    # User entries mirror the phrases added to the IME, which lists them first, so they
+    # override the default pick. Learned frequencies are not applied: the rank selects a
+    # candidate by its position in the IME's window, which doesn't know what was learned
+    return _merge(USER_DICTIONARY.get(zhuyin, []), candidates)
+
+def find_candidate(word):
+    """Get the preferred (zhuyin, candidate_rank) pair for a word, or None if unmapped"""
+    best = None
+    for zhuyin in get_zhuyin_for_word(word):
+        rank = get_candidates(zhuyin).index(word)
+        if best is None or rank < best[1]:
+            best = (zhuyin, rank)
+    return best
+
+def find_zhuyin(word):
+    """Get the preferred Zhuyin pronunciation for a word, or None if unmapped"""
+    entry = find_candidate(word)
+    return entry[0] if entry else None
+
+def add_user_entry(zhuyin, word, frequency=0):
+    """Add a word to the user dictionary, updating the lookup indexes in place
+
+    Raises ValueError if the reading isn't Zhuyin or the word is empty.
+    """
+    if not is_zhuyin_reading(zhuyin):
+        raise ValueError(f"'{zhuyin}' is not a Zhuyin reading")
+    if not word:
+        raise ValueError("The phrase is empty")
+    candidates = USER_DICTIONARY.setdefault(zhuyin, [])
+    if word not in candidates:
+        candidates.append(word)
+        entries = WORD_TO_ZHUYIN.setdefault(word, [])
+        if all(entry[0] != zhuyin for entry in entries):
+            entries.append((zhuyin, len(candidates) - 1))
+        for char in set(word):
+            readings = CHARACTER_TO_ZHUYIN.setdefault(char, [])
+            if zhuyin not in readings:
+                readings.append(zhuyin)
+        PHRASE_TRIE.add(word)
+    if frequency:
+        WORD_FREQUENCIES[word] = max(frequency, WORD_FREQUENCIES.get(word, 0))
+
+def import_user_entries(lines):
+    """Add 'reading<TAB>phrase[<TAB>frequency]' lines to the user dictionary; returns the count
+
+    Raises ValueError, adding nothing, if any line is malformed or has a non-Zhuyin reading.
+    """
+    entries = list(parse_source(lines))
+    for zhuyin, word, _ in entries:
+        if not is_zhuyin_reading(zhuyin):
+            raise ValueError(f"'{zhuyin}' (for '{word}') is not a Zhuyin reading")
+    for zhuyin, word, frequency in entries:
+        add_user_entry(zhuyin, word, frequency)
+    return len(entries)
+
+def learn_from_text(text):
+    """Count the mapped words in typed text so segmentation favors them"""
+    for segment in segment_text(text):
+        if is_chinese_character(segment[0]) and find_zhuyin(segment):
+            WORD_FREQUENCIES[segment] = WORD_FREQUENCIES.get(segment, 0) + 1
+
+def load_user_dictionary(path=USER_DICTIONARY_PATH):
+    """Load the persisted user dictionary and learned frequencies; returns True if it loaded"""
+    dictionary = open_dictionary(path)
+    if dictionary is None:
+        return False
+    try:
+        for zhuyin, word, frequency in dictionary.entries():
+            if word in ZHUYIN_TO_CHINESE.get(zhuyin, ()):
+                # Built-in words are stored only for their learned frequency
+                if frequency:
+                    WORD_FREQUENCIES[word] = max(frequency, WORD_FREQUENCIES.get(word, 0))
+            elif not is_zhuyin_reading(zhuyin) or not word:
+                logger.warning("Skipping invalid user dictionary entry '%s' -> '%s'", zhuyin, word)
+            else:
+                add_user_entry(zhuyin, word, frequency)
+    finally:
+        dictionary.close()
+    return True
+
+def save_user_dictionary(path=USER_DICTIONARY_PATH):
+    """Persist user entries and learned frequencies in the compiled dictionary format
+
+    User entries keep the order they were added in, which is their candidate order.
+    """
+    entries = [(zhuyin, word, WORD_FREQUENCIES.get(word, 0))
+               for zhuyin, words in USER_DICTIONARY.items() for word in words]
+    user_words = {word for _, word, _ in entries}
+    entries += [(find_zhuyin(word), word, count) for word, count in WORD_FREQUENCIES.items()
+                if word not in user_words and find_zhuyin(word)]
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        compile_dictionary(entries, path, rank_by_frequency=False)
+    except OSError as e:
+        logger.warning("Could not save user dictionary: %s", e)
 
 def is_chinese_character(char):
     """Check if a character is Chinese"""
     return '\u4e00' <= char <= '\u9fff'
 
+def segment_text(text, frequencies=None):
+    """Segment text into the longest known Chinese words (see PhraseTrie.segment)
+
+    Ties are broken by `frequencies` (word -> count), by default the learned word counts.
+    """
+    return _segment(text, _phrase_matchers, WORD_FREQUENCIES if frequencies is None else frequencies)
+
 def get_character_info(char):
     """Get detailed information about a Chinese character"""
     if not is_chinese_character(char):
@@ -248,6 +575,9 @@ def get_character_info(char):
     info = {
         'character': char,
         'zhuyin_options': get_zhuyin_for_character(char),
-        'in_common_words': char in ' '.join(COMMON_CHINESE_WORDS)
+        'in_common_words': char in COMMON_WORD_CHARACTERS
     }
-    return info 
\ No newline at end of file
+    return info
+
+load_dictionary(DICTIONARY_PATH)
+load_user_dictionary()